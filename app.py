@@ -9,16 +9,33 @@ This demonstrates:
 from flask import Flask, Response, request, stream_with_context, jsonify
 import json
 import uuid
-from src.agents.graph_builder import my_graph
-from src.agents.model import Shipment, Stop, PurchaseOrder, ShipmentStatus, StopType, PoState
-from src.util.mermaid import create_mermaid_diagram_files
+from src.agents.graph_builder import my_graph, shipment_run_config, resume_or_start
+from src.agents.shipment_loader import load_shipment
+from src.agents.po_worker_pool import po_worker_pool
+from src.agents.po_subgraph import po_checkpointer
+from src.chat.service.llm_response_cache import llm_response_cache
+from src.chat.service.llm_batcher import llm_batcher
+from src.chat.service.llm_rate_limiter import llm_governor
+from src.chat.service.llm_http_client import llm_http_clients
+from src.agents.escalation_decision_engine import escalation_decision_engine
+from src.agents.escalation_service import (
+    PendingEscalation,
+    list_pending_escalations,
+    get_pending_escalation,
+    resume_escalation,
+    resume_escalations
+)
+from src.util.mermaid import start_mermaid_refresh
+from src.config import Config
 from pydantic import ValidationError
 
 print('creating flask app')
 app = Flask(__name__)
 print('created flask app')
-create_mermaid_diagram_files()
-print('updated mermaid diagram')
+
+# Diagram rendering never blocks (or fails) server boot; see src/util/mermaid.py
+if Config.mermaid_refresh_on_startup:
+    start_mermaid_refresh()
 
 
 @app.route('/process-shipment', methods=['POST'])
@@ -35,13 +52,13 @@ def process_shipment():
         "stops": [...]
     }
     """
-    data = request.get_json()
-    if not data:
+    raw = request.get_data(cache=False)
+    if not raw.strip():
         return {"error": "Invalid input. Shipment data required."}, 400
     
     try:
-        # Parse shipment from JSON
-        shipment = Shipment(**data)
+        # Validate the request body straight into the Shipment model
+        shipment = load_shipment(raw)
         
         # Initialize state
         initial_state = {
@@ -51,8 +68,9 @@ def process_shipment():
             "processing_complete": False
         }
         
-        # Process shipment
-        final_state = my_graph.invoke(initial_state)
+        # Process shipment (resuming an unfinished checkpointed run of this shipment)
+        config = shipment_run_config(shipment.id)
+        final_state = my_graph.invoke(resume_or_start(initial_state, config), config)
         
         # Return results
         return jsonify({
@@ -74,12 +92,12 @@ def stream_shipment():
     """
     Stream shipment processing updates in real-time.
     """
-    data = request.get_json()
-    if not data:
+    raw = request.get_data(cache=False)
+    if not raw.strip():
         return {"error": "Invalid input. Shipment data required."}, 400
     
     try:
-        shipment = Shipment(**data)
+        shipment = load_shipment(raw)
         
         initial_state = {
             "shipment": shipment,
@@ -88,10 +106,12 @@ def stream_shipment():
             "processing_complete": False
         }
         
+        config = shipment_run_config(shipment.id)
+        
         def generate_stream():
             """Stream processing updates."""
             try:
-                for chunk in my_graph.stream(initial_state, stream_mode="updates"):
+                for chunk in my_graph.stream(resume_or_start(initial_state, config), config, stream_mode="updates"):
                     result = json.dumps({"update": str(chunk)}) + '\n'
                     yield result
             except Exception as exc:
@@ -106,10 +126,136 @@ def stream_shipment():
         return {"error": f"Invalid shipment data: {str(e)}"}, 400
 
 
+@app.route('/escalations', methods=['GET'])
+def list_escalations():
+    """
+    List POs paused on human review.
+    Optional query parameter: shipment_id
+    """
+    shipment_id = request.args.get('shipment_id', type=int)
+    return jsonify({
+        "escalations": [
+            escalation.model_dump()
+            for escalation in list_pending_escalations(shipment_id)
+        ]
+    })
+
+
+@app.route('/escalations/<thread_id>/resume', methods=['POST'])
+def resume_po_escalation(thread_id: str):
+    """
+    Resume a paused PO with the human's answer.
+    
+    Expects JSON payload:
+    {
+        "input": "approved, schedule it"
+    }
+    """
+    data = request.get_json()
+    if not data or not data.get("input"):
+        return {"error": "Invalid input. Human input required."}, 400
+    
+    try:
+        escalation = get_pending_escalation(thread_id)
+    except KeyError:
+        return {"error": f"No pending escalation for thread {thread_id}"}, 404
+    
+    try:
+        po_result = resume_escalation(thread_id, data["input"])
+        
+        return jsonify({"success": True, **resume_result(thread_id, escalation, po_result)})
+        
+    except Exception as e:
+        return {"error": f"Processing error: {str(e)}"}, 500
+
+
+@app.route('/escalations/resume', methods=['POST'])
+def resume_po_escalations():
+    """
+    Resume several paused POs at once; replies that need the LLM are sent
+    to it as one batched request.
+    
+    Expects JSON payload:
+    {
+        "answers": [
+            {"thread_id": "po-1001-2-PO-004", "input": "approved"},
+            {"thread_id": "po-1001-3-PO-007", "input": "still waiting"}
+        ]
+    }
+    """
+    data = request.get_json()
+    answers = parse_answers(data)
+    if answers is None:
+        return {"error": "Invalid input. A thread_id and human input are required for every answer, each thread_id once."}, 400
+    
+    try:
+        escalations = {thread_id: get_pending_escalation(thread_id) for thread_id in answers}
+    except KeyError as e:
+        return {"error": f"No pending escalation for thread {e.args[0]}"}, 404
+    
+    try:
+        po_results = resume_escalations(answers)
+        
+        return jsonify({
+            "success": True,
+            "results": [
+                resume_result(thread_id, escalations[thread_id], po_result)
+                for thread_id, po_result in po_results.items()
+            ]
+        })
+        
+    except Exception as e:
+        return {"error": f"Processing error: {str(e)}"}, 500
+
+
+def parse_answers(data) -> dict[str, str] | None:
+    """{thread_id: input} from a batch resume payload, or None if it is malformed."""
+    answers = data.get("answers") if isinstance(data, dict) else None
+    if not answers or not isinstance(answers, list):
+        return None
+    
+    parsed = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            return None
+        thread_id, human_input = answer.get("thread_id"), answer.get("input")
+        if not (isinstance(thread_id, str) and thread_id and isinstance(human_input, str) and human_input):
+            return None
+        # Resuming one thread twice in a batch would apply only one of the answers
+        if thread_id in parsed:
+            return None
+        parsed[thread_id] = human_input
+    return parsed
+
+
+def resume_result(thread_id: str, escalation: PendingEscalation, po_result: dict) -> dict:
+    """Response fields for a resumed PO."""
+    return {
+        "thread_id": thread_id,
+        "shipment_id": escalation.shipment_id,
+        "stop_id": escalation.stop_id,
+        "po": po_result["po"].model_dump(mode="json"),
+        "processing_result": po_result["processing_result"],
+        "needs_review": po_result["needs_review"],
+        "escalation_message": po_result["escalation_message"],
+        "pending": "__interrupt__" in po_result
+    }
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({"status": "healthy", "service": "shipment-processor"})
+    return jsonify({
+        "status": "healthy",
+        "service": "shipment-processor",
+        "po_worker_pool": po_worker_pool.stats(),
+        "po_checkpointer": po_checkpointer.stats(),
+        "llm_cache": llm_response_cache.stats(),
+        "llm_batcher": llm_batcher.stats(),
+        "llm_governor": llm_governor.stats(),
+        "llm_http_pool": llm_http_clients.stats(),
+        "escalation_decisions": escalation_decision_engine.stats()
+    })
 
 
 if __name__ == "__main__":
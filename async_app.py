@@ -0,0 +1,263 @@
+"""
+Quart (ASGI) API for Shipment Processing Graph
+
+Serves the same endpoints as app.py, backed by the graph's native asyncio
+execution path (ainvoke/astream). Graph runs are awaited on the event loop
+instead of holding a worker thread, so one process can hold hundreds of
+concurrent streaming connections while /health keeps answering.
+
+Run with:
+    uv run hypercorn async_app:app --bind 0.0.0.0:5001
+"""
+from quart import Quart, Response, request, jsonify
+import asyncio
+import json
+from src.agents.graph_builder import my_graph, shipment_run_config, aresume_or_start
+from src.agents.shipment_loader import load_shipment
+from src.agents.stop_subgraph import async_po_run_stats
+from src.agents.po_subgraph import po_checkpointer
+from src.chat.service.llm_response_cache import llm_response_cache
+from src.chat.service.llm_batcher import llm_batcher
+from src.chat.service.llm_rate_limiter import llm_governor
+from src.chat.service.llm_http_client import llm_http_clients
+from src.agents.escalation_decision_engine import escalation_decision_engine
+from src.agents.escalation_service import (
+    PendingEscalation,
+    alist_pending_escalations,
+    aget_pending_escalation,
+    aresume_escalation,
+    aresume_escalations
+)
+from src.util.mermaid import start_mermaid_refresh
+from src.config import Config
+from pydantic import ValidationError
+
+print('creating quart app')
+app = Quart(__name__)
+print('created quart app')
+
+# Diagram rendering never blocks (or fails) server boot; see src/util/mermaid.py
+if Config.mermaid_refresh_on_startup:
+    start_mermaid_refresh()
+
+
+@app.route('/process-shipment', methods=['POST'])
+async def process_shipment():
+    """
+    Process a shipment through the LangGraph workflow.
+    
+    Expects the same JSON payload as the Flask app's /process-shipment.
+    """
+    raw = await request.get_data()
+    if not raw.strip():
+        return {"error": "Invalid input. Shipment data required."}, 400
+    
+    try:
+        # Validate the request body straight into the Shipment model
+        shipment = load_shipment(raw)
+        
+        # Initialize state
+        initial_state = {
+            "shipment": shipment,
+            "current_stop_index": 0,
+            "stop_results": {},
+            "processing_complete": False
+        }
+        
+        # Process shipment without blocking the event loop
+        # (resuming an unfinished checkpointed run of this shipment)
+        config = shipment_run_config(shipment.id)
+        final_state = await my_graph.ainvoke(await aresume_or_start(initial_state, config), config)
+        
+        # Return results
+        return jsonify({
+            "success": True,
+            "shipment_id": final_state['shipment'].id,
+            "processing_complete": final_state['processing_complete'],
+            "stop_results": final_state.get('stop_results', {}),
+            "stops_processed": len(final_state['shipment'].stops)
+        })
+        
+    except ValidationError as e:
+        return {"error": f"Invalid shipment data: {str(e)}"}, 400
+    except Exception as e:
+        return {"error": f"Processing error: {str(e)}"}, 500
+
+
+@app.route('/stream-shipment', methods=['POST'])
+async def stream_shipment():
+    """
+    Stream shipment processing updates in real-time.
+    """
+    raw = await request.get_data()
+    if not raw.strip():
+        return {"error": "Invalid input. Shipment data required."}, 400
+    
+    try:
+        shipment = load_shipment(raw)
+        
+        initial_state = {
+            "shipment": shipment,
+            "current_stop_index": 0,
+            "stop_results": {},
+            "processing_complete": False
+        }
+        
+        config = shipment_run_config(shipment.id)
+        
+        async def generate_stream():
+            """Stream processing updates."""
+            try:
+                graph_input = await aresume_or_start(initial_state, config)
+                async for chunk in my_graph.astream(graph_input, config, stream_mode="updates"):
+                    result = json.dumps({"update": str(chunk)}) + '\n'
+                    yield result
+            except Exception as exc:
+                yield json.dumps({"error": str(exc)}) + '\n'
+        
+        response = Response(generate_stream(), content_type='text/event-stream')
+        # Streams last as long as the graph run; don't cut them off
+        response.timeout = None
+        return response
+        
+    except ValidationError as e:
+        return {"error": f"Invalid shipment data: {str(e)}"}, 400
+
+
+@app.route('/escalations', methods=['GET'])
+async def list_escalations():
+    """
+    List POs paused on human review.
+    Optional query parameter: shipment_id
+    """
+    shipment_id = request.args.get('shipment_id', type=int)
+    return jsonify({
+        "escalations": [
+            escalation.model_dump()
+            for escalation in await alist_pending_escalations(shipment_id)
+        ]
+    })
+
+
+@app.route('/escalations/<thread_id>/resume', methods=['POST'])
+async def resume_po_escalation(thread_id: str):
+    """
+    Resume a paused PO with the human's answer.
+    
+    Expects JSON payload:
+    {
+        "input": "approved, schedule it"
+    }
+    """
+    data = await request.get_json()
+    if not data or not data.get("input"):
+        return {"error": "Invalid input. Human input required."}, 400
+    
+    try:
+        escalation = await aget_pending_escalation(thread_id)
+    except KeyError:
+        return {"error": f"No pending escalation for thread {thread_id}"}, 404
+    
+    try:
+        po_result = await aresume_escalation(thread_id, data["input"])
+        
+        return jsonify({"success": True, **resume_result(thread_id, escalation, po_result)})
+        
+    except Exception as e:
+        return {"error": f"Processing error: {str(e)}"}, 500
+
+
+@app.route('/escalations/resume', methods=['POST'])
+async def resume_po_escalations():
+    """
+    Resume several paused POs at once; replies that need the LLM are sent
+    to it as one batched request.
+    
+    Expects JSON payload:
+    {
+        "answers": [
+            {"thread_id": "po-1001-2-PO-004", "input": "approved"},
+            {"thread_id": "po-1001-3-PO-007", "input": "still waiting"}
+        ]
+    }
+    """
+    data = await request.get_json()
+    answers = parse_answers(data)
+    if answers is None:
+        return {"error": "Invalid input. A thread_id and human input are required for every answer, each thread_id once."}, 400
+    
+    try:
+        escalations = {thread_id: await aget_pending_escalation(thread_id) for thread_id in answers}
+    except KeyError as e:
+        return {"error": f"No pending escalation for thread {e.args[0]}"}, 404
+    
+    try:
+        po_results = await aresume_escalations(answers)
+        
+        return jsonify({
+            "success": True,
+            "results": [
+                resume_result(thread_id, escalations[thread_id], po_result)
+                for thread_id, po_result in po_results.items()
+            ]
+        })
+        
+    except Exception as e:
+        return {"error": f"Processing error: {str(e)}"}, 500
+
+
+def parse_answers(data) -> dict[str, str] | None:
+    """{thread_id: input} from a batch resume payload, or None if it is malformed."""
+    answers = data.get("answers") if isinstance(data, dict) else None
+    if not answers or not isinstance(answers, list):
+        return None
+    
+    parsed = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            return None
+        thread_id, human_input = answer.get("thread_id"), answer.get("input")
+        if not (isinstance(thread_id, str) and thread_id and isinstance(human_input, str) and human_input):
+            return None
+        # Resuming one thread twice in a batch would apply only one of the answers
+        if thread_id in parsed:
+            return None
+        parsed[thread_id] = human_input
+    return parsed
+
+
+def resume_result(thread_id: str, escalation: PendingEscalation, po_result: dict) -> dict:
+    """Response fields for a resumed PO."""
+    return {
+        "thread_id": thread_id,
+        "shipment_id": escalation.shipment_id,
+        "stop_id": escalation.stop_id,
+        "po": po_result["po"].model_dump(mode="json"),
+        "processing_result": po_result["processing_result"],
+        "needs_review": po_result["needs_review"],
+        "escalation_message": po_result["escalation_message"],
+        "pending": "__interrupt__" in po_result
+    }
+
+
+@app.route('/health', methods=['GET'])
+async def health():
+    """Health check endpoint."""
+    # The durable checkpointer counts threads with SQLite queries, so stats are read off the event loop
+    po_checkpointer_stats = await asyncio.to_thread(po_checkpointer.stats)
+    return jsonify({
+        "status": "healthy",
+        "service": "shipment-processor",
+        "async_po_runs": async_po_run_stats(),
+        "po_checkpointer": po_checkpointer_stats,
+        "llm_cache": llm_response_cache.stats(),
+        "llm_batcher": llm_batcher.stats(),
+        "llm_governor": llm_governor.stats(),
+        "llm_http_pool": llm_http_clients.stats(),
+        "escalation_decisions": escalation_decision_engine.stats()
+    })
+
+
+if __name__ == "__main__":
+    print('Start Quart server')
+    app.run(host="0.0.0.0", port=5001, debug=True)
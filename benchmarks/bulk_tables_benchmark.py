@@ -0,0 +1,99 @@
+"""
+Columnar shipment import/export benchmark
+
+Writes synthetic shipments as shipment tables (Parquet and Arrow IPC) and
+as JSON lines (one shipment document per line, as /process-shipment takes
+them), then rebuilds every Shipment from each. Reports file size, write and
+rebuild time, and the peak Python heap while streaming through all
+shipments (tracemalloc).
+
+    uv run python -m benchmarks.bulk_tables_benchmark --shipments 10000 --pos 50
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import build_shipment
+from src.agents.shipment_loader import load_shipment
+from src.agents.shipment_tables import read_shipments, write_shipment_tables
+
+
+def synthetic_shipments(count: int, po_count: int):
+    for shipment_id in range(1, count + 1):
+        yield build_shipment(po_count, stop_count=5, shipment_id=shipment_id, seed=shipment_id)
+
+
+def write_json_lines(shipments, path: Path) -> int:
+    count = 0
+    with open(path, "wb") as file:
+        for shipment in shipments:
+            file.write(shipment.model_dump_json().encode() + b"\n")
+            count += 1
+    return count
+
+
+def read_json_lines(path: Path):
+    with open(path, "rb") as file:
+        for line in file:
+            yield load_shipment(line)
+
+
+def directory_size(path: Path) -> int:
+    return path.stat().st_size if path.is_file() else sum(child.stat().st_size for child in path.iterdir())
+
+
+def timed(shipments) -> tuple[int, float]:
+    """Consume shipments one at a time; returns (count, seconds)."""
+    start = time.perf_counter()
+    count = sum(1 for _ in shipments)
+    return count, time.perf_counter() - start
+
+
+def peak_heap(shipments) -> int:
+    """Peak heap while consuming shipments (a separate pass: tracemalloc slows allocation)."""
+    tracemalloc.start()
+    for _ in shipments:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(shipment_count: int, po_count: int):
+    print(f"{shipment_count} shipments x {po_count} POs")
+    print(f"{'format':>8} {'size':>10} {'write s':>8} {'rebuild s':>10} {'shipments/s':>12} {'peak heap':>10}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        targets = {
+            "parquet": Path(workdir, "parquet"),
+            "arrow": Path(workdir, "arrow"),
+            "jsonl": Path(workdir, "shipments.jsonl")
+        }
+
+        for name, path in targets.items():
+            start = time.perf_counter()
+            if name == "jsonl":
+                write_json_lines(synthetic_shipments(shipment_count, po_count), path)
+            else:
+                write_shipment_tables(synthetic_shipments(shipment_count, po_count), path, name)
+            write_seconds = time.perf_counter() - start
+
+            reader = read_json_lines if name == "jsonl" else read_shipments
+            count, seconds = timed(reader(path))
+            peak = peak_heap(reader(path))
+            assert count == shipment_count
+
+            print(
+                f"{name:>8} {directory_size(path) / 1e6:>8.2f}MB {write_seconds:>8.2f} {seconds:>10.2f}"
+                f" {count / seconds:>12.0f} {peak / 1e6:>8.2f}MB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark columnar shipment import/export")
+    parser.add_argument("--shipments", type=int, default=10_000)
+    parser.add_argument("--pos", type=int, default=50, help="POs per shipment")
+    args = parser.parse_args()
+    run(args.shipments, args.pos)
@@ -0,0 +1,67 @@
+"""
+Compact shipment representation benchmark
+
+Loads a shipment JSON document (as the API receives it) for increasing PO
+counts and reports the Python heap retained per PO (tracemalloc) by:
+- pydantic: the Shipment model from load_shipment
+- compact: CompactShipment.from_model of it, with the model released
+Also reports both conversion times and checks that the round trip
+reproduces the model.
+
+    uv run python -m benchmarks.compact_model_benchmark --pos 1000 10000 50000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.synthetic import build_shipment
+from src.agents.compact_model import CompactShipment
+from src.agents.shipment_loader import load_shipment
+
+
+def retained_bytes(build) -> tuple[int, object]:
+    """Heap still allocated after build() returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def load_compact(raw: bytes) -> CompactShipment:
+    # The model is dropped once converted; only the compact copy is retained
+    return CompactShipment.from_model(load_shipment(raw))
+
+
+def run(po_counts: list[int]):
+    print(f"{'POs':>7} {'pydantic B/PO':>14} {'compact B/PO':>13} {'from_model s':>13} {'to_model s':>11}")
+    
+    for po_count in po_counts:
+        raw = build_shipment(po_count).model_dump_json().encode()
+        
+        model_bytes, shipment = retained_bytes(lambda: load_shipment(raw))
+        compact_bytes, _ = retained_bytes(lambda: load_compact(raw))
+        
+        start = time.perf_counter()
+        compact = CompactShipment.from_model(shipment)
+        from_model_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        round_trip = compact.to_model()
+        to_model_seconds = time.perf_counter() - start
+        
+        assert round_trip.model_dump() == shipment.model_dump()
+        print(
+            f"{po_count:>7} {model_bytes / po_count:>14.0f} {compact_bytes / po_count:>13.0f}"
+            f" {from_model_seconds:>13.3f} {to_model_seconds:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compact shipment representation")
+    parser.add_argument("--pos", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    run(args.pos)
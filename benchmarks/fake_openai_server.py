@@ -0,0 +1,183 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint
+
+Answers POST /v1/chat/completions with structured escalation decisions
+(single or numbered batch, per the request's json_schema response format)
+after a fixed latency, and throttles like a provider:
+- More than rpm requests in any 60s window -> HTTP 429 with Retry-After
+- More than max_concurrency requests in flight -> HTTP 429
+GET /stats reports requests, 429s, peak concurrency and TCP connections opened.
+
+    uv run python -m benchmarks.fake_openai_server --port 8765 --rpm 600
+"""
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+
+REPLY = re.compile(r"Reply: (.*)")
+REQUEST = re.compile(r"### Request (\d+)\n(.*?)(?=\n\n### Request|\Z)", re.S)
+
+
+def decide(prompt: str) -> dict:
+    """Deterministic EscalationDecision for a review prompt."""
+    match = REPLY.search(prompt)
+    reply = (match.group(1) if match else "").lower()
+    if re.search(r"\b(approved?|ok|yes|schedule)\b", reply):
+        return {"po_state": "SCHEDULED", "escalation_reason": None}
+    if "wait" in reply:
+        return {"po_state": "PENDING", "escalation_reason": None}
+    return {"po_state": "ESCALATED", "escalation_reason": f"Human reply: {reply}"}
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, *, latency: float, rpm: int | None, max_concurrency: int | None):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency = latency
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self.lock = threading.Lock()
+        self.request_times: deque = deque()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.connections = 0
+
+    def admit(self) -> float | None:
+        """None if admitted, otherwise the Retry-After seconds for a 429."""
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            while self.request_times and now - self.request_times[0] >= 60:
+                self.request_times.popleft()
+            
+            if self.rpm and len(self.request_times) >= self.rpm:
+                self.throttled += 1
+                return 60 - (now - self.request_times[0])
+            if self.max_concurrency and self.in_flight >= self.max_concurrency:
+                self.throttled += 1
+                return 1.0
+            
+            self.request_times.append(now)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return None
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "peak_in_flight": self.peak_in_flight,
+                "connections": self.connections
+            }
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send(200, self.server.stats())
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+        
+        retry_after = self.server.admit()
+        if retry_after is not None:
+            self._send(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                {"Retry-After": f"{retry_after:.2f}"}
+            )
+            return
+        
+        try:
+            time.sleep(self.server.latency)
+            self._send(200, self._completion(body))
+        finally:
+            self.server.release()
+
+    def _completion(self, body: dict) -> dict:
+        prompt = body["messages"][-1]["content"]
+        schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name", "")
+        if schema_name.endswith("Batch"):
+            content = {"answers": [
+                {"request": int(number), **decide(section)}
+                for number, section in REQUEST.findall(prompt)
+            ]}
+        else:
+            content = decide(prompt)
+        
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(content)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 16, "total_tokens": len(prompt) // 4 + 16}
+        }
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(port: int = 0, *, latency: float = 0.05, rpm: int | None = None, max_concurrency: int | None = None) -> FakeOpenAIServer:
+    """Start the fake server on a daemon thread; its base URL is http://127.0.0.1:<server.server_port>/v1."""
+    server = FakeOpenAIServer(("127.0.0.1", port), latency=latency, rpm=rpm, max_concurrency=max_concurrency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per completion")
+    parser.add_argument("--rpm", type=int, default=None, help="Requests per minute before 429s")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="In-flight requests before 429s")
+    args = parser.parse_args()
+    
+    server = FakeOpenAIServer(
+        ("127.0.0.1", args.port),
+        latency=args.latency,
+        rpm=args.rpm,
+        max_concurrency=args.max_concurrency
+    )
+    print(f"Fake OpenAI server on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
@@ -0,0 +1,86 @@
+"""
+Cold start import-time check
+
+Imports each entry point in a fresh interpreter (without provider
+credentials, as a worker that has not escalated yet) and compares its
+import time with a baseline import of the framework every entry point
+needs (langgraph.graph, which pulls in langchain_core). Absolute import
+times depend on the machine and disk cache, so the budget is a multiple
+of the baseline measured in the same run:
+- Fails when an entry point takes longer than budget-ratio x baseline
+- Fails if a deferred dependency (chat model provider SDK, SQLAlchemy)
+  was imported (`python -X importtime`)
+Each import is timed repeat times and the fastest run counts.
+
+    uv run python -m benchmarks.import_time_check --budget-ratio 2
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must stay off the cold start path in the default configuration
+DEFERRED_MODULES = ("langchain_openai", "openai", "sqlalchemy")
+
+# Framework import every entry point pays for; the budget is relative to it
+BASELINE_MODULE = "langgraph.graph"
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """Wall-clock import time of module (ms) and the deferred modules it pulled in."""
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    code = f"import time; start = time.perf_counter(); import {module}; print((time.perf_counter() - start) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True
+    )
+    # Entry points may print while importing; the timing is the last line
+    import_ms = float(result.stdout.splitlines()[-1])
+    
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split("|"))
+        if cumulative.isdigit():
+            loaded.add(name)
+    
+    deferred = sorted(
+        name for name in loaded
+        if any(name == prefix or name.startswith(f"{prefix}.") for prefix in DEFERRED_MODULES)
+    )
+    return import_ms, deferred
+
+
+def fastest(module: str, repeat: int) -> tuple[float, list[str]]:
+    """Fastest of repeat measurements (deferred modules are the same every run)."""
+    runs = [measure(module) for _ in range(repeat)]
+    return min(import_ms for import_ms, _ in runs), runs[0][1]
+
+
+def run(modules: list[str], budget_ratio: float, repeat: int) -> bool:
+    baseline_ms, _ = fastest(BASELINE_MODULE, repeat)
+    budget_ms = baseline_ms * budget_ratio
+    print(f"Baseline: import {BASELINE_MODULE} {baseline_ms:.0f} ms, budget {budget_ratio:g} x baseline = {budget_ms:.0f} ms\n")
+    print(f"{'module':>26} {'import ms':>10} {'x baseline':>10}  deferred modules loaded")
+    
+    ok = True
+    for module in modules:
+        import_ms, deferred = fastest(module, repeat)
+        within = import_ms <= budget_ms and not deferred
+        ok = ok and within
+        print(f"{module:>26} {import_ms:>10.0f} {import_ms / baseline_ms:>10.2f}  {', '.join(deferred) or '-'}  {'✓' if within else '✗'}")
+    
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check cold start import time against a budget")
+    parser.add_argument("--modules", nargs="+", default=["src.agents.graph_builder", "main", "app"])
+    parser.add_argument("--budget-ratio", type=float, default=2.0, help=f"Import time allowed per module, as a multiple of importing {BASELINE_MODULE}")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed imports per module (the fastest counts)")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.modules, args.budget_ratio, args.repeat) else 1)
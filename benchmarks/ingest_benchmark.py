@@ -0,0 +1,106 @@
+"""
+Shipment JSON ingest benchmark
+
+Turns a shipment JSON document (as an API request body or sample file holds
+it) into a Shipment three ways, for increasing PO counts:
+- dict: json.loads, then Shipment(**data) (the former API handler path)
+- fields: json.loads, then models built field by field (the former main.py path)
+- direct: load_shipment, JSON-mode validation of the bytes (no intermediate dict)
+
+Reports the best latency over --repeat runs and the peak Python heap
+allocated during one run (tracemalloc; the final Shipment is included).
+
+    uv run python -m benchmarks.ingest_benchmark --pos 1000 10000 50000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import build_shipment
+from src.agents.model import PoState, PurchaseOrder, Shipment, ShipmentStatus, Stop, StopType
+from src.agents.shipment_loader import load_shipment
+
+
+def load_via_dict(raw: bytes) -> Shipment:
+    data = json.loads(raw)
+    return Shipment(**data)
+
+
+def load_field_by_field(raw: bytes) -> Shipment:
+    data = json.loads(raw)
+    stops = [
+        Stop(
+            id=stop_data["id"],
+            shipment_id=stop_data["shipment_id"],
+            type=StopType(stop_data["type"]),
+            is_escalated=stop_data["is_escalated"],
+            escalation_reason=stop_data.get("escalation_reason"),
+            po_list=[
+                PurchaseOrder(
+                    po_num=po["po_num"],
+                    po_state=PoState(po["po_state"]),
+                    is_escalated=po["is_escalated"],
+                    escalation_reason=po.get("escalation_reason")
+                )
+                for po in stop_data["po_list"]
+            ]
+        )
+        for stop_data in data["stops"]
+    ]
+    return Shipment(
+        id=data["id"],
+        tms_id=data["tms_id"],
+        bol_num=data["bol_num"],
+        status=ShipmentStatus(data["status"]),
+        stops=stops
+    )
+
+
+LOADERS = {
+    "dict": load_via_dict,
+    "fields": load_field_by_field,
+    "direct": load_shipment
+}
+
+
+def best_seconds(loader, raw: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(raw)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_bytes(loader, raw: bytes) -> int:
+    tracemalloc.start()
+    try:
+        shipment = loader(raw)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del shipment
+    return peak
+
+
+def run(po_counts: list[int], repeat: int):
+    print(f"{'POs':>8} {'payload':>10} {'loader':>8} {'best ms':>9} {'peak heap':>11}")
+
+    for po_count in po_counts:
+        raw = build_shipment(po_count).model_dump_json().encode()
+        reference = load_shipment(raw)
+
+        for name, loader in LOADERS.items():
+            assert loader(raw) == reference
+            seconds = best_seconds(loader, raw, repeat)
+            peak = peak_bytes(loader, raw)
+            print(f"{po_count:>8} {len(raw) / 1e6:>8.2f}MB {name:>8} {seconds * 1000:>9.1f} {peak / 1e6:>9.2f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark shipment JSON ingest")
+    parser.add_argument("--pos", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.pos, args.repeat)
@@ -0,0 +1,84 @@
+"""
+Chat model HTTP pool benchmark
+
+Sends escalation decisions to the local fake OpenAI-compatible server with
+the shared pooled client (keep-alive) and with keep-alive disabled (a new
+connection per request), sync from a thread pool and async on one event
+loop, and reports throughput and connections opened.
+
+    uv run python -m benchmarks.llm_http_pool_benchmark --calls 500 --concurrency 16
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import time
+
+from langchain.chat_models import init_chat_model
+
+from benchmarks.fake_openai_server import start_server
+from src.agents.model import EscalationDecision
+from src.chat.service.llm_http_client import LLMHttpClients
+
+
+def build_clients(keepalive: bool, concurrency: int, http2: bool) -> LLMHttpClients:
+    return LLMHttpClients(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency if keepalive else 0,
+        keepalive_expiry=30.0 if keepalive else 0.0,
+        connect_timeout=5.0,
+        read_timeout=30.0,
+        write_timeout=10.0,
+        pool_timeout=30.0,
+        http2=http2
+    )
+
+
+def run(calls: int, concurrency: int, latency: float, http2: bool):
+    print(f"{'mode':>8} {'pool':>10} {'calls/s':>9} {'connections opened':>19}")
+    
+    for mode in ("sync", "async"):
+        for keepalive in (False, True):
+            server = start_server(latency=latency)
+            clients = build_clients(keepalive, concurrency, http2)
+            model = init_chat_model(
+                "openai:gpt-4o-mini",
+                base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                api_key="fake",
+                max_retries=0,
+                http_client=clients.client,
+                http_async_client=clients.async_client
+            ).with_structured_output(EscalationDecision)
+            messages = [{"role": "user", "content": "PO-1\nReply: approved"}]
+            
+            start = time.perf_counter()
+            if mode == "sync":
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    list(executor.map(lambda _: model.invoke(messages), range(calls)))
+            else:
+                async def run_async():
+                    semaphore = asyncio.Semaphore(concurrency)
+                    
+                    async def one():
+                        async with semaphore:
+                            await model.ainvoke(messages)
+                    
+                    await asyncio.gather(*(one() for _ in range(calls)))
+                    await clients.aclose()
+                
+                asyncio.run(run_async())
+            seconds = time.perf_counter() - start
+            
+            pool = "keep-alive" if keepalive else "no reuse"
+            print(f"{mode:>8} {pool:>10} {calls / seconds:>9.1f} {server.stats()['connections']:>19}")
+            clients.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pooled chat model HTTP client")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake provider seconds per completion")
+    parser.add_argument("--http2", action="store_true", help="Negotiate HTTP/2 (the fake server speaks HTTP/1.1 only)")
+    args = parser.parse_args()
+    run(args.calls, args.concurrency, args.latency, args.http2)
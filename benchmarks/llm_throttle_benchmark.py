@@ -0,0 +1,79 @@
+"""
+Chat model throttling benchmark
+
+Fires concurrent escalation decisions at the local fake OpenAI server
+(which enforces its own request and concurrency limits) once straight
+through the client and once through LLMGovernor, and reports completed
+calls, failures and the 429s the server handed out.
+
+    uv run python -m benchmarks.llm_throttle_benchmark --calls 200 --threads 32
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import time
+
+from langchain.chat_models import init_chat_model
+
+from benchmarks.fake_openai_server import start_server
+from src.agents.model import EscalationDecision
+from src.chat.service.llm_rate_limiter import LLMGovernor
+
+
+def run_calls(fn, calls: int, threads: int) -> tuple[int, int, float]:
+    """(succeeded, failed, seconds) for calls spread over a thread pool."""
+    def one(number):
+        try:
+            fn(number)
+            return True
+        except Exception:
+            return False
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(one, range(calls)))
+    return sum(results), results.count(False), time.perf_counter() - start
+
+
+def run(calls: int, threads: int, server_rpm: int, server_concurrency: int, latency: float):
+    print(f"{'mode':>10} {'ok':>6} {'failed':>7} {'429s':>6} {'seconds':>8}")
+    
+    for mode in ("direct", "governed"):
+        server = start_server(latency=latency, rpm=server_rpm, max_concurrency=server_concurrency)
+        model = init_chat_model(
+            "openai:gpt-4o-mini",
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            api_key="fake",
+            max_retries=0
+        ).with_structured_output(EscalationDecision)
+        
+        def decide(number):
+            return model.invoke([{"role": "user", "content": f"PO-{number}\nReply: approved"}], max_tokens=64)
+        
+        if mode == "governed":
+            governor = LLMGovernor(
+                requests_per_minute=server_rpm,
+                tokens_per_minute=None,
+                max_concurrency=threads,
+                retry_base_seconds=0.1,
+                retry_max_seconds=2.0
+            )
+            call = lambda number: governor.call(lambda: decide(number), tokens=80)
+        else:
+            call = decide
+        
+        ok, failed, seconds = run_calls(call, calls, threads)
+        print(f"{mode:>10} {ok:>6} {failed:>7} {server.stats()['throttled']:>6} {seconds:>8.2f}")
+        if mode == "governed":
+            print(f"governor: {governor.stats()}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chat model throttling against a fake provider")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--server-rpm", type=int, default=1200, help="Fake provider requests per minute")
+    parser.add_argument("--server-concurrency", type=int, default=8, help="Fake provider in-flight limit")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake provider seconds per completion")
+    args = parser.parse_args()
+    run(args.calls, args.threads, args.server_rpm, args.server_concurrency, args.latency)
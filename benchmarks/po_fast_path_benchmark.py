@@ -0,0 +1,62 @@
+"""
+PO fast path benchmark
+
+Runs synthetic shipments (about 5% ESCALATED POs) through the sequential
+shipment graph with the bulk fast path on and off, with the simulated
+per-PO work set to zero so only graph overhead is measured. Reports run
+time and how many PO subgraph runs the worker pool completed. Escalated
+POs pause for human review in both modes (no LLM is called).
+
+    uv run python -m benchmarks.po_fast_path_benchmark --pos 100 1000 5000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.synthetic import build_shipment
+from src.config import Config
+from src.agents.graph_builder import sequential_shipment_graph
+from src.agents.po_worker_pool import po_worker_pool
+
+
+def run_once(po_count: int, shipment_id: int) -> tuple[float, int]:
+    """(seconds, PO subgraph runs) for one shipment."""
+    shipment = build_shipment(po_count, shipment_id=shipment_id)
+    initial_state = {
+        "shipment": shipment,
+        "current_stop_index": 0,
+        "stop_results": {},
+        "processing_complete": False
+    }
+    config = {"configurable": {"thread_id": f"fast-path-benchmark-{shipment_id}"}, "recursion_limit": 200}
+    completed = po_worker_pool.stats()["completed"]
+    
+    start = time.perf_counter()
+    # The nodes print per stop and PO; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        final_state = sequential_shipment_graph.invoke(initial_state, config)
+    seconds = time.perf_counter() - start
+    
+    assert final_state["processing_complete"]
+    return seconds, po_worker_pool.stats()["completed"] - completed
+
+
+def run(po_counts: list[int]):
+    Config.po_simulated_work_seconds = (0.0, 0.0)
+    print(f"{'POs':>7} {'fast path':>10} {'seconds':>9} {'PO subgraph runs':>17}")
+    
+    shipment_id = 1
+    for po_count in po_counts:
+        for fast_path in (False, True):
+            Config.po_fast_path = fast_path
+            seconds, subgraph_runs = run_once(po_count, shipment_id)
+            shipment_id += 1
+            print(f"{po_count:>7} {'on' if fast_path else 'off':>10} {seconds:>9.2f} {subgraph_runs:>17}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bulk fast path for non-escalated POs")
+    parser.add_argument("--pos", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+    run(args.pos)
@@ -0,0 +1,66 @@
+"""
+Checkpoint serializer benchmark
+
+Compares ShipmentSerializer against langgraph's default JsonPlusSerializer on
+the ShipmentState a checkpoint holds, for increasing PO counts.
+
+    uv run python -m benchmarks.serde_benchmark --pos 100 1000 10000
+"""
+import argparse
+import time
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from benchmarks.synthetic import build_shipment
+from src.agents.serde import ShipmentSerializer
+
+
+def build_state(po_count: int) -> dict:
+    """A ShipmentState as checkpointed mid-run (all stops processed)."""
+    shipment = build_shipment(po_count)
+    return {
+        "shipment": shipment,
+        "current_stop_index": len(shipment.stops),
+        "stop_results": {
+            stop.id: {po.po_num: po.po_state.value for po in stop.po_list}
+            for stop in shipment.stops
+        },
+        "processing_complete": True
+    }
+
+
+def time_per_call(fn, repeat: int) -> float:
+    """Best-of-three average seconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def run(po_counts: list[int], repeat: int):
+    serializers = {
+        "jsonplus": JsonPlusSerializer(),
+        "compact": ShipmentSerializer()
+    }
+    
+    print(f"{'POs':>8} {'serde':>10} {'bytes':>12} {'encode ms':>10} {'decode ms':>10}")
+    for po_count in po_counts:
+        state = build_state(po_count)
+        for name, serde in serializers.items():
+            typed = serde.dumps_typed(state)
+            assert serde.loads_typed(typed) == state, f"{name} round trip failed"
+            
+            encode = time_per_call(lambda: serde.dumps_typed(state), repeat)
+            decode = time_per_call(lambda: serde.loads_typed(typed), repeat)
+            print(f"{po_count:>8} {name:>10} {len(typed[1]):>12,} {encode * 1000:>10.3f} {decode * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark checkpoint serializers")
+    parser.add_argument("--pos", type=int, nargs="+", default=[100, 1_000, 10_000], help="PO counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per timing run")
+    args = parser.parse_args()
+    run(args.pos, args.repeat)
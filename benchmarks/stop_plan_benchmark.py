@@ -0,0 +1,69 @@
+"""
+Stop execution plan benchmark
+
+Runs long milk-run shipments (PICK_UP stops with a DROP_OFF of SCHEDULED
+POs every --drop-off-every stops) through the sequential shipment graph
+with the execution plan on and off. Reports run time and the graph steps
+(node updates in the stream) per shipment.
+
+    uv run python -m benchmarks.stop_plan_benchmark --stops 20 100 500
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.synthetic import build_milk_run
+from src.config import Config
+from src.agents.graph_builder import sequential_shipment_graph
+
+
+def run_once(stop_count: int, drop_off_every: int, shipment_id: int) -> tuple[float, int]:
+    """(seconds, graph steps) for one shipment."""
+    shipment = build_milk_run(stop_count, drop_off_every, shipment_id=shipment_id)
+    initial_state = {
+        "shipment": shipment,
+        "current_stop_index": 0,
+        "stop_results": {},
+        "processing_complete": False
+    }
+    # Without the plan every stop takes two steps (stop_invoker, next_stop)
+    config = {
+        "configurable": {"thread_id": f"stop-plan-benchmark-{shipment_id}"},
+        "recursion_limit": 2 * stop_count + 10
+    }
+    
+    steps = 0
+    final_state = None
+    start = time.perf_counter()
+    # The nodes print per stop and PO; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode, chunk in sequential_shipment_graph.stream(initial_state, config, stream_mode=["updates", "values"]):
+            if mode == "updates":
+                steps += 1
+            else:
+                final_state = chunk
+    seconds = time.perf_counter() - start
+    
+    assert final_state["processing_complete"] and len(final_state["stop_results"]) == stop_count
+    return seconds, steps
+
+
+def run(stop_counts: list[int], drop_off_every: int):
+    print(f"{'stops':>6} {'plan':>5} {'seconds':>9} {'graph steps':>12}")
+    
+    shipment_id = 1
+    for stop_count in stop_counts:
+        for execution_plan in (False, True):
+            Config.stop_execution_plan = execution_plan
+            seconds, steps = run_once(stop_count, drop_off_every, shipment_id)
+            shipment_id += 1
+            print(f"{stop_count:>6} {'on' if execution_plan else 'off':>5} {seconds:>9.2f} {steps:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stop execution plan on milk-run shipments")
+    parser.add_argument("--stops", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--drop-off-every", type=int, default=10, help="Every n-th stop is a DROP_OFF")
+    args = parser.parse_args()
+    run(args.stops, args.drop_off_every)
@@ -0,0 +1,71 @@
+"""
+Stop PO write-back benchmark
+
+Writes every processed PO of one stop back into stop.po_list, for
+increasing PO counts:
+- scan: a linear search of po_list per processed PO (the former
+  stop_processor_node / rollup write-back, O(n²) per stop)
+- replace_pos: Stop.replace_pos, one po_num index lookup per PO
+
+    uv run python -m benchmarks.stop_writeback_benchmark --pos 1000 5000 10000
+"""
+import argparse
+import time
+
+from src.agents.model import PoState, PurchaseOrder, Stop, StopType
+
+
+def build_stop(po_count: int) -> Stop:
+    return Stop(
+        id=1,
+        shipment_id=1,
+        type=StopType.DROP_OFF,
+        is_escalated=False,
+        po_list=[
+            PurchaseOrder(po_num=f"PO-{po_number:06d}", po_state=PoState.PENDING, is_escalated=False)
+            for po_number in range(po_count)
+        ]
+    )
+
+
+def scan_write_back(stop: Stop, processed_pos: list[PurchaseOrder]) -> Stop:
+    po_list = list(stop.po_list)
+    for po in processed_pos:
+        for idx, stop_po in enumerate(po_list):
+            if stop_po.po_num == po.po_num:
+                po_list[idx] = po
+                break
+    return stop.replace(po_list=tuple(po_list))
+
+
+def index_write_back(stop: Stop, processed_pos: list[PurchaseOrder]) -> Stop:
+    return stop.replace_pos(processed_pos)
+
+
+WRITE_BACKS = {"scan": scan_write_back, "replace_pos": index_write_back}
+
+
+def run(po_counts: list[int]):
+    print(f"{'POs':>7} {'scan s':>9} {'replace_pos s':>14}")
+    
+    for po_count in po_counts:
+        seconds = {}
+        for name, write_back in WRITE_BACKS.items():
+            stop = build_stop(po_count)
+            # Processed in reverse so the scan pays its average cost
+            processed_pos = [
+                po.replace(po_state=PoState.SCHEDULED) for po in reversed(stop.po_list)
+            ]
+            start = time.perf_counter()
+            stop = write_back(stop, processed_pos)
+            seconds[name] = time.perf_counter() - start
+            assert all(po.po_state == PoState.SCHEDULED for po in stop.po_list)
+        
+        print(f"{po_count:>7} {seconds['scan']:>9.3f} {seconds['replace_pos']:>14.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark writing processed POs back to a stop")
+    parser.add_argument("--pos", type=int, nargs="+", default=[1000, 5000, 10000])
+    args = parser.parse_args()
+    run(args.pos)
@@ -0,0 +1,74 @@
+"""
+Synthetic shipments for benchmarks
+
+build_shipment() creates a Shipment with a PICK_UP stop followed by
+DROP_OFF stops, spreading po_count POs across them with a fixed mix of
+SCHEDULED / PENDING / ESCALATED states. build_milk_run() creates a long
+run of PICK_UP stops with a DROP_OFF every few stops.
+"""
+import random
+
+from src.agents.model import PoState, PurchaseOrder, Shipment, ShipmentStatus, Stop, StopType
+
+
+def build_shipment(po_count: int, stop_count: int = 20, shipment_id: int = 1, seed: int = 0) -> Shipment:
+    """Build a shipment with po_count POs spread over stop_count stops."""
+    rng = random.Random(seed)
+    drop_off_count = max(stop_count - 1, 1)
+    drop_off_pos = [[] for _ in range(drop_off_count)]
+    
+    for po_number in range(po_count):
+        po_state = rng.choices(
+            [PoState.SCHEDULED, PoState.PENDING, PoState.ESCALATED],
+            weights=[80, 15, 5]
+        )[0]
+        is_escalated = po_state == PoState.ESCALATED
+        po = PurchaseOrder(
+            po_num=f"PO-{shipment_id}-{po_number:06d}",
+            po_state=po_state,
+            is_escalated=is_escalated,
+            escalation_reason="Delivery appointment needs confirmation" if is_escalated else None
+        )
+        drop_off_pos[po_number % drop_off_count].append(po)
+    
+    # Stops are frozen, so each is built with its complete PO list
+    stops = [
+        Stop(id=1, shipment_id=shipment_id, type=StopType.PICK_UP, is_escalated=False)
+    ]
+    for stop_number, po_list in enumerate(drop_off_pos):
+        stops.append(
+            Stop(id=stop_number + 2, shipment_id=shipment_id, type=StopType.DROP_OFF, is_escalated=False, po_list=po_list)
+        )
+    
+    return Shipment(
+        id=shipment_id,
+        tms_id=f"TMS-{shipment_id:06d}",
+        bol_num=f"BOL-{shipment_id:06d}",
+        status=ShipmentStatus.NEW,
+        stops=stops
+    )
+
+
+def build_milk_run(stop_count: int, drop_off_every: int = 10, pos_per_drop_off: int = 5, shipment_id: int = 1) -> Shipment:
+    """Build a long milk run: mostly PICK_UP stops, every drop_off_every-th stop a DROP_OFF with SCHEDULED POs."""
+    stops = []
+    for stop_number in range(stop_count):
+        stop_id = stop_number + 1
+        if stop_id % drop_off_every:
+            stops.append(Stop(id=stop_id, shipment_id=shipment_id, type=StopType.PICK_UP, is_escalated=False))
+            continue
+        po_list = [
+            PurchaseOrder(po_num=f"PO-{shipment_id}-{stop_id}-{po_number}", po_state=PoState.SCHEDULED, is_escalated=False)
+            for po_number in range(pos_per_drop_off)
+        ]
+        stops.append(
+            Stop(id=stop_id, shipment_id=shipment_id, type=StopType.DROP_OFF, is_escalated=False, po_list=po_list)
+        )
+    
+    return Shipment(
+        id=shipment_id,
+        tms_id=f"TMS-{shipment_id:06d}",
+        bol_num=f"BOL-{shipment_id:06d}",
+        status=ShipmentStatus.NEW,
+        stops=stops
+    )
@@ -8,14 +8,23 @@ This demonstrates:
 - Human-in-the-loop for escalation resolution
 - Partial state changes at Stop and PO levels
 """
-import json
+import argparse
+import asyncio
 import uuid
 from pathlib import Path
 from dotenv import load_dotenv
 
-from src.agents.graph_builder import my_graph
-from src.agents.model import Shipment, Stop, PurchaseOrder, ShipmentStatus, StopType, PoState
-from src.util.mermaid import create_mermaid_diagram_files
+from src.agents.graph_builder import my_graph, shipment_run_config, resume_or_start, aresume_or_start
+from src.agents.escalation_service import (
+    list_pending_escalations,
+    resume_escalations,
+    aresume_escalations,
+    resolved_pos_update
+)
+from src.agents import merge_dicts, merge_stops
+from src.agents.model import Shipment
+from src.agents.shipment_loader import load_shipment_file
+from src.util.mermaid import refresh_mermaid_diagram_files
 
 load_dotenv()
 
@@ -24,44 +33,20 @@ def create_sample_shipment() -> Shipment:
     """
     Create a sample shipment from sample_shipment.json file.
     """
-    # Load the JSON file
-    json_path = Path(__file__).parent / "sample_shipment.json"
-    with open(json_path, "r") as f:
-        data = json.load(f)
-    
-    # Parse PurchaseOrders for each stop
-    stops = []
-    for stop_data in data["stops"]:
-        po_list = [
-            PurchaseOrder(
-                po_num=po["po_num"],
-                po_state=PoState(po["po_state"]),
-                is_escalated=po["is_escalated"],
-                escalation_reason=po.get("escalation_reason")
-            )
-            for po in stop_data["po_list"]
-        ]
-        
-        stop = Stop(
-            id=stop_data["id"],
-            shipment_id=stop_data["shipment_id"],
-            type=StopType(stop_data["type"]),
-            is_escalated=stop_data["is_escalated"],
-            escalation_reason=stop_data.get("escalation_reason"),
-            po_list=po_list
-        )
-        stops.append(stop)
-    
-    # Create the shipment
-    shipment = Shipment(
-        id=data["id"],
-        tms_id=data["tms_id"],
-        bol_num=data["bol_num"],
-        status=ShipmentStatus(data["status"]),
-        stops=stops
-    )
-    
-    return shipment
+    # Validate the JSON file straight into the Shipment model
+    return load_shipment_file(Path(__file__).parent / "sample_shipment.json")
+
+
+def create_initial_state() -> dict:
+    """
+    Create the initial graph state for the sample shipment.
+    """
+    return {
+        "shipment": create_sample_shipment(),
+        "current_stop_index": 0,
+        "stop_results": {},
+        "processing_complete": False
+    }
 
 
 def run_shipment_processing():
@@ -72,21 +57,79 @@ def run_shipment_processing():
     print("LANGGRAPH SHIPMENT PROCESSING TUTORIAL")
     print("="*70)
     
-    # Create sample shipment
-    shipment = create_sample_shipment()
+    # Run the graph (resuming an unfinished checkpointed run of this shipment)
+    initial_state = create_initial_state()
+    config = shipment_run_config(initial_state["shipment"].id)
+    final_state = my_graph.invoke(resume_or_start(initial_state, config), config)
     
-    # Initialize state
-    initial_state = {
-        "shipment": shipment,
-        "current_stop_index": 0,
-        "stop_results": {},
-        "processing_complete": False
-    }
+    # Answer escalations that paused for human review (each round is resumed as one batch)
+    for answers in prompt_for_escalations(final_state):
+        po_results = resume_escalations({escalation.thread_id: raw_input for escalation, raw_input in answers})
+        apply_resolved_pos(final_state, [
+            (escalation.stop_id, po_results[escalation.thread_id]) for escalation, _ in answers
+        ])
+    
+    print_results(final_state)
+
+
+async def arun_shipment_processing():
+    """
+    Run the shipment processing workflow on the native asyncio path.
+    """
+    print("\n" + "="*70)
+    print("LANGGRAPH SHIPMENT PROCESSING TUTORIAL (async)")
+    print("="*70)
+    
+    # Run the graph (resuming an unfinished checkpointed run of this shipment)
+    initial_state = create_initial_state()
+    config = shipment_run_config(initial_state["shipment"].id)
+    final_state = await my_graph.ainvoke(await aresume_or_start(initial_state, config), config)
+    
+    # Answer escalations that paused for human review (each round is resumed as one batch)
+    for answers in prompt_for_escalations(final_state):
+        po_results = await aresume_escalations({escalation.thread_id: raw_input for escalation, raw_input in answers})
+        apply_resolved_pos(final_state, [
+            (escalation.stop_id, po_results[escalation.thread_id]) for escalation, _ in answers
+        ])
     
-    # Run the graph
-    final_state = my_graph.invoke(initial_state)
+    print_results(final_state)
+
+
+def prompt_for_escalations(final_state: dict):
+    """
+    Ask for console input for each pending escalation of the shipment until
+    none remain (an unacceptable answer leaves the PO pending again).
+    Yields one list of (escalation, raw_input) pairs per round for the caller to resume.
+    """
+    shipment_id = final_state['shipment'].id
     
-    # Display results
+    while pending := list_pending_escalations(shipment_id):
+        answers = []
+        for escalation in pending:
+            print(f"\n  🤖 Requesting human input for escalated PO {escalation.po_num}")
+            print(f"     Escalation reason: {escalation.escalation_reason}")
+            raw_input = input(f"  📫Enter your input (simulating email resolution): ")
+            answers.append((escalation, raw_input))
+        yield answers
+
+
+def apply_resolved_pos(final_state: dict, resolved: list[tuple[int, dict]]):
+    """
+    Write a round of resumed POs, [(stop_id, po_result)], back into the
+    final shipment state and re-roll their stops.
+    (A checkpointed shipment run gets the same update from the escalation service.)
+    """
+    update = resolved_pos_update(final_state, resolved)
+    
+    # Stops are frozen: swap the updated stops into a copy of the shipment (as the graph's reducers do)
+    final_state['shipment'] = merge_stops(final_state['shipment'], update['shipment'])
+    final_state['stop_results'] = merge_dicts(final_state['stop_results'], update['stop_results'])
+
+
+def print_results(final_state: dict):
+    """
+    Display the results of a shipment processing run.
+    """
     print("\n" + "="*70)
     print("PROCESSING COMPLETE")
     print("="*70)
@@ -110,9 +153,16 @@ def run_shipment_processing():
 
 
 if __name__ == "__main__":
-    # Generate mermaid diagram
-    create_mermaid_diagram_files()
-    print('✓ Updated mermaid diagram\n')
+    parser = argparse.ArgumentParser(description="Run the shipment processing graph on the sample shipment")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the graph with ainvoke on an asyncio event loop")
+    args = parser.parse_args()
+    
+    # Regenerate the mermaid diagram if the graph changed (a failed render does not stop the run)
+    refresh_mermaid_diagram_files()
+    print()
     
     # Run shipment processing
-    run_shipment_processing()
+    if args.use_async:
+        asyncio.run(arun_shipment_processing())
+    else:
+        run_shipment_processing()
@@ -21,6 +21,26 @@ class MessageClassifier(BaseModel):
 
 # Hierarchical state for shipment processing workflow
 
+def merge_dicts(left: dict | None, right: dict | None) -> dict:
+    """Reducer that merges keyed results written by parallel branches"""
+    return {**(left or {}), **(right or {})}
+
+
+def merge_stops(left: Shipment | None, right: Shipment | dict[int, Stop]) -> Shipment:
+    """
+    Reducer for the shipment: a Shipment replaces it, while a dict of
+    {stop index: Stop} swaps in only those stops, so stop nodes can emit
+    just the stop they processed instead of the whole shipment.
+    """
+    if left is None or isinstance(right, Shipment):
+        return right
+    
+    stops = list(left.stops)
+    for stop_index, stop in right.items():
+        stops[stop_index] = stop
+    return left.model_copy(update={"stops": stops})
+
+
 class POState(TypedDict):
     """State for individual PO processing (lowest level)"""
     po: PurchaseOrder
@@ -28,17 +48,35 @@ class POState(TypedDict):
     needs_review: bool
     escalation_message: str | None
 
+class POTask(POState):
+    """Payload sent to a PO branch when a stop's POs are fanned out"""
+    shipment_id: int  # Used by the shared PO worker pool for per-shipment fairness
+    stop_id: int  # Recorded with pending escalations so answers can be routed back
+
 class StopState(TypedDict):
     """State for stop processing (middle level)"""
     stop: Stop
-    po_results: dict[str, str]  # Maps PO number to processing result
+    po_results: Annotated[dict[str, str], merge_dicts]  # Maps PO number to processing result
+    processed_pos: Annotated[dict[str, PurchaseOrder], merge_dicts]  # Maps PO number to processed PO
+    po_escalations: Annotated[dict[str, str], merge_dicts]  # Maps PO number to escalation message
     all_pos_processed: bool
     needs_human_review: bool
     escalation_message: str | None
 
+class StopTask(TypedDict):
+    """Payload sent to a stop worker when stops are fanned out in parallel"""
+    stop_index: int
+    stop: Stop
+
+class ExecutionPlan(TypedDict):
+    """Which stops of a shipment need the stop subgraph, decided once by shipment_processor"""
+    stop_queue: list[int]  # Indexes of actionable DROP_OFF stops, in shipment order
+    settled_stops: list[int]  # IDs of stops settled in bulk (PICK_UP stops and stops without POs)
+
 class ShipmentState(TypedDict):
     """State for shipment processing (top level)"""
-    shipment: Shipment
+    shipment: Annotated[Shipment, merge_stops]  # Nodes write {stop index: Stop} for the stops they processed
     current_stop_index: int
-    stop_results: dict[int, dict[str, str]]  # Maps stop ID to its PO results
+    stop_results: Annotated[dict[int, dict[str, str]], merge_dicts]  # Maps stop ID to its PO results
     processing_complete: bool
+    execution_plan: ExecutionPlan
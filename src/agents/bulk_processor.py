@@ -0,0 +1,192 @@
+"""
+Bulk shipment processing from columnar files
+
+Reads shipments from shipment tables (see shipment_tables), runs each one
+through my_graph and writes the results as two tables in the output
+directory:
+- stop_results: shipment_id, stop_id, po_num, result (the run's stop_results)
+- po_states: final PO states, same columns as the input pos table
+
+Shipments are rebuilt lazily and at most `concurrency` runs are in flight
+on one event loop, so memory stays bounded for nightly reprocessing of
+large exports:
+- Table reads (Parquet/Arrow decoding, model validation) run in a worker
+  thread, up to `read_ahead` shipments ahead of the runs, so a freed slot
+  starts the next shipment at once
+- Read-ahead shipments with at least `compact_min_pos` POs wait as
+  CompactShipment (see compact_model) and are converted back to the
+  pydantic models when their run starts
+- A read error (e.g. orphan or unsorted rows) cancels the runs in flight
+- Escalated POs stay paused for human review, as in the API
+- Output rows are written as shipments finish (not in input order)
+
+    uv run python -m src.agents.bulk_processor INPUT_DIR OUTPUT_DIR [--concurrency 64] [--format parquet]
+"""
+from pathlib import Path
+from typing import Iterator
+import argparse
+import asyncio
+import time
+
+import pyarrow as pa
+
+from src.config import Config
+from src.agents.graph_builder import my_graph, shipment_run_config, aresume_or_start
+from src.agents.compact_model import CompactShipment
+from src.agents.model import Shipment
+from src.agents.shipment_tables import PO_SCHEMA, TableWriter, read_shipments, table_path
+
+STOP_RESULTS = "stop_results"
+PO_STATES = "po_states"
+
+STOP_RESULT_SCHEMA = pa.schema([
+    ("shipment_id", pa.int64()),
+    ("stop_id", pa.int64()),
+    ("po_num", pa.string()),
+    ("result", pa.string())
+])
+
+
+async def aprocess_shipment(shipment: Shipment) -> dict:
+    """Run one shipment through the graph (resuming an unfinished checkpointed run)."""
+    initial_state = {
+        "shipment": shipment,
+        "current_stop_index": 0,
+        "stop_results": {},
+        "processing_complete": False
+    }
+    config = shipment_run_config(shipment.id)
+    return await my_graph.ainvoke(await aresume_or_start(initial_state, config), config)
+
+
+async def aread_ahead(shipments: Iterator[Shipment], buffer: asyncio.Queue, compact_min_pos: int | None):
+    """
+    Read shipments into buffer ahead of the runs; None marks the end of the
+    input, and a read error is put into the buffer for the consumer to raise.
+    """
+    try:
+        while True:
+            shipment = await asyncio.to_thread(read_next, shipments, compact_min_pos)
+            await buffer.put(shipment)
+            if shipment is None:
+                return
+    except Exception as exc:
+        await buffer.put(exc)
+
+
+def read_next(shipments: Iterator[Shipment], compact_min_pos: int | None) -> Shipment | CompactShipment | None:
+    """The next shipment, compact if it has at least compact_min_pos POs; None at the end."""
+    shipment = next(shipments, None)
+    if shipment is None or compact_min_pos is None:
+        return shipment
+    if sum(len(stop.po_list) for stop in shipment.stops) >= compact_min_pos:
+        return CompactShipment.from_model(shipment)
+    return shipment
+
+
+def write_results(final_state: dict, results_writer: TableWriter, po_writer: TableWriter):
+    """Append a finished run's stop results and final PO states to the output tables."""
+    shipment = final_state["shipment"]
+    
+    for stop_id, po_results in final_state.get("stop_results", {}).items():
+        for po_num, result in po_results.items():
+            results_writer.append({
+                "shipment_id": shipment.id,
+                "stop_id": stop_id,
+                "po_num": po_num,
+                "result": result
+            })
+    
+    for stop in shipment.stops:
+        for po in stop.po_list:
+            po_writer.append({
+                "shipment_id": shipment.id,
+                "stop_id": stop.id,
+                "po_num": po.po_num,
+                "po_state": po.po_state.value,
+                "is_escalated": po.is_escalated,
+                "escalation_reason": po.escalation_reason
+            })
+
+
+async def aprocess_shipment_tables(
+    input_dir: str | Path,
+    output_dir: str | Path,
+    *,
+    concurrency: int = Config.bulk_concurrency,
+    format: str = "parquet",
+    read_batch_rows: int = Config.bulk_read_batch_rows,
+    read_ahead: int = Config.bulk_read_ahead,
+    compact_min_pos: int | None = Config.bulk_compact_min_pos
+) -> dict[str, int | float]:
+    """
+    Process every shipment in input_dir and write the result tables to output_dir.
+    A shipment whose run fails is reported and counted; the others continue.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks: set[asyncio.Task] = set()
+    stats = {"processed": 0, "failed": 0, "compact": 0}
+    start = time.perf_counter()
+    
+    results_writer = TableWriter(table_path(output_dir, STOP_RESULTS, format), STOP_RESULT_SCHEMA)
+    po_writer = TableWriter(table_path(output_dir, PO_STATES, format), PO_SCHEMA)
+    with results_writer, po_writer:
+        async def run_one(shipment: Shipment | CompactShipment):
+            try:
+                if isinstance(shipment, CompactShipment):
+                    stats["compact"] += 1
+                    shipment = await asyncio.to_thread(shipment.to_model)
+                final_state = await aprocess_shipment(shipment)
+                write_results(final_state, results_writer, po_writer)
+                stats["processed"] += 1
+            except Exception as exc:
+                print(f"⚠️  Shipment {shipment.id} failed: {exc}")
+                stats["failed"] += 1
+            finally:
+                semaphore.release()
+    
+        # maxsize 0 would make the buffer unbounded
+        buffer = asyncio.Queue(maxsize=max(1, read_ahead))
+        reader = asyncio.create_task(aread_ahead(read_shipments(input_dir, read_batch_rows), buffer, compact_min_pos))
+        try:
+            while True:
+                await semaphore.acquire()
+                shipment = await buffer.get()
+                if isinstance(shipment, Exception):
+                    raise shipment
+                if shipment is None:
+                    semaphore.release()
+                    break
+                task = asyncio.create_task(run_one(shipment))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except BaseException:
+            # The input cannot be read further, so the runs in flight are abandoned
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, *tasks, return_exceptions=True)
+    
+    stats["stop_results_rows"] = results_writer.rows_written
+    stats["po_rows"] = po_writer.rows_written
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process shipments from Parquet/Arrow tables through the shipment graph")
+    parser.add_argument("input_dir", help="Directory with shipments, stops and pos tables")
+    parser.add_argument("output_dir", help="Directory for the stop_results and po_states tables")
+    parser.add_argument("--concurrency", type=int, default=Config.bulk_concurrency, help="Shipments in flight at once")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet", help="Output file format")
+    args = parser.parse_args()
+    
+    stats = asyncio.run(
+        aprocess_shipment_tables(args.input_dir, args.output_dir, concurrency=args.concurrency, format=args.format)
+    )
+    print(f"\n✓ Bulk run complete: {stats}")
@@ -0,0 +1,324 @@
+"""
+Checkpointers for the shipment processing graphs
+
+BoundedMemorySaver is an in-memory checkpointer for long-running processes:
+- Threads are evicted least-recently-used first once max_threads or
+  max_bytes (serialized checkpoint, blob and write payloads) is exceeded
+- Threads idle for longer than ttl_seconds are evicted
+- Threads with a run in flight (begin_run/end_run) are never evicted
+- Threads paused on an interrupt are pinned in the same locked section
+  that stores the interrupt write. Pinned threads have their own cap
+  (max_pinned_threads) and idle TTL (pinned_ttl_seconds), and go only
+  after every unpinned thread when max_bytes is exceeded
+- stats() reports thread count, bytes held and evictions
+
+SqliteCheckpointSaver (see sqlite_checkpointer) is a durable checkpointer on
+a local SQLite file, loaded only when Config.checkpoint_db_path is set.
+
+Both use the compact ShipmentSerializer unless Config.compact_checkpoint_serde is off.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Sequence
+import threading
+import time
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.constants import INTERRUPT
+
+from src.config import Config
+from src.agents.serde import ShipmentSerializer
+
+
+@dataclass
+class ThreadUsage:
+    """Storage held by one checkpointed thread."""
+    bytes: int = 0
+    last_access: float = field(default_factory=time.monotonic)
+    blob_keys: set = field(default_factory=set)
+    write_keys: set = field(default_factory=set)
+    pinned: bool = False
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """InMemorySaver with LRU/TTL eviction and a memory cap."""
+
+    def __init__(
+        self,
+        *,
+        max_threads: int,
+        max_bytes: int,
+        ttl_seconds: float | None = None,
+        max_pinned_threads: int | None = None,
+        pinned_ttl_seconds: float | None = None,
+        serde=None
+    ):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_pinned_threads = max_threads if max_pinned_threads is None else max_pinned_threads
+        self.pinned_ttl_seconds = pinned_ttl_seconds
+        
+        # Guards the superclass storage as well as the bookkeeping below
+        self._lock = threading.RLock()
+        self._usage: dict[str, ThreadUsage] = {}
+        # Unpinned idle threads in least-recently-used order
+        self._lru: OrderedDict[str, None] = OrderedDict()
+        # Pinned idle threads in least-recently-used order
+        self._pinned_count = 0
+        self._pinned: OrderedDict[str, None] = OrderedDict()
+        # Threads with a run in flight (run count per thread); never evicted
+        self._in_flight: dict[str, int] = {}
+        self._bytes = 0
+        self._evictions = 0
+        self._pinned_evictions = 0
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            # Unknown threads stay untracked (the superclass would also add them to storage)
+            if thread_id not in self.storage:
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        # Materialized under the lock so an eviction cannot change storage mid-iteration
+        with self._lock:
+            if config is not None and config["configurable"]["thread_id"] not in self.storage:
+                return
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with self._lock:
+            saved_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = saved_config["configurable"]["thread_id"]
+            checkpoint_ns = saved_config["configurable"]["checkpoint_ns"]
+            
+            usage = self._touch(thread_id)
+            
+            # Account for the serialized checkpoint, metadata and new channel blobs
+            saved_checkpoint, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            added = len(saved_checkpoint[1]) + len(saved_metadata[1])
+            for channel, version in new_versions.items():
+                blob_key = (thread_id, checkpoint_ns, channel, version)
+                if blob_key not in usage.blob_keys:
+                    usage.blob_keys.add(blob_key)
+                    added += len(self.blobs[blob_key][1])
+            
+            self._add_bytes(usage, added)
+            self._evict(keep=thread_id)
+        
+        return saved_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        write_key = (thread_id, checkpoint_ns, checkpoint_id)
+        
+        with self._lock:
+            before = self._writes_size(write_key)
+            super().put_writes(config, writes, task_id, task_path)
+            
+            # Pinned before anything can be evicted, so a paused thread is never lost
+            if any(channel == INTERRUPT for channel, _ in writes):
+                self._pin(thread_id)
+            
+            usage = self._touch(thread_id)
+            usage.write_keys.add(write_key)
+            self._add_bytes(usage, self._writes_size(write_key) - before)
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread using its tracked keys instead of scanning all storage."""
+        with self._lock:
+            usage = self._usage.pop(thread_id, None)
+            self._lru.pop(thread_id, None)
+            self._pinned.pop(thread_id, None)
+            if usage is not None and usage.pinned:
+                self._pinned_count -= 1
+            
+            self.storage.pop(thread_id, None)
+            if usage is None:
+                # Never written (reads of unknown threads are not tracked)
+                return
+            
+            for write_key in usage.write_keys:
+                self.writes.pop(write_key, None)
+            for blob_key in usage.blob_keys:
+                self.blobs.pop(blob_key, None)
+            self._bytes -= usage.bytes
+
+    def pin(self, thread_id: str) -> None:
+        """
+        Keep a thread until it is unpinned or deleted; it is evicted only after
+        all unpinned threads, or once idle for longer than pinned_ttl_seconds.
+        Threads that store an interrupt are pinned automatically.
+        """
+        with self._lock:
+            self._pin(thread_id)
+
+    def unpin(self, thread_id: str) -> None:
+        """Make a pinned thread evictable again."""
+        with self._lock:
+            usage = self._usage.get(thread_id)
+            if usage is not None and usage.pinned:
+                usage.pinned = False
+                self._pinned_count -= 1
+                self._pinned.pop(thread_id, None)
+                self._touch(thread_id)
+
+    def interrupted_thread_ids(self) -> Sequence[str]:
+        """Threads paused on an interrupt (pinned when the interrupt was stored)."""
+        with self._lock:
+            return [thread_id for thread_id, usage in self._usage.items() if usage.pinned]
+
+    def begin_run(self, thread_id: str) -> None:
+        """Protect a thread from eviction while a run writes to it."""
+        with self._lock:
+            self._in_flight[thread_id] = self._in_flight.get(thread_id, 0) + 1
+            self._lru.pop(thread_id, None)
+            self._pinned.pop(thread_id, None)
+
+    def end_run(self, thread_id: str) -> None:
+        """Make the thread evictable again (pinned if it is paused) once its run returns."""
+        with self._lock:
+            runs = self._in_flight.pop(thread_id, 0) - 1
+            if runs > 0:
+                self._in_flight[thread_id] = runs
+            elif thread_id in self._usage:
+                self._touch(thread_id)
+                self._evict()
+
+    def stats(self) -> dict[str, int | float | None]:
+        """Snapshot of checkpoint storage held in memory."""
+        with self._lock:
+            return {
+                "threads": len(self._usage),
+                "pinned_threads": self._pinned_count,
+                "in_flight_threads": len(self._in_flight),
+                "bytes": self._bytes,
+                "evictions": self._evictions,
+                "pinned_evictions": self._pinned_evictions,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "max_pinned_threads": self.max_pinned_threads,
+                "pinned_ttl_seconds": self.pinned_ttl_seconds
+            }
+
+    def _touch(self, thread_id: str) -> ThreadUsage:
+        """Mark a thread as most recently used (caller holds the lock)."""
+        usage = self._usage.get(thread_id)
+        if usage is None:
+            usage = self._usage[thread_id] = ThreadUsage()
+        usage.last_access = time.monotonic()
+        
+        if thread_id in self._in_flight:
+            return usage
+        queue = self._pinned if usage.pinned else self._lru
+        queue[thread_id] = None
+        queue.move_to_end(thread_id)
+        return usage
+
+    def _pin(self, thread_id: str) -> None:
+        """Mark a thread as pinned (caller holds the lock)."""
+        usage = self._touch(thread_id)
+        if not usage.pinned:
+            usage.pinned = True
+            self._pinned_count += 1
+            self._lru.pop(thread_id, None)
+            self._touch(thread_id)
+
+    def _add_bytes(self, usage: ThreadUsage, added: int) -> None:
+        usage.bytes += added
+        self._bytes += added
+
+    def _writes_size(self, write_key: tuple) -> int:
+        return sum(len(write[2][1]) for write in self.writes.get(write_key, {}).values())
+
+    def _evict(self, keep: str | None = None) -> None:
+        """
+        Evict expired, then least-recently-used threads (caller holds the lock).
+        Unpinned and pinned threads are capped separately; over max_bytes,
+        pinned threads go only after every unpinned one. Threads with a run in
+        flight are in neither queue, and the thread being written (keep) is
+        never evicted by its own write.
+        """
+        self._evict_expired(self._lru, self.ttl_seconds)
+        self._evict_expired(self._pinned, self.pinned_ttl_seconds)
+        
+        over_threads = lambda: len(self._usage) - self._pinned_count > self.max_threads
+        over_pinned = lambda: self._pinned_count > self.max_pinned_threads
+        over_bytes = lambda: self._bytes > self.max_bytes
+        for queue, over_cap in ((self._lru, over_threads), (self._pinned, over_pinned)):
+            while over_cap():
+                if not self._evict_oldest(queue, keep):
+                    break
+        for queue in (self._lru, self._pinned):
+            while over_bytes():
+                if not self._evict_oldest(queue, keep):
+                    break
+
+    def _evict_oldest(self, queue: OrderedDict, keep: str | None) -> bool:
+        thread_id = next((thread_id for thread_id in queue if thread_id != keep), None)
+        if thread_id is None:
+            return False
+        self._evict_thread(thread_id)
+        return True
+
+    def _evict_expired(self, queue: OrderedDict, ttl_seconds: float | None) -> None:
+        if ttl_seconds is None:
+            return
+        expired_before = time.monotonic() - ttl_seconds
+        while queue:
+            thread_id = next(iter(queue))
+            if self._usage[thread_id].last_access >= expired_before:
+                break
+            self._evict_thread(thread_id)
+
+    def _evict_thread(self, thread_id: str) -> None:
+        if self._usage[thread_id].pinned:
+            print(f"⚠️  Evicting paused checkpoint thread {thread_id} (checkpoint cap or pinned TTL reached)")
+            self._pinned_evictions += 1
+        self.delete_thread(thread_id)
+        self._evictions += 1
+
+
+# Serializer shared by all checkpointers (None = langgraph's JsonPlusSerializer)
+checkpoint_serde = ShipmentSerializer() if Config.compact_checkpoint_serde else None
+
+# Shared durable checkpointer for all graphs, enabled by Config.checkpoint_db_path
+durable_checkpointer = None
+if Config.checkpoint_db_path:
+    from src.agents.sqlite_checkpointer import SqliteCheckpointSaver
+    durable_checkpointer = SqliteCheckpointSaver(Config.checkpoint_db_path, serde=checkpoint_serde)
@@ -0,0 +1,210 @@
+"""
+Compact shipment representation for very large shipments
+
+CompactShipment / CompactStop / CompactPOList hold the same data as the
+pydantic Shipment / Stop / PurchaseOrder models at a fraction of the memory:
+- Shipments and stops are __slots__ objects with enum codes (the
+  checkpoint serializer's code tables) instead of enum members
+- The POs of a stop are stored column-wise in arrays (PO numbers as one
+  UTF-8 buffer plus end offsets, one byte per state and flag), so a PO
+  costs a few dozen bytes instead of a model instance with its own dict
+  and strings
+- Escalation reasons are interned in one ReasonTable per shipment and
+  stored as integer codes, so a reason repeated on thousands of POs is
+  kept once
+
+The graph and the API work on the pydantic models. Shipments waiting
+outside a run are held compact instead: the bulk processor keeps very
+large read-ahead shipments as CompactShipment.from_model() and converts
+them with to_model() when their run starts. Indexing a CompactPOList
+materializes a PurchaseOrder on demand.
+benchmarks/compact_model_benchmark.py measures the savings.
+"""
+from array import array
+from typing import Iterator
+
+from src.agents.model import PoState, PurchaseOrder, Shipment, ShipmentStatus, Stop, StopType
+from src.agents.serde import (
+    PO_STATES,
+    PO_STATE_CODES,
+    SHIPMENT_STATUSES,
+    SHIPMENT_STATUS_CODES,
+    STOP_TYPES,
+    STOP_TYPE_CODES
+)
+
+# Reason code for "no escalation reason"
+NO_REASON = -1
+
+
+class ReasonTable:
+    """Interned escalation reasons, shared by all stops and POs of a shipment."""
+
+    __slots__ = ("_reasons", "_codes")
+
+    def __init__(self):
+        self._reasons: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def code(self, reason: str | None) -> int:
+        if reason is None:
+            return NO_REASON
+        code = self._codes.get(reason)
+        if code is None:
+            code = len(self._reasons)
+            self._reasons.append(reason)
+            self._codes[reason] = code
+        return code
+
+    def reason(self, code: int) -> str | None:
+        return None if code == NO_REASON else self._reasons[code]
+
+    def __len__(self) -> int:
+        return len(self._reasons)
+
+
+class CompactPOList:
+    """The POs of one stop, stored column-wise."""
+
+    __slots__ = ("_po_nums", "_po_num_ends", "_states", "_escalated", "_reasons", "reasons")
+
+    def __init__(self, reasons: ReasonTable):
+        self._po_nums = bytearray()
+        self._po_num_ends = array("I")
+        self._states = array("b")
+        self._escalated = array("b")
+        self._reasons = array("i")
+        self.reasons = reasons
+
+    def append(self, po: PurchaseOrder):
+        self._po_nums += po.po_num.encode()
+        self._po_num_ends.append(len(self._po_nums))
+        self._states.append(PO_STATE_CODES[po.po_state])
+        self._escalated.append(po.is_escalated)
+        self._reasons.append(self.reasons.code(po.escalation_reason))
+
+    def po_num(self, index: int) -> str:
+        index = self._check_index(index)
+        start = self._po_num_ends[index - 1] if index else 0
+        return self._po_nums[start:self._po_num_ends[index]].decode()
+
+    def po_state(self, index: int) -> PoState:
+        return PO_STATES[self._states[index]]
+
+    def is_escalated(self, index: int) -> bool:
+        return bool(self._escalated[index])
+
+    def escalation_reason(self, index: int) -> str | None:
+        return self.reasons.reason(self._reasons[index])
+
+    def update(self, index: int, po_state: PoState, is_escalated: bool, escalation_reason: str | None):
+        """Set the processing outcome of one PO (the PO number does not change)."""
+        self._states[index] = PO_STATE_CODES[po_state]
+        self._escalated[index] = is_escalated
+        self._reasons[index] = self.reasons.code(escalation_reason)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __getitem__(self, index: int) -> PurchaseOrder:
+        index = self._check_index(index)
+        return PurchaseOrder.model_construct(
+            po_num=self.po_num(index),
+            po_state=self.po_state(index),
+            is_escalated=self.is_escalated(index),
+            escalation_reason=self.escalation_reason(index)
+        )
+
+    def __iter__(self) -> Iterator[PurchaseOrder]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers (excluding the shared reason table)."""
+        return sum(
+            column.buffer_info()[1] * column.itemsize
+            for column in (self._po_num_ends, self._states, self._escalated, self._reasons)
+        ) + len(self._po_nums)
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PO index out of range")
+        return index
+
+
+class CompactStop:
+    """A stop with enum codes and column-stored POs."""
+
+    __slots__ = ("id", "shipment_id", "type_code", "is_escalated", "reason_code", "pos")
+
+    def __init__(self, id: int, shipment_id: int, type: StopType, is_escalated: bool, reason_code: int, pos: CompactPOList):
+        self.id = id
+        self.shipment_id = shipment_id
+        self.type_code = STOP_TYPE_CODES[type]
+        self.is_escalated = is_escalated
+        self.reason_code = reason_code
+        self.pos = pos
+
+    @property
+    def type(self) -> StopType:
+        return STOP_TYPES[self.type_code]
+
+    @property
+    def escalation_reason(self) -> str | None:
+        return self.pos.reasons.reason(self.reason_code)
+
+    @classmethod
+    def from_model(cls, stop: Stop, reasons: ReasonTable) -> "CompactStop":
+        pos = CompactPOList(reasons)
+        for po in stop.po_list:
+            pos.append(po)
+        return cls(stop.id, stop.shipment_id, stop.type, stop.is_escalated, reasons.code(stop.escalation_reason), pos)
+
+    def to_model(self) -> Stop:
+        return Stop.model_construct(
+            id=self.id,
+            shipment_id=self.shipment_id,
+            type=self.type,
+            is_escalated=self.is_escalated,
+            escalation_reason=self.escalation_reason,
+            po_list=tuple(self.pos)
+        )
+
+
+class CompactShipment:
+    """A shipment whose stops and POs use the compact representation."""
+
+    __slots__ = ("id", "tms_id", "bol_num", "status_code", "stops", "reasons")
+
+    def __init__(self, id: int, tms_id: str, bol_num: str, status: ShipmentStatus, reasons: ReasonTable | None = None):
+        self.id = id
+        self.tms_id = tms_id
+        self.bol_num = bol_num
+        self.status_code = SHIPMENT_STATUS_CODES[status]
+        self.stops: list[CompactStop] = []
+        self.reasons = reasons or ReasonTable()
+
+    @property
+    def status(self) -> ShipmentStatus:
+        return SHIPMENT_STATUSES[self.status_code]
+
+    @property
+    def po_count(self) -> int:
+        return sum(len(stop.pos) for stop in self.stops)
+
+    @classmethod
+    def from_model(cls, shipment: Shipment) -> "CompactShipment":
+        compact = cls(shipment.id, shipment.tms_id, shipment.bol_num, shipment.status)
+        compact.stops = [CompactStop.from_model(stop, compact.reasons) for stop in shipment.stops]
+        return compact
+
+    def to_model(self) -> Shipment:
+        return Shipment.model_construct(
+            id=self.id,
+            tms_id=self.tms_id,
+            bol_num=self.bol_num,
+            status=self.status,
+            stops=[stop.to_model() for stop in self.stops]
+        )
@@ -0,0 +1,169 @@
+"""
+Escalation Decision Engine - Tiered evaluation of human replies to escalated POs
+
+Each reply is passed through the tiers in order; the first tier with an
+answer settles it:
+- rules: local regex patterns for unambiguous replies ("approved",
+  "still waiting", "rejected"); configured by Config.escalation_reply_rules
+- cache: a previous LLM decision for the identical prompt
+- llm: structured EscalationDecision from the chat model (batched)
+
+A reply matching patterns of more than one state, or containing a negation
+("not approved"), is left to the later tiers. stats() reports per-tier hit rates.
+"""
+from dataclasses import dataclass
+import re
+import threading
+
+from pydantic import ValidationError
+
+from src.config import Config
+from src.agents.model import EscalationDecision, PoState, PurchaseOrder
+from src.chat.service.llm_chat_model_service import llm_model_name
+from src.chat.service.llm_response_cache import LLMResponseCache, llm_response_cache
+from src.chat.service.llm_batcher import LLMBatcher, llm_batcher
+
+
+@dataclass
+class EscalationReview:
+    """A human reply to an escalated PO awaiting a decision."""
+    po: PurchaseOrder
+    reply: str
+
+    @property
+    def prompt(self) -> str:
+        return build_escalation_prompt(self.po, self.reply)
+
+
+def build_escalation_prompt(po: PurchaseOrder, raw_input: str) -> str:
+    """Build the LLM prompt used to evaluate a human reply to an escalation."""
+    return f"""Decide the new state of escalated purchase order {po.po_num} from the human reply.
+Escalation reason: {po.escalation_reason}
+Reply: {raw_input}
+SCHEDULED = approved or ready, PENDING = still in progress, ESCALATED = still a problem (give a short new reason)."""
+
+
+def load_cached_decision(cached: str | None) -> EscalationDecision | None:
+    """Decode a cached decision; entries that no longer match the schema count as misses."""
+    if cached is None:
+        return None
+    try:
+        return EscalationDecision.model_validate_json(cached)
+    except ValidationError:
+        return None
+
+
+class RuleTier:
+    """Settles replies that match the patterns of exactly one PoState."""
+    name = "rules"
+
+    def __init__(self, rules: dict[str, list[str]], negation: str):
+        self.patterns = {
+            PoState(state): re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+            for state, patterns in rules.items()
+            if patterns
+        }
+        self.negation = re.compile(negation, re.IGNORECASE) if negation else None
+
+    def decide(self, review: EscalationReview) -> EscalationDecision | None:
+        if not self.patterns or (self.negation and self.negation.search(review.reply)):
+            return None
+        
+        matches = [state for state, pattern in self.patterns.items() if pattern.search(review.reply)]
+        if len(matches) != 1:
+            return None
+        
+        po_state = matches[0]
+        return EscalationDecision(
+            po_state=po_state,
+            escalation_reason=f"Human reply: {review.reply}" if po_state == PoState.ESCALATED else None
+        )
+
+    async def adecide(self, review: EscalationReview) -> EscalationDecision | None:
+        return self.decide(review)
+
+
+class CacheTier:
+    """Reuses the LLM decision for an identical prompt."""
+    name = "cache"
+
+    def __init__(self, cache: LLMResponseCache):
+        self.cache = cache
+
+    def decide(self, review: EscalationReview) -> EscalationDecision | None:
+        return load_cached_decision(self.cache.get(llm_model_name, review.prompt))
+
+    async def adecide(self, review: EscalationReview) -> EscalationDecision | None:
+        return load_cached_decision(await self.cache.aget(llm_model_name, review.prompt))
+
+
+class LLMTier:
+    """Asks the chat model (through the batcher) and caches its decision."""
+    name = "llm"
+
+    def __init__(self, batcher: LLMBatcher, cache: LLMResponseCache):
+        self.batcher = batcher
+        self.cache = cache
+
+    def decide(self, review: EscalationReview) -> EscalationDecision:
+        prompt = review.prompt
+        decision = self.batcher.evaluate(prompt)
+        self.cache.put(llm_model_name, prompt, decision.model_dump_json())
+        return decision
+
+    async def adecide(self, review: EscalationReview) -> EscalationDecision:
+        prompt = review.prompt
+        decision = await self.batcher.aevaluate(prompt)
+        await self.cache.aput(llm_model_name, prompt, decision.model_dump_json())
+        return decision
+
+
+class EscalationDecisionEngine:
+    """Runs a review through the tiers in order; the last tier must always answer."""
+
+    def __init__(self, tiers: list):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._hits = {tier.name: 0 for tier in tiers}
+
+    def decide(self, po: PurchaseOrder, reply: str) -> EscalationDecision:
+        review = EscalationReview(po=po, reply=reply)
+        for tier in self.tiers:
+            decision = tier.decide(review)
+            if decision is not None:
+                return self._settled(tier, review, decision)
+        raise RuntimeError(f"No decision tier settled the reply for PO {po.po_num}")
+
+    async def adecide(self, po: PurchaseOrder, reply: str) -> EscalationDecision:
+        review = EscalationReview(po=po, reply=reply)
+        for tier in self.tiers:
+            decision = await tier.adecide(review)
+            if decision is not None:
+                return self._settled(tier, review, decision)
+        raise RuntimeError(f"No decision tier settled the reply for PO {po.po_num}")
+
+    def stats(self) -> dict[str, int | dict]:
+        """Decisions settled per tier and each tier's share of all decisions."""
+        with self._lock:
+            total = sum(self._hits.values())
+            return {
+                "decisions": total,
+                "tiers": {
+                    name: {"hits": hits, "hit_rate": hits / total if total else 0.0}
+                    for name, hits in self._hits.items()
+                }
+            }
+
+    def _settled(self, tier, review: EscalationReview, decision: EscalationDecision) -> EscalationDecision:
+        with self._lock:
+            self._hits[tier.name] += 1
+        print(f"     🧭 Decision for PO {review.po.po_num} settled by {tier.name} tier")
+        return decision
+
+
+# Shared engine: rules, then cached LLM decisions, then the LLM
+escalation_decision_engine = EscalationDecisionEngine([
+    RuleTier(Config.escalation_reply_rules, Config.escalation_reply_negation),
+    CacheTier(llm_response_cache),
+    LLMTier(llm_batcher, llm_response_cache)
+])
@@ -0,0 +1,360 @@
+"""
+Escalation Service - Human-in-the-loop without parking threads
+
+Escalated POs pause the PO subgraph with a persisted interrupt instead of
+blocking on input(). This module:
+- Names PO subgraph threads by (shipment_id, stop_id, po_num), so a rerun
+  of the shipment replaces the PO's earlier paused thread
+- Lists pending escalations from the PO checkpointer (threads whose latest
+  checkpoint holds an interrupt write), so every worker process sharing
+  the durable checkpointer sees the same list, also after a restart
+- Resumes a paused PO subgraph thread with the human's answer and writes
+  the resolved PO back into the shipment thread's checkpointed state
+  (one write-back at a time per shipment thread)
+- Resumes several threads at once, so the replies that reach the LLM are
+  sent as one batch
+"""
+import asyncio
+import threading
+from weakref import WeakValueDictionary
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import INTERRUPT
+from langgraph.types import Command
+from pydantic import BaseModel
+
+from src.agents import POState, ShipmentState, merge_dicts
+from src.agents.po_subgraph import po_subgraph, po_checkpointer
+from src.agents.po_worker_pool import po_worker_pool
+from src.chat.service.llm_batcher import llm_batcher
+
+
+# Write-backs into a shipment thread are read-modify-write (get_state -> update_state),
+# so they are serialized per shipment thread; unused locks are dropped with their last holder
+_shipment_thread_locks: WeakValueDictionary[str, threading.Lock] = WeakValueDictionary()
+_async_shipment_thread_locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+_shipment_thread_locks_guard = threading.Lock()
+
+
+class PendingEscalation(BaseModel):
+    """A PO subgraph thread paused on human review."""
+    thread_id: str
+    shipment_id: int
+    stop_id: int
+    po_num: str
+    escalation_reason: str | None = None
+    question: str | None = None
+    # Checkpointed shipment run the PO belongs to (None if the shipment graph is not checkpointed)
+    shipment_thread_id: str | None = None
+
+
+def po_thread_id(shipment_id: int, stop_id: int, po_num: str) -> str:
+    """Thread id of a PO's subgraph run; the same PO on a rerun reuses (and replaces) it."""
+    return f"po-{shipment_id}-{stop_id}-{po_num}"
+
+
+def po_run_config(thread_id: str, shipment_id: int, stop_id: int, po_num: str, shipment_thread_id: str | None) -> RunnableConfig:
+    """PO subgraph config; the metadata is stored with its checkpoints to rebuild pending escalations."""
+    return {
+        "configurable": {"thread_id": thread_id},
+        "metadata": {
+            "shipment_id": shipment_id,
+            "stop_id": stop_id,
+            "po_num": po_num,
+            "shipment_thread_id": shipment_thread_id
+        }
+    }
+
+
+def record_po_interrupt(thread_id: str, po_result: POState) -> bool:
+    """
+    Handle a PO subgraph run result.
+    Paused threads are pinned by the checkpointer when it stores the
+    interrupt and stay there as the pending escalation; finished threads
+    are reclaimed since nothing will resume them.
+    
+    Returns:
+        True if the PO subgraph paused on an interrupt, False if it finished
+    """
+    if not _is_paused(thread_id, po_result):
+        po_checkpointer.delete_thread(thread_id)
+        return False
+    return True
+
+
+async def arecord_po_interrupt(thread_id: str, po_result: POState) -> bool:
+    """
+    Async variant of record_po_interrupt.
+    The checkpointer delete (SQLite I/O with the durable checkpointer) is
+    awaited instead of blocking the event loop.
+    """
+    if not _is_paused(thread_id, po_result):
+        await po_checkpointer.adelete_thread(thread_id)
+        return False
+    return True
+
+
+def _is_paused(thread_id: str, po_result: POState) -> bool:
+    interrupts = po_result.get(INTERRUPT)
+    if interrupts:
+        print(f"    ⏸️  PO {interrupts[0].value['po_num']} paused for human review (thread {thread_id})")
+    return bool(interrupts)
+
+
+def list_pending_escalations(shipment_id: int | None = None) -> list[PendingEscalation]:
+    """List escalations waiting on a human answer, optionally for one shipment."""
+    pending = []
+    for thread_id in po_checkpointer.interrupted_thread_ids():
+        escalation = _load_pending_escalation(thread_id)
+        if escalation is not None and (shipment_id is None or escalation.shipment_id == shipment_id):
+            pending.append(escalation)
+    return sorted(pending, key=lambda escalation: (escalation.shipment_id, escalation.stop_id, escalation.po_num))
+
+
+async def alist_pending_escalations(shipment_id: int | None = None) -> list[PendingEscalation]:
+    """Async variant of list_pending_escalations (checkpointer reads run off the event loop)."""
+    return await asyncio.to_thread(list_pending_escalations, shipment_id)
+
+
+def get_pending_escalation(thread_id: str) -> PendingEscalation:
+    """
+    Look up a pending escalation.
+    
+    Raises:
+        KeyError: If no PO subgraph thread is waiting under this thread_id
+    """
+    escalation = _load_pending_escalation(thread_id)
+    if escalation is None:
+        raise KeyError(thread_id)
+    return escalation
+
+
+async def aget_pending_escalation(thread_id: str) -> PendingEscalation:
+    """Async variant of get_pending_escalation."""
+    return await asyncio.to_thread(get_pending_escalation, thread_id)
+
+
+def _load_pending_escalation(thread_id: str) -> PendingEscalation | None:
+    """Build the pending escalation from the thread's latest checkpoint, if it is paused."""
+    checkpoint = po_checkpointer.get_tuple({"configurable": {"thread_id": thread_id}})
+    if checkpoint is None or "shipment_id" not in checkpoint.metadata:
+        return None
+    
+    interrupts = [value for _, channel, value in checkpoint.pending_writes or () if channel == INTERRUPT]
+    if not interrupts:
+        return None
+    
+    request = interrupts[0][0].value
+    metadata = checkpoint.metadata
+    return PendingEscalation(
+        thread_id=thread_id,
+        shipment_id=metadata["shipment_id"],
+        stop_id=metadata["stop_id"],
+        po_num=request["po_num"],
+        escalation_reason=request.get("escalation_reason"),
+        question=request.get("question"),
+        shipment_thread_id=metadata.get("shipment_thread_id")
+    )
+
+
+def resume_escalation(thread_id: str, human_input: str) -> POState:
+    """
+    Resume a paused PO subgraph thread with the human's answer.
+    If the answer is not accepted, the PO pauses again and stays pending;
+    otherwise the resolved PO is written back into the shipment's state.
+    """
+    escalation = get_pending_escalation(thread_id)
+    po_result = _resume_po_thread(escalation, human_input)
+    update_shipment_thread(escalation.shipment_thread_id, [(escalation, po_result)])
+    return po_result
+
+
+async def aresume_escalation(thread_id: str, human_input: str) -> POState:
+    """Async variant of resume_escalation."""
+    escalation = await aget_pending_escalation(thread_id)
+    po_result = await _aresume_po_thread(escalation, human_input)
+    await aupdate_shipment_thread(escalation.shipment_thread_id, [(escalation, po_result)])
+    return po_result
+
+
+def resume_escalations(answers: dict[str, str]) -> dict[str, POState]:
+    """
+    Resume several paused PO subgraph threads, {thread_id: human_input}.
+    The resumes run concurrently on the PO worker pool and are announced to
+    the LLM batcher, so replies that need the model go out as one request.
+    Resolved POs are written back with one update per shipment thread once
+    every resume has finished.
+    
+    Raises:
+        KeyError: If any thread is not waiting (before any thread is resumed)
+    """
+    escalations = {thread_id: get_pending_escalation(thread_id) for thread_id in answers}
+    
+    # At most max_workers resumes (and so prompts) are in flight at a time
+    with llm_batcher.expect(min(len(answers), po_worker_pool.max_workers)):
+        futures = {
+            thread_id: po_worker_pool.submit(escalations[thread_id].shipment_id, _resume_po_thread, escalations[thread_id], human_input)
+            for thread_id, human_input in answers.items()
+        }
+        po_results, error = {}, None
+        for thread_id, future in futures.items():
+            try:
+                po_results[thread_id] = future.result()
+            except Exception as e:
+                error = error or e
+    
+    # POs that did resume are written back even if another resume failed
+    for shipment_thread_id, resolved in _group_by_shipment_thread(escalations, po_results).items():
+        update_shipment_thread(shipment_thread_id, resolved)
+    if error is not None:
+        raise error
+    return po_results
+
+
+async def aresume_escalations(answers: dict[str, str]) -> dict[str, POState]:
+    """Async variant of resume_escalations; the resumes are awaited together on the event loop."""
+    escalations = {thread_id: await aget_pending_escalation(thread_id) for thread_id in answers}
+    
+    with llm_batcher.expect(len(answers)):
+        outcomes = await asyncio.gather(*(
+            _aresume_po_thread(escalations[thread_id], human_input) for thread_id, human_input in answers.items()
+        ), return_exceptions=True)
+    po_results = {
+        thread_id: outcome for thread_id, outcome in zip(answers, outcomes) if not isinstance(outcome, BaseException)
+    }
+    
+    for shipment_thread_id, resolved in _group_by_shipment_thread(escalations, po_results).items():
+        await aupdate_shipment_thread(shipment_thread_id, resolved)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    return po_results
+
+
+def _resume_po_thread(escalation: PendingEscalation, human_input: str) -> POState:
+    thread_id = escalation.thread_id
+    config = po_run_config(thread_id, escalation.shipment_id, escalation.stop_id, escalation.po_num, escalation.shipment_thread_id)
+    po_checkpointer.begin_run(thread_id)
+    try:
+        po_result = po_subgraph.invoke(Command(resume=human_input), config=config)
+        record_po_interrupt(thread_id, po_result)
+    finally:
+        po_checkpointer.end_run(thread_id)
+    return po_result
+
+
+async def _aresume_po_thread(escalation: PendingEscalation, human_input: str) -> POState:
+    thread_id = escalation.thread_id
+    config = po_run_config(thread_id, escalation.shipment_id, escalation.stop_id, escalation.po_num, escalation.shipment_thread_id)
+    po_checkpointer.begin_run(thread_id)
+    try:
+        po_result = await po_subgraph.ainvoke(Command(resume=human_input), config=config)
+        await arecord_po_interrupt(thread_id, po_result)
+    finally:
+        po_checkpointer.end_run(thread_id)
+    return po_result
+
+
+def _group_by_shipment_thread(
+    escalations: dict[str, PendingEscalation],
+    po_results: dict[str, POState]
+) -> dict[str, list[tuple[PendingEscalation, POState]]]:
+    resolved = {}
+    for thread_id, po_result in po_results.items():
+        escalation = escalations[thread_id]
+        if escalation.shipment_thread_id is not None:
+            resolved.setdefault(escalation.shipment_thread_id, []).append((escalation, po_result))
+    return resolved
+
+
+def resolved_pos_update(state: ShipmentState, resolved: list[tuple[int, POState]]) -> ShipmentState:
+    """
+    ShipmentState update that writes resumed POs, [(stop_id, po_result)],
+    back into their stops, re-rolls those stops' escalation and records
+    the POs' results.
+    """
+    po_results_by_stop = {}
+    for stop_id, po_result in resolved:
+        po_results_by_stop.setdefault(stop_id, []).append(po_result)
+    
+    resolved_stops = {}
+    for stop_index, stop in enumerate(state["shipment"].stops):
+        po_results = po_results_by_stop.get(stop.id)
+        if po_results is None:
+            continue
+        
+        stop = stop.replace_pos(po_result["po"] for po_result in po_results)
+        
+        escalated_pos = [stop_po for stop_po in stop.po_list if stop_po.is_escalated]
+        resolved_stops[stop_index] = stop.replace(
+            is_escalated=bool(escalated_pos),
+            escalation_reason="; ".join(
+                f"PO {stop_po.po_num}: {stop_po.escalation_reason}" for stop_po in escalated_pos
+            ) or None
+        )
+    
+    # stop_results merges per stop ID, so each stop's results are written whole
+    stop_results = {
+        stop_id: merge_dicts(
+            state.get("stop_results", {}).get(stop_id),
+            {po_result["po"].po_num: po_result["processing_result"] for po_result in po_results}
+        )
+        for stop_id, po_results in po_results_by_stop.items()
+    }
+    return {"shipment": resolved_stops, "stop_results": stop_results}
+
+
+def update_shipment_thread(shipment_thread_id: str | None, resolved: list[tuple[PendingEscalation, POState]]) -> None:
+    """
+    Write resumed POs into the checkpointed shipment run they belong to (if
+    any) as one state update; POs that paused again are left out.
+    """
+    # Imported here: the shipment graph imports this module through the stop subgraph
+    from src.agents.graph_builder import my_graph
+    
+    if shipment_thread_id is None or my_graph.checkpointer is None:
+        return
+    
+    config = {"configurable": {"thread_id": shipment_thread_id}}
+    with _shipment_thread_lock(_shipment_thread_locks, shipment_thread_id, threading.Lock):
+        state = my_graph.get_state(config)
+        update = _shipment_thread_update(state.values, resolved)
+        if update is not None:
+            my_graph.update_state(config, update)
+
+
+async def aupdate_shipment_thread(shipment_thread_id: str | None, resolved: list[tuple[PendingEscalation, POState]]) -> None:
+    """Async variant of update_shipment_thread."""
+    from src.agents.graph_builder import my_graph
+    
+    if shipment_thread_id is None or my_graph.checkpointer is None:
+        return
+    
+    config = {"configurable": {"thread_id": shipment_thread_id}}
+    async with _shipment_thread_lock(_async_shipment_thread_locks, shipment_thread_id, asyncio.Lock):
+        state = await my_graph.aget_state(config)
+        update = _shipment_thread_update(state.values, resolved)
+        if update is not None:
+            await my_graph.aupdate_state(config, update)
+
+
+def _shipment_thread_update(state: ShipmentState, resolved: list[tuple[PendingEscalation, POState]]) -> ShipmentState | None:
+    if not state:
+        return None
+    
+    stop_ids = {stop.id for stop in state["shipment"].stops}
+    # Skip POs that paused again, and stops the shipment was rerun without since the PO paused
+    resolved = [
+        (escalation.stop_id, po_result) for escalation, po_result in resolved
+        if INTERRUPT not in po_result and escalation.stop_id in stop_ids
+    ]
+    return resolved_pos_update(state, resolved) if resolved else None
+
+
+def _shipment_thread_lock(locks: WeakValueDictionary, shipment_thread_id: str, lock_type: type):
+    with _shipment_thread_locks_guard:
+        lock = locks.get(shipment_thread_id)
+        if lock is None:
+            lock = locks[shipment_thread_id] = lock_type()
+        return lock
+
@@ -6,50 +6,159 @@ This graph demonstrates:
 2. Processing at appropriate levels (ShipmentState, StopState, POState)
 3. Parallel PO processing via subgraphs
 4. State rollup from child to parent levels
-5. Deterministic processing (skipping PICK_UP stops)
+5. Deterministic processing (PICK_UP stops settled up front by the
+   execution plan; only actionable DROP_OFF stops are traversed)
 6. Human-in-the-loop at PO level (within subgraph)
+7. Optional parallel stop processing (map-reduce fan-out with Send)
+8. Sync (invoke/stream) and native async (ainvoke/astream) execution
+9. Optional durable SQLite checkpoints, so a crashed shipment resumes
+   from its last completed stop
 """
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 
-from src.agents import ShipmentState
+from src.config import Config
+from src.agents import ShipmentState, StopTask
+from src.agents.checkpointer import durable_checkpointer
 from src.agents.shipment_processor_node import shipment_processor_node
-from src.agents.stop_invoker_node import stop_invoker_node, check_if_complete
+from src.agents.stop_invoker_node import stop_invoker_node, astop_invoker_node, check_if_complete
 from src.agents.next_stop_node import next_stop_node
+from src.agents.parallel_stop_node import (
+    STOP_WORKER,
+    STOP_COLLECTOR,
+    dispatch_stops,
+    stop_worker_node,
+    astop_worker_node,
+    stop_collector_node
+)
 
 # Node names
 SHIPMENT_PROCESSOR = "shipment_processor"
 STOP_INVOKER = "stop_invoker"
 NEXT_STOP = "next_stop"
 
-# Build the shipment processing graph (operates at Shipment level)
-graph_builder = StateGraph(ShipmentState)
 
-# Add nodes
-graph_builder.add_node(SHIPMENT_PROCESSOR, shipment_processor_node)
-graph_builder.add_node(STOP_INVOKER, stop_invoker_node)
-graph_builder.add_node(NEXT_STOP, next_stop_node)
+def build_shipment_graph(parallel_stops: bool = False):
+    """
+    Build and compile the shipment processing graph (operates at Shipment level).
+    
+    Args:
+        parallel_stops: If True, all stops are dispatched at once and their
+            results merged by reducers. If False, stops are walked one after
+            another (stop_invoker → next_stop loop) for ordered workflows.
+    
+    Nodes that invoke subgraphs or do I/O carry both a sync and an async
+    implementation, so the compiled graph supports invoke and ainvoke.
+    The graph (and the stop subgraph it invokes) checkpoints to the durable
+    checkpointer when Config.checkpoint_db_path is set.
+    """
+    graph_builder = StateGraph(ShipmentState)
+    
+    # Add nodes
+    graph_builder.add_node(SHIPMENT_PROCESSOR, shipment_processor_node)
+    
+    # Start -> Initialize shipment processing
+    graph_builder.add_edge(START, SHIPMENT_PROCESSOR)
+    
+    if parallel_stops:
+        graph_builder.add_node(
+            STOP_WORKER,
+            RunnableLambda(stop_worker_node, afunc=astop_worker_node, name=STOP_WORKER),
+            input=StopTask
+        )
+        graph_builder.add_node(STOP_COLLECTOR, stop_collector_node)
+        
+        # Shipment processor -> one stop worker per stop (map)
+        graph_builder.add_conditional_edges(
+            SHIPMENT_PROCESSOR,
+            dispatch_stops,
+            [STOP_WORKER, STOP_COLLECTOR]
+        )
+        
+        # All stop workers -> collector (reduce), then done
+        graph_builder.add_edge(STOP_WORKER, STOP_COLLECTOR)
+        graph_builder.add_edge(STOP_COLLECTOR, END)
+        
+        return graph_builder.compile(checkpointer=durable_checkpointer)
+    
+    graph_builder.add_node(STOP_INVOKER, RunnableLambda(stop_invoker_node, afunc=astop_invoker_node, name=STOP_INVOKER))
+    graph_builder.add_node(NEXT_STOP, next_stop_node)
+    
+    # Shipment processor -> Stop invoker (END if the plan queued no stops)
+    graph_builder.add_conditional_edges(
+        SHIPMENT_PROCESSOR,
+        check_if_complete,
+        {
+            "complete": END,
+            "continue": STOP_INVOKER
+        }
+    )
+    
+    # After stop processing, check if complete
+    graph_builder.add_conditional_edges(
+        STOP_INVOKER,
+        check_if_complete,
+        {
+            "complete": END,          # All stops processed
+            "continue": NEXT_STOP     # Move to next stop
+        }
+    )
+    
+    # After advancing to next stop, process it
+    graph_builder.add_edge(NEXT_STOP, STOP_INVOKER)
+    
+    return graph_builder.compile(checkpointer=durable_checkpointer)
 
-# Start -> Initialize shipment processing
-graph_builder.add_edge(START, SHIPMENT_PROCESSOR)
 
-# Shipment processor -> Stop invoker
-graph_builder.add_edge(SHIPMENT_PROCESSOR, STOP_INVOKER)
+# Compile both variants; my_graph follows the configured stop processing mode
+sequential_shipment_graph = build_shipment_graph(parallel_stops=False)
+parallel_shipment_graph = build_shipment_graph(parallel_stops=True)
+my_graph = parallel_shipment_graph if Config.parallel_stops else sequential_shipment_graph
 
-# After stop processing, check if complete
-graph_builder.add_conditional_edges(
-    STOP_INVOKER,
-    check_if_complete,
-    {
-        "complete": END,          # All stops processed
-        "continue": NEXT_STOP     # Move to next stop
-    }
-)
+# For backward compatibility (if needed)
+shipment_graph = my_graph
 
-# After advancing to next stop, process it
-graph_builder.add_edge(NEXT_STOP, STOP_INVOKER)
 
-# Compile the graph
-my_graph = graph_builder.compile()
+def shipment_run_config(shipment_id: int) -> dict:
+    """
+    Graph config for a shipment run; the thread_id keys its durable checkpoints.
+    The thread holds the shipment's latest run: resume_or_start reuses it
+    only to finish an unfinished run.
+    """
+    return {"configurable": {"thread_id": f"shipment-{shipment_id}"}}
 
-# For backward compatibility (if needed)
-shipment_graph = my_graph
\ No newline at end of file
+
+def resume_or_start(initial_state: ShipmentState, config: dict) -> ShipmentState | None:
+    """
+    Graph input for a shipment run.
+    
+    Returns None (resume from the last checkpoint) if a durable checkpoint
+    shows an unfinished run of this shipment, e.g. after a crash; otherwise
+    the initial state, which starts a fresh run. The checkpoints of a
+    finished earlier run are deleted first, so reducers such as stop_results
+    do not carry its results into the new run.
+    """
+    if durable_checkpointer is None:
+        return initial_state
+    
+    state = my_graph.get_state(config)
+    if state.next:
+        print(f"↻ Resuming unfinished run {config['configurable']['thread_id']} from its last checkpoint")
+        return None
+    if state.values:
+        durable_checkpointer.delete_thread(config["configurable"]["thread_id"])
+    return initial_state
+
+
+async def aresume_or_start(initial_state: ShipmentState, config: dict) -> ShipmentState | None:
+    """Async variant of resume_or_start."""
+    if durable_checkpointer is None:
+        return initial_state
+    
+    state = await my_graph.aget_state(config)
+    if state.next:
+        print(f"↻ Resuming unfinished run {config['configurable']['thread_id']} from its last checkpoint")
+        return None
+    if state.values:
+        await durable_checkpointer.adelete_thread(config["configurable"]["thread_id"])
+    return initial_state
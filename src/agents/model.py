@@ -1,6 +1,6 @@
 from enum import Enum
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from typing import Any, Iterable, Optional, Self
 
 
 class ShipmentStatus(Enum):
@@ -24,7 +24,22 @@ class PoState(str, Enum):
     PENDING = "PENDING"
     ESCALATED = "ESCALATED"
 
-class PurchaseOrder(BaseModel):
+class FrozenModel(BaseModel):
+    """
+    Immutable model: updates go through replace(), which returns a new
+    object only when a value actually changes. Unchanged objects (and the
+    nested ones they hold) are shared, so graph branches, parent stops and
+    checkpoints can reference the same instances without copies or locks.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    def replace(self, **changes: Any) -> Self:
+        """Copy with the given fields changed (not re-validated), or self if nothing changes."""
+        if all(getattr(self, name) == value for name, value in changes.items()):
+            return self
+        return self.model_copy(update=changes)
+
+class PurchaseOrder(FrozenModel):
     po_num: str
     po_state: PoState
     is_escalated: bool 
@@ -33,23 +48,88 @@ class PurchaseOrder(BaseModel):
         description="Escalation reason for the PO",
     )
 
-class Stop(BaseModel):
+class Stop(FrozenModel):
     """
     A stop is a location where a shipment is picked up or dropped off.
     A stop can contain zero to many purchase orders.
     Note that this model differs from the model in the hubflow-api code base
     so that we can show PO hierarchy processing capabilities.
+    
+    Stops and their POs are frozen; po_list is a tuple. PO numbers must be
+    unique within a stop. A po_num -> position index is kept alongside
+    po_list for O(1) lookups; it is checked on every hit and rebuilt when a
+    copy was given a different po_list. The index is a cache, so equality
+    compares the fields only.
     """
     id: int
     shipment_id: int
     # po_num: list[str] = Field(default_factory=list)
-    po_list: list[PurchaseOrder] = Field(default_factory=list)
+    po_list: tuple[PurchaseOrder, ...] = ()
     is_escalated: bool 
     type: StopType 
     escalation_reason: str | None = Field(
         default=None,
         description="Escalation reason for the stop",
     )
+    _po_index: dict[str, int] | None = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _check_unique_po_nums(self) -> "Stop":
+        self._build_po_index()
+        return self
+
+    def __eq__(self, other: Any) -> bool:
+        # BaseModel.__eq__ would also compare the private po_num index
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
+    __hash__ = FrozenModel.__hash__
+
+    def po_position(self, po_num: str) -> int | None:
+        """Position of the PO in po_list, or None if the stop has no such PO."""
+        index = self._po_index
+        if index is not None:
+            position = index.get(po_num)
+            if position is not None and position < len(self.po_list) and self.po_list[position].po_num == po_num:
+                return position
+        # Missing or stale (copied with another po_list): rebuild once
+        return self._build_po_index().get(po_num)
+
+    def get_po(self, po_num: str) -> PurchaseOrder | None:
+        position = self.po_position(po_num)
+        return None if position is None else self.po_list[position]
+
+    def replace_pos(self, processed_pos: Iterable[PurchaseOrder]) -> "Stop":
+        """
+        Stop with processed POs swapped in for the POs with the same po_num,
+        in one pass over processed_pos. Other POs (and the po_num index) are
+        shared with this stop; returns self if no PO changed.
+        Raises KeyError for a PO that is not on this stop.
+        """
+        po_list = None
+        for po in processed_pos:
+            position = self.po_position(po.po_num)
+            if position is None:
+                raise KeyError(f"PO {po.po_num} is not on stop {self.id}")
+            if self.po_list[position] is po:
+                continue
+            if po_list is None:
+                po_list = list(self.po_list)
+            po_list[position] = po
+        
+        if po_list is None:
+            return self
+        # Same po_nums at the same positions, so the index carries over (model_copy keeps it)
+        return self.model_copy(update={"po_list": tuple(po_list)})
+
+    def _build_po_index(self) -> dict[str, int]:
+        index = {}
+        for position, po in enumerate(self.po_list):
+            if index.setdefault(po.po_num, position) != position:
+                raise ValueError(f"Duplicate po_num {po.po_num} on stop {self.id}")
+        self._po_index = index
+        return index
 
 class Shipment(BaseModel):
     id: int
@@ -57,3 +137,13 @@ class Shipment(BaseModel):
     bol_num: str 
     status: ShipmentStatus
     stops: list[Stop] = Field(default_factory=list)
+
+class EscalationDecision(BaseModel):
+    """Structured LLM verdict on a human reply to an escalated PO."""
+    po_state: PoState = Field(
+        description="SCHEDULED if approved, PENDING if still in progress, ESCALATED if there is still a problem",
+    )
+    escalation_reason: str | None = Field(
+        default=None,
+        description="Short new escalation reason, only when ESCALATED",
+    )
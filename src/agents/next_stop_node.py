@@ -2,18 +2,22 @@
 NextStop node - Operates at Shipment level to advance to next stop
 """
 from src.agents import ShipmentState
+from src.agents.shipment_processor_node import next_planned_stop
 
 
 def next_stop_node(state: ShipmentState) -> ShipmentState:
     """
     Advance to the next stop after current stop is processed.
-    This operates at the Shipment level.
+    This operates at the Shipment level and skips the stops the execution
+    plan already settled.
     """
     current_stop_index = state["current_stop_index"]
+    next_stop_index = next_planned_stop(state)
+    if next_stop_index is None:
+        next_stop_index = len(state["shipment"].stops)
     
-    print(f"\n→ Moving to next stop (from index {current_stop_index} to {current_stop_index + 1})")
+    print(f"\n→ Moving to next stop (from index {current_stop_index} to {next_stop_index})")
     
     return {
-        **state,
-        "current_stop_index": current_stop_index + 1
+        "current_stop_index": next_stop_index
     }
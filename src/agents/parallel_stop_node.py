@@ -0,0 +1,94 @@
+"""
+Parallel Stop nodes - Fan out every stop of a shipment at once
+
+These nodes:
+- Operate at Shipment level
+- Dispatch one stop worker per stop queued in the execution plan using
+  Send (map step); settled stops were already handled by shipment_processor
+- Merge per-stop results and processed stops into ShipmentState via
+  reducers (reduce step), each stop at its original index
+"""
+from langgraph.types import Send
+
+from src.agents import ShipmentState, StopTask
+from src.agents.stop_invoker_node import build_stop_state
+from src.agents.stop_subgraph import stop_subgraph
+
+# Node names (shared with graph_builder so Send targets stay in sync)
+STOP_WORKER = "stop_worker"
+STOP_COLLECTOR = "stop_collector"
+
+
+def dispatch_stops(state: ShipmentState) -> list[Send] | str:
+    """
+    Fan out the queued stops of the shipment to stop workers in a single superstep.
+    
+    Returns:
+        A Send per queued stop, or the collector node name if there are none
+    """
+    stops = state["shipment"].stops
+    plan = state.get("execution_plan")
+    stop_queue = plan["stop_queue"] if plan is not None else range(len(stops))
+    
+    if not stop_queue:
+        return STOP_COLLECTOR
+    
+    print(f"\n⚡ Dispatching {len(stop_queue)} stops in parallel")
+    
+    return [
+        Send(STOP_WORKER, {"stop_index": idx, "stop": stops[idx]})
+        for idx in stop_queue
+    ]
+
+
+def stop_worker_node(task: StopTask) -> ShipmentState:
+    """
+    Process a single stop dispatched by dispatch_stops.
+    
+    Only the results for this stop are returned; the shipment and
+    stop_results reducers merge them with the other workers' output.
+    """
+    stop_index = task["stop_index"]
+    stop = task["stop"]
+    
+    print(f"\n=== Processing Stop {stop_index + 1} (ID: {stop.id}) in parallel ===")
+    
+    stop_result = stop_subgraph.invoke(build_stop_state(stop))
+    
+    return {
+        "shipment": {stop_index: stop_result["stop"]},
+        "stop_results": {stop.id: stop_result["po_results"]}
+    }
+
+
+async def astop_worker_node(task: StopTask) -> ShipmentState:
+    """
+    Async variant of stop_worker_node.
+    Awaits the stop subgraph so all stops share one event loop.
+    """
+    stop_index = task["stop_index"]
+    stop = task["stop"]
+    
+    print(f"\n=== Processing Stop {stop_index + 1} (ID: {stop.id}) in parallel ===")
+    
+    stop_result = await stop_subgraph.ainvoke(build_stop_state(stop))
+    
+    return {
+        "shipment": {stop_index: stop_result["stop"]},
+        "stop_results": {stop.id: stop_result["po_results"]}
+    }
+
+
+def stop_collector_node(state: ShipmentState) -> ShipmentState:
+    """
+    Join point after all stop workers finish.
+    The processed stops are already merged into the shipment; mark completion.
+    """
+    shipment = state["shipment"]
+    
+    print(f"\n=== All {len(shipment.stops)} stops processed in parallel ===")
+    
+    return {
+        "current_stop_index": len(shipment.stops),
+        "processing_complete": True
+    }
@@ -1,10 +1,22 @@
 """
 POProcessor node - Processes individual purchase orders
 This demonstrates parallel processing capabilities at the PO level
+
+Only ESCALATED POs need the PO subgraph (review loop, interrupt); the stop
+subgraph settles the others in bulk with settle_clean_pos unless
+Config.po_fast_path is off. The per-PO simulated work (simulate_po_work)
+applies to POs that run through the subgraph.
+
+PurchaseOrder is frozen: nodes return an updated copy (po.replace) and
+never change the PO they were given, which the parent stop and
+checkpoints may still reference.
 """
+from langgraph.types import interrupt
+from src.config import Config
 from src.agents import POState
-from src.agents.model import PoState as PoStateEnum
-from src.chat.service.llm_chat_model_service import llm
+from src.agents.model import EscalationDecision, PoState as PoStateEnum, PurchaseOrder
+from src.agents.escalation_decision_engine import escalation_decision_engine
+import asyncio
 import time
 import random
 
@@ -22,19 +34,71 @@ def po_processor_node(state: POState) -> POState:
     
     print(f"\n  → Processing PO: {po.po_num}, State: {po.po_state}, Escalated: {po.is_escalated}")
     
-    # Simulate processing time
-    time.sleep(random.uniform(1.0, 5.0))
+    simulate_po_work()
+    
+    return settle_po(state)
+
+
+async def apo_processor_node(state: POState) -> POState:
+    """
+    Async variant of po_processor_node.
+    Simulated work awaits instead of blocking a thread, so many POs can be
+    in flight on a single event loop.
+    """
+    po = state["po"]
+    
+    print(f"\n  → Processing PO: {po.po_num}, State: {po.po_state}, Escalated: {po.is_escalated}")
+    
+    await asimulate_po_work()
+    
+    return settle_po(state)
+
+
+def simulate_po_work():
+    """Simulated per-PO processing time (Config.po_simulated_work_seconds range)."""
+    time.sleep(random.uniform(*Config.po_simulated_work_seconds))
+
+
+async def asimulate_po_work():
+    """Async variant of simulate_po_work."""
+    await asyncio.sleep(random.uniform(*Config.po_simulated_work_seconds))
+
+
+def needs_po_subgraph(po: PurchaseOrder) -> bool:
+    """Whether the PO must run through the PO subgraph rather than the bulk fast path."""
+    return not Config.po_fast_path or po.po_state == PoStateEnum.ESCALATED
+
+
+def settle_clean_pos(pos: list[PurchaseOrder]) -> list[PurchaseOrder]:
+    """
+    Settle non-escalated POs in one pass, without the PO subgraph.
+    Same outcome as settle_po for SCHEDULED and PENDING POs; only POs whose
+    flags change are copied.
+    """
+    return [
+        po.replace(is_escalated=False, escalation_reason=None)
+        if po.po_state == PoStateEnum.SCHEDULED
+        else po.replace(is_escalated=False)
+        for po in pos
+    ]
+
+
+def settle_po(state: POState) -> POState:
+    """
+    Check PO state and set escalation flags.
+    Shared by the sync and async PO processor nodes.
+    """
+    po = state["po"]
     
     # Check PO state and handle escalations
     if po.po_state == PoStateEnum.ESCALATED:
         print(f"    ⚠️  PO {po.po_num} is ESCALATED")
-        po.is_escalated = True
-        
-        if not po.escalation_reason:
-            po.escalation_reason = "PO requires manual review"
+        po = po.replace(
+            is_escalated=True,
+            escalation_reason=po.escalation_reason or "PO requires manual review"
+        )
         
         return {
-            **state,
             "po": po,
             "processing_result": "ESCALATED",
             "needs_review": True,
@@ -43,10 +107,9 @@ def po_processor_node(state: POState) -> POState:
     
     elif po.po_state == PoStateEnum.PENDING:
         print(f"    ⏳ PO {po.po_num} is PENDING - awaiting confirmation")
-        po.is_escalated = False
+        po = po.replace(is_escalated=False)
         
         return {
-            **state,
             "po": po,
             "processing_result": "PENDING",
             "needs_review": False,
@@ -55,11 +118,9 @@ def po_processor_node(state: POState) -> POState:
     
     else:  # SCHEDULED
         print(f"    ✓ PO {po.po_num} is SCHEDULED - processing complete")
-        po.is_escalated = False
-        po.escalation_reason = None
+        po = po.replace(is_escalated=False, escalation_reason=None)
         
         return {
-            **state,
             "po": po,
             "processing_result": "SCHEDULED",
             "needs_review": False,
@@ -83,67 +144,83 @@ def check_po_needs_review(state: POState) -> str:
 def resolve_po_escalation(state: POState) -> POState:
     """
     Resolve PO escalation by requesting human input via LLM.
-    If input is acceptable, resolve the state.
-    Otherwise, keep needs_review=True to loop again.
+    The PO subgraph pauses on a persisted interrupt until the human's
+    answer arrives (see escalation_service.resume_escalation).
+    The answer is judged as a structured EscalationDecision, by local rules
+    when unambiguous and by the LLM otherwise (see escalation_decision_engine);
+    only a decision that is still ESCALATED keeps needs_review=True to loop again.
     """
     po = state["po"]
     
     print(f"\n  🤖 Requesting human input for escalated PO {po.po_num}")
     print(f"     Escalation reason: {po.escalation_reason}")
-    raw_input = input(f"  📫Enter your input (simulating email resolution): ")
+    raw_input = interrupt(build_review_request(po))
+    
+    # Rules settle unambiguous replies; the rest go to the (cached, batched) LLM
+    decision = escalation_decision_engine.decide(po, raw_input)
     
-    # Use LLM to ask for human input
-    prompt = f"""Evaluate the following input to determine if the PO should be approved or rejected.
+    return apply_escalation_decision(state, raw_input, decision)
 
-Purchase Order: {po.po_num}
-Purchase Order State: {po.po_state}
-Purchase Order Escalated: {po.is_escalated}
-Purchase Order Escalation Reason: {po.escalation_reason}
 
-Input: {raw_input}
+async def aresolve_po_escalation(state: POState) -> POState:
+    """
+    Async variant of resolve_po_escalation.
+    An LLM call is awaited, so other POs keep making progress meanwhile.
+    """
+    po = state["po"]
+    
+    print(f"\n  🤖 Requesting human input for escalated PO {po.po_num}")
+    print(f"     Escalation reason: {po.escalation_reason}")
+    raw_input = interrupt(build_review_request(po))
+    
+    # Rules settle unambiguous replies; the rest go to the (cached, batched) LLM
+    decision = await escalation_decision_engine.adecide(po, raw_input)
+    
+    return apply_escalation_decision(state, raw_input, decision)
 
-Possible states to return:
-    SCHEDULED: if approved, looks good, or otherise schedule
-    PENDING: if still in progress, or otherwise incomplete
-    ESCALATED: if there is still a problem. Update the escalation reason and return the escalated state.
 
-What is your decision?"""
-    
-    # Get human input via LLM
-    response = llm.invoke([{"role": "user", "content": prompt}])
-    human_input = response.content.strip().lower()
+def build_review_request(po: PurchaseOrder) -> dict:
+    """Interrupt payload describing what the human is asked to answer."""
+    return {
+        "po_num": po.po_num,
+        "escalation_reason": po.escalation_reason,
+        "question": "Enter your input (simulating email resolution)"
+    }
+
+
+def apply_escalation_decision(state: POState, human_input: str, decision: EscalationDecision) -> POState:
+    """
+    Apply the decision on the human input to the PO.
+    Shared by the sync and async review nodes.
+    """
+    po = state["po"]
     
     print(f"     Human input received: {human_input}")
+    print(f"     Decision: {decision.po_state.value}")
     
-    # Check if input is acceptable (approve keywords)
-    approve_keywords = ["approve", "accept", "schedule", "looks good", "ok", "yes", "proceed", "continue"]
-    is_acceptable = any(keyword in human_input for keyword in approve_keywords)
-    
-    if is_acceptable:
-        print(f"  ✓ Input accepted - Resolving escalation for PO {po.po_num}")
-        
-        # Change state from ESCALATED to SCHEDULED
-        if po.po_state == PoStateEnum.ESCALATED:
-            po.po_state = PoStateEnum.SCHEDULED
-        
-        po.is_escalated = False
-        po.escalation_reason = None
-        
-        return {
-            **state,
-            "po": po,
-            "processing_result": "SCHEDULED",
-            "needs_review": False,
-            "escalation_message": None
-        }
-    else:
+    if decision.po_state == PoStateEnum.ESCALATED:
         print(f"  ⚠️  Input not acceptable - PO {po.po_num} requires additional review")
         
-        # Keep escalated state and loop again
+        # Keep escalated state (with the updated reason, if any) and loop again
+        po = po.replace(
+            is_escalated=True,
+            escalation_reason=decision.escalation_reason or po.escalation_reason
+        )
+        
         return {
-            **state,
             "po": po,
             "processing_result": "ESCALATED",
             "needs_review": True,
-            "escalation_message": f"PO {po.po_num} requires additional review. Human input: {human_input}"
+            "escalation_message": f"PO {po.po_num} requires additional review: {po.escalation_reason}"
         }
+    
+    print(f"  ✓ Input accepted - Resolving escalation for PO {po.po_num} as {decision.po_state.value}")
+    
+    po = po.replace(po_state=decision.po_state, is_escalated=False, escalation_reason=None)
+    
+    return {
+        "po": po,
+        "processing_result": decision.po_state.value,
+        "needs_review": False,
+        "escalation_message": None
+    }
@@ -7,13 +7,17 @@ This subgraph:
 - Handles PO-level escalations with human review
 - Returns results that roll up to parent Stop
 """
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from src.config import Config
 from src.agents import POState
+from src.agents.checkpointer import BoundedMemorySaver, checkpoint_serde, durable_checkpointer
 from src.agents.po_processor_node import (
     po_processor_node,
+    apo_processor_node,
     check_po_needs_review,
-    resolve_po_escalation
+    resolve_po_escalation,
+    aresolve_po_escalation
 )
 
 # Node names
@@ -23,9 +27,9 @@ PO_REVIEW = "po_review"
 # Build PO processing subgraph
 po_graph_builder = StateGraph(POState)
 
-# Add nodes
-po_graph_builder.add_node(PO_PROCESSOR, po_processor_node)
-po_graph_builder.add_node(PO_REVIEW, resolve_po_escalation)
+# Add nodes (sync implementation for invoke/stream, async for ainvoke/astream)
+po_graph_builder.add_node(PO_PROCESSOR, RunnableLambda(po_processor_node, afunc=apo_processor_node, name=PO_PROCESSOR))
+po_graph_builder.add_node(PO_REVIEW, RunnableLambda(resolve_po_escalation, afunc=aresolve_po_escalation, name=PO_REVIEW))
 
 # Start -> Process PO
 po_graph_builder.add_edge(START, PO_PROCESSOR)
@@ -50,6 +54,17 @@ po_graph_builder.add_conditional_edges(
     }
 )
 
+# Durable SQLite checkpointer when configured, otherwise a bounded in-memory one.
+# Either way finished PO threads are reclaimed and paused ones pinned.
+po_checkpointer = durable_checkpointer or BoundedMemorySaver(
+    max_threads=Config.po_checkpoint_max_threads,
+    max_bytes=Config.po_checkpoint_max_bytes,
+    ttl_seconds=Config.po_checkpoint_ttl_seconds,
+    max_pinned_threads=Config.po_checkpoint_max_pinned_threads,
+    pinned_ttl_seconds=Config.po_checkpoint_pinned_ttl_seconds,
+    serde=checkpoint_serde
+)
+
 # Compile the PO subgraph with checkpointer for parallel execution support
 # The checkpointer enables state persistence and parallel execution coordination
-po_subgraph = po_graph_builder.compile(checkpointer=MemorySaver())
+po_subgraph = po_graph_builder.compile(checkpointer=po_checkpointer)
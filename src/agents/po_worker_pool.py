@@ -0,0 +1,124 @@
+"""
+PO Worker Pool - Process-wide, bounded executor for PO subgraph runs
+
+This pool:
+- Is shared by every stop of every shipment in the process (Flask or CLI)
+- Caps concurrent PO processing at Config.po_worker_pool_size workers
+- Schedules queued POs round-robin across shipments for per-shipment fairness
+- Bounds the pending queue; submitters block when it is full (backpressure)
+- Exposes queue depth and active worker count via stats()
+"""
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from queue import Full
+from typing import Any, Callable, Hashable
+import threading
+import time
+
+from src.config import Config
+
+
+class PoWorkerPool:
+    """Fixed-size thread pool with a bounded, per-shipment fair queue."""
+
+    def __init__(self, max_workers: int, max_queue_size: int):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+        
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        
+        # Maps shipment ID to its pending tasks; order is the round-robin rotation
+        self._queues: OrderedDict[Hashable, deque] = OrderedDict()
+        self._queue_depth = 0
+        self._active_workers = 0
+        self._completed = 0
+        self._workers: list[threading.Thread] = []
+
+    def submit(self, shipment_id: Hashable, fn: Callable[..., Any], *args, timeout: float | None = None, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) on behalf of a shipment.
+        
+        Blocks while the queue is full. Raises queue.Full if timeout
+        (seconds) elapses before a slot frees up.
+        """
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._not_full:
+            while self._queue_depth >= self.max_queue_size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise Full(f"PO worker queue is full ({self.max_queue_size} pending)")
+                self._not_full.wait(remaining)
+            
+            self._queues.setdefault(shipment_id, deque()).append((future, fn, args, kwargs))
+            self._queue_depth += 1
+            
+            # Start workers lazily, up to the configured limit
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._worker_loop, name=f"po-worker-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            
+            self._not_empty.notify()
+        
+        return future
+
+    def stats(self) -> dict[str, int]:
+        """Snapshot of pool utilization."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._queue_depth,
+                "active_workers": self._active_workers,
+                "pending_shipments": len(self._queues),
+                "completed": self._completed
+            }
+
+    def _next_task(self):
+        """Pop the next task, rotating across shipments (caller holds the lock)."""
+        shipment_id, queue = next(iter(self._queues.items()))
+        task = queue.popleft()
+        
+        if queue:
+            self._queues.move_to_end(shipment_id)
+        else:
+            del self._queues[shipment_id]
+        
+        self._queue_depth -= 1
+        return task
+
+    def _worker_loop(self):
+        while True:
+            with self._not_empty:
+                while not self._queues:
+                    self._not_empty.wait()
+                future, fn, args, kwargs = self._next_task()
+                self._active_workers += 1
+                self._not_full.notify()
+            
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as exc:
+                        future.set_exception(exc)
+            finally:
+                with self._lock:
+                    self._active_workers -= 1
+                    self._completed += 1
+
+
+# Process-wide pool shared across all stops and requests
+po_worker_pool = PoWorkerPool(
+    max_workers=Config.po_worker_pool_size,
+    max_queue_size=Config.po_worker_queue_size
+)
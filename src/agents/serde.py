@@ -0,0 +1,157 @@
+"""
+Compact checkpoint serializer for shipment processing state
+
+ShipmentSerializer encodes checkpointed values with msgpack, writing
+Shipment / Stop / PurchaseOrder models positionally (no field names, module
+or class names per object) with small integer codes for ShipmentStatus,
+StopType and PoState. Values it does not understand (e.g. Send, Interrupt,
+tuples) are delegated whole to langgraph's JsonPlusSerializer, so any
+checkpoint remains readable.
+"""
+from typing import Any
+
+import ormsgpack
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.agents.model import PoState, PurchaseOrder, Shipment, ShipmentStatus, Stop, StopType
+
+# Type tag for values written by this serializer; bump on any layout change
+COMPACT_TYPE = "shipment-msgpack-v1"
+
+# msgpack extension codes
+EXT_PURCHASE_ORDER = 1
+EXT_STOP = 2
+EXT_SHIPMENT = 3
+
+# Enum codes (append only, never reorder)
+PO_STATES = (PoState.SCHEDULED, PoState.PENDING, PoState.ESCALATED)
+STOP_TYPES = (StopType.PICK_UP, StopType.DROP_OFF)
+SHIPMENT_STATUSES = (
+    ShipmentStatus.NEW,
+    ShipmentStatus.ESCALATED,
+    ShipmentStatus.NEEDS_ACTION,
+    ShipmentStatus.REQUESTED,
+    ShipmentStatus.CONFIRMED
+)
+PO_STATE_CODES = {state: code for code, state in enumerate(PO_STATES)}
+STOP_TYPE_CODES = {stop_type: code for code, stop_type in enumerate(STOP_TYPES)}
+SHIPMENT_STATUS_CODES = {status: code for code, status in enumerate(SHIPMENT_STATUSES)}
+
+# Anything not natively msgpack (enums, tuples, datetimes, ...) goes to default,
+# which only accepts the shipment models
+PACK_OPTIONS = (
+    ormsgpack.OPT_NON_STR_KEYS
+    | ormsgpack.OPT_PASSTHROUGH_BIG_INT
+    | ormsgpack.OPT_PASSTHROUGH_DATACLASS
+    | ormsgpack.OPT_PASSTHROUGH_DATETIME
+    | ormsgpack.OPT_PASSTHROUGH_ENUM
+    | ormsgpack.OPT_PASSTHROUGH_SUBCLASS
+    | ormsgpack.OPT_PASSTHROUGH_TUPLE
+    | ormsgpack.OPT_PASSTHROUGH_UUID
+)
+
+
+def pack_po(po: PurchaseOrder) -> list:
+    return [po.po_num, PO_STATE_CODES[po.po_state], po.is_escalated, po.escalation_reason]
+
+
+def unpack_po(fields: list) -> PurchaseOrder:
+    po_num, po_state, is_escalated, escalation_reason = fields
+    return PurchaseOrder.model_construct(
+        po_num=po_num,
+        po_state=PO_STATES[po_state],
+        is_escalated=is_escalated,
+        escalation_reason=escalation_reason
+    )
+
+
+def pack_stop(stop: Stop) -> list:
+    return [
+        stop.id,
+        stop.shipment_id,
+        STOP_TYPE_CODES[stop.type],
+        stop.is_escalated,
+        stop.escalation_reason,
+        [pack_po(po) for po in stop.po_list]
+    ]
+
+
+def unpack_stop(fields: list) -> Stop:
+    stop_id, shipment_id, stop_type, is_escalated, escalation_reason, po_list = fields
+    return Stop.model_construct(
+        id=stop_id,
+        shipment_id=shipment_id,
+        type=STOP_TYPES[stop_type],
+        is_escalated=is_escalated,
+        escalation_reason=escalation_reason,
+        po_list=tuple(unpack_po(po) for po in po_list)
+    )
+
+
+def pack_shipment(shipment: Shipment) -> list:
+    return [
+        shipment.id,
+        shipment.tms_id,
+        shipment.bol_num,
+        SHIPMENT_STATUS_CODES[shipment.status],
+        [pack_stop(stop) for stop in shipment.stops]
+    ]
+
+
+def unpack_shipment(fields: list) -> Shipment:
+    shipment_id, tms_id, bol_num, status, stops = fields
+    return Shipment.model_construct(
+        id=shipment_id,
+        tms_id=tms_id,
+        bol_num=bol_num,
+        status=SHIPMENT_STATUSES[status],
+        stops=[unpack_stop(stop) for stop in stops]
+    )
+
+
+def _default(obj: Any) -> ormsgpack.Ext:
+    # Exact type checks: subclasses may carry fields this layout does not know
+    if type(obj) is PurchaseOrder:
+        return ormsgpack.Ext(EXT_PURCHASE_ORDER, ormsgpack.packb(pack_po(obj)))
+    if type(obj) is Stop:
+        return ormsgpack.Ext(EXT_STOP, ormsgpack.packb(pack_stop(obj)))
+    if type(obj) is Shipment:
+        return ormsgpack.Ext(EXT_SHIPMENT, ormsgpack.packb(pack_shipment(obj)))
+    raise TypeError(f"Type is not compact-serializable: {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    fields = ormsgpack.unpackb(data)
+    if code == EXT_PURCHASE_ORDER:
+        return unpack_po(fields)
+    if code == EXT_STOP:
+        return unpack_stop(fields)
+    if code == EXT_SHIPMENT:
+        return unpack_shipment(fields)
+    raise ValueError(f"Unknown extension code: {code}")
+
+
+class ShipmentSerializer(SerializerProtocol):
+    """Schema-aware msgpack serializer with a JsonPlusSerializer fallback."""
+
+    def __init__(self, fallback: SerializerProtocol | None = None):
+        self.fallback = fallback or JsonPlusSerializer()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.fallback.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.fallback.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        try:
+            return COMPACT_TYPE, ormsgpack.packb(obj, default=_default, option=PACK_OPTIONS)
+        except (TypeError, ormsgpack.MsgpackEncodeError):
+            return self.fallback.dumps_typed(obj)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == COMPACT_TYPE:
+            return ormsgpack.unpackb(payload, ext_hook=_ext_hook, option=ormsgpack.OPT_NON_STR_KEYS)
+        return self.fallback.loads_typed(data)
@@ -0,0 +1,23 @@
+"""
+Shipment loader - validates raw JSON straight into the Shipment model
+
+Used by the API request handlers and main.py:
+- pydantic-core parses and validates the bytes in one pass (JSON mode),
+  without building an intermediate dict of the payload
+- Enum fields are validated from their JSON values
+- Malformed JSON and invalid data both raise pydantic.ValidationError
+"""
+from os import PathLike
+
+from src.agents.model import Shipment
+
+
+def load_shipment(raw: bytes | bytearray | str) -> Shipment:
+    """Shipment from a JSON document (request body or file contents)."""
+    return Shipment.model_validate_json(raw)
+
+
+def load_shipment_file(path: str | PathLike) -> Shipment:
+    """Shipment from a JSON file."""
+    with open(path, "rb") as file:
+        return load_shipment(file.read())
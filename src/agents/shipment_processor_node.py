@@ -1,23 +1,85 @@
 """
 ShipmentProcessor node - Initializes shipment processing workflow
+
+Builds the shipment's execution plan before any stop is traversed:
+- PICK_UP stops (and stops without POs) only get their escalation flags
+  cleared, so they are settled here in one bulk pass
+- Only actionable DROP_OFF stops are queued for the stop subgraph
+The plan is written to ShipmentState, so it shows up in the stream output.
 """
-from src.agents import ShipmentState
+from bisect import bisect_right
+
+from src.config import Config
+from src.agents import ExecutionPlan, ShipmentState
+from src.agents.model import Shipment, Stop, StopType
+
+
+def needs_stop_subgraph(stop: Stop) -> bool:
+    """True if the stop has to be processed by the stop subgraph."""
+    return not Config.stop_execution_plan or (stop.type == StopType.DROP_OFF and bool(stop.po_list))
+
+
+def build_execution_plan(shipment: Shipment) -> ExecutionPlan:
+    """Split the shipment's stops into the queue to traverse and the stops settled in bulk."""
+    stop_queue = []
+    settled_stops = []
+    for stop_index, stop in enumerate(shipment.stops):
+        if needs_stop_subgraph(stop):
+            stop_queue.append(stop_index)
+        else:
+            settled_stops.append(stop.id)
+    
+    return {"stop_queue": stop_queue, "settled_stops": settled_stops}
+
+
+def next_planned_stop(state: ShipmentState) -> int | None:
+    """
+    Index of the queued stop after the current one, or None if it was the last.
+    Runs checkpointed before execution plans existed walk every stop.
+    """
+    current_stop_index = state["current_stop_index"]
+    plan = state.get("execution_plan")
+    
+    if plan is None:
+        stop_queue = range(len(state["shipment"].stops))
+    else:
+        stop_queue = plan["stop_queue"]
+    
+    position = bisect_right(stop_queue, current_stop_index)
+    return stop_queue[position] if position < len(stop_queue) else None
 
 
 def shipment_processor_node(state: ShipmentState) -> ShipmentState:
     """
     Initialize shipment processing at the Shipment level.
-    Sets up the initial state for iterating through stops.
+    Settles the stops that need no processing, queues the rest and points
+    current_stop_index at the first queued stop.
     """
+    shipment = state["shipment"]
+    
     print(f"\n=== Starting Shipment Processing ===")
-    print(f"Shipment ID: {state['shipment'].id}")
-    print(f"TMS ID: {state['shipment'].tms_id}")
-    print(f"BOL Number: {state['shipment'].bol_num}")
-    print(f"Total Stops: {len(state['shipment'].stops)}")
-    
-    return {
-        **state,
-        "current_stop_index": 0,
-        "stop_results": {},
-        "processing_complete": False
+    print(f"Shipment ID: {shipment.id}")
+    print(f"TMS ID: {shipment.tms_id}")
+    print(f"BOL Number: {shipment.bol_num}")
+    print(f"Total Stops: {len(shipment.stops)}")
+    
+    plan = build_execution_plan(shipment)
+    stop_queue = plan["stop_queue"]
+    
+    # Same outcome as the stop subgraph's PICK_UP branch (or a DROP_OFF rollup without POs)
+    settled = {}
+    for stop_index, stop in enumerate(shipment.stops):
+        if not needs_stop_subgraph(stop) and (stop.is_escalated or stop.escalation_reason is not None):
+            settled[stop_index] = stop.replace(is_escalated=False, escalation_reason=None)
+    
+    print(f"Execution plan: {len(stop_queue)} stops queued, {len(plan['settled_stops'])} settled in bulk")
+    
+    update = {
+        "execution_plan": plan,
+        "current_stop_index": stop_queue[0] if stop_queue else len(shipment.stops),
+        "stop_results": {stop_id: {} for stop_id in plan["settled_stops"]},
+        "processing_complete": not stop_queue
     }
+    if settled:
+        update["shipment"] = settled
+    return update
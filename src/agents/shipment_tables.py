@@ -0,0 +1,274 @@
+"""
+Columnar shipment tables - bulk import/export of shipments with pyarrow
+
+A set of shipments is stored as three flat tables in one directory, as
+Parquet (<name>.parquet) or Arrow IPC (<name>.arrow) files:
+- shipments: id, tms_id, bol_num, status
+- stops: shipment_id, id, stop_shipment_id, type, is_escalated, escalation_reason
+  (shipment_id is the owning shipment; stop_shipment_id is the stop's own
+  shipment_id field, which need not match it)
+- pos: shipment_id, stop_id, po_num, po_state, is_escalated, escalation_reason
+
+All three are sorted by shipment_id (write_shipment_tables requires shipments
+in ascending id order); stops and POs keep their order within a shipment.
+read_shipments() memory-maps the files and merges the tables batch by batch,
+rebuilding one Shipment at a time, so only the current record batches are
+held in memory.
+"""
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from src.agents.model import Shipment
+
+SHIPMENTS = "shipments"
+STOPS = "stops"
+POS = "pos"
+
+SHIPMENT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("tms_id", pa.string()),
+    ("bol_num", pa.string()),
+    ("status", pa.string())
+])
+
+STOP_SCHEMA = pa.schema([
+    ("shipment_id", pa.int64()),
+    ("id", pa.int64()),
+    ("stop_shipment_id", pa.int64()),
+    ("type", pa.string()),
+    ("is_escalated", pa.bool_()),
+    ("escalation_reason", pa.string())
+])
+
+PO_SCHEMA = pa.schema([
+    ("shipment_id", pa.int64()),
+    ("stop_id", pa.int64()),
+    ("po_num", pa.string()),
+    ("po_state", pa.string()),
+    ("is_escalated", pa.bool_()),
+    ("escalation_reason", pa.string())
+])
+
+SCHEMAS = {SHIPMENTS: SHIPMENT_SCHEMA, STOPS: STOP_SCHEMA, POS: PO_SCHEMA}
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+class TableWriter:
+    """Appends rows to a Parquet or Arrow IPC file, flushing a record batch every batch_rows rows."""
+
+    def __init__(self, path: str | Path, schema: pa.Schema, batch_rows: int = 65_536):
+        self.path = Path(path)
+        self.schema = schema
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._columns: dict[str, list] = {name: [] for name in schema.names}
+        self._pending = 0
+    
+        if self.path.suffix == FORMATS["arrow"]:
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = ipc.new_file(self._sink, schema)
+        else:
+            self._sink = None
+            self._writer = pq.ParquetWriter(str(self.path), schema)
+
+    def append(self, row: dict):
+        for name, column in self._columns.items():
+            column.append(row.get(name))
+        self._pending += 1
+        if self._pending >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        batch = pa.record_batch(self._columns, schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows_written += self._pending
+        self._columns = {name: [] for name in self.schema.names}
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def table_path(directory: str | Path, name: str, format: str = "parquet") -> Path:
+    return Path(directory) / f"{name}{FORMATS[format]}"
+
+
+def write_shipment_tables(
+    shipments: Iterable[Shipment],
+    directory: str | Path,
+    format: str = "parquet",
+    batch_rows: int = 65_536
+) -> int:
+    """Write shipments (ascending id order) as the three tables; returns the shipment count."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    writers = {
+        name: TableWriter(table_path(directory, name, format), schema, batch_rows)
+        for name, schema in SCHEMAS.items()
+    }
+    
+    count = 0
+    previous_id = None
+    try:
+        for shipment in shipments:
+            if previous_id is not None and shipment.id <= previous_id:
+                raise ValueError(f"Shipments must be written in ascending id order ({shipment.id} after {previous_id})")
+            previous_id = shipment.id
+    
+            writers[SHIPMENTS].append({
+                "id": shipment.id,
+                "tms_id": shipment.tms_id,
+                "bol_num": shipment.bol_num,
+                "status": shipment.status.value
+            })
+            for stop in shipment.stops:
+                writers[STOPS].append({
+                    "shipment_id": shipment.id,
+                    "id": stop.id,
+                    "stop_shipment_id": stop.shipment_id,
+                    "type": stop.type.value,
+                    "is_escalated": stop.is_escalated,
+                    "escalation_reason": stop.escalation_reason
+                })
+                for po in stop.po_list:
+                    writers[POS].append({
+                        "shipment_id": shipment.id,
+                        "stop_id": stop.id,
+                        "po_num": po.po_num,
+                        "po_state": po.po_state.value,
+                        "is_escalated": po.is_escalated,
+                        "escalation_reason": po.escalation_reason
+                    })
+            count += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    
+    return count
+
+
+def read_shipments(directory: str | Path, batch_rows: int = 8192) -> Iterator[Shipment]:
+    """
+    Shipments rebuilt from the tables in directory, one at a time.
+    Raises ValueError if a stop or PO row belongs to no shipment (tables not sorted by shipment_id).
+    """
+    stop_rows = _ChildRows(_read_batches(directory, STOPS, batch_rows), STOPS)
+    po_rows = _ChildRows(_read_batches(directory, POS, batch_rows), POS)
+    
+    for batch in _read_batches(directory, SHIPMENTS, batch_rows):
+        for shipment_row in batch.to_pylist():
+            shipment_id = shipment_row["id"]
+            # New dicts: the row dicts stay referenced by their record batch until it is consumed
+            stops = {
+                stop_row["id"]: _stop_fields(stop_row)
+                for stop_row in stop_rows.take(shipment_id)
+            }
+            for po_row in po_rows.take(shipment_id):
+                if po_row["stop_id"] not in stops:
+                    raise ValueError(f"PO {po_row['po_num']} references unknown stop {po_row['stop_id']} of shipment {shipment_id}")
+                stops[po_row["stop_id"]]["po_list"].append(po_row)
+            
+            yield Shipment.model_validate({**shipment_row, "stops": list(stops.values())})
+    
+    stop_rows.check_consumed()
+    po_rows.check_consumed()
+
+
+def _stop_fields(stop_row: dict) -> dict:
+    """Stop model fields from a stops row (tables written without stop_shipment_id use the owning shipment)."""
+    fields = {name: value for name, value in stop_row.items() if name != "stop_shipment_id"}
+    if stop_row.get("stop_shipment_id") is not None:
+        fields["shipment_id"] = stop_row["stop_shipment_id"]
+    fields["po_list"] = []
+    return fields
+
+
+def _read_batches(directory: str | Path, name: str, batch_rows: int) -> Iterator[pa.RecordBatch]:
+    """Record batches of at most batch_rows rows from a memory-mapped table file."""
+    for format, suffix in FORMATS.items():
+        path = Path(directory) / f"{name}{suffix}"
+        if path.exists():
+            break
+    else:
+        raise FileNotFoundError(f"No {name}.parquet or {name}.arrow in {directory}")
+    
+    if format == "arrow":
+        with pa.memory_map(str(path), "r") as source:
+            reader = ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                batch = reader.get_batch(index)
+                # Zero-copy slices, so at most batch_rows rows are converted at a time
+                for offset in range(0, batch.num_rows, batch_rows):
+                    yield batch.slice(offset, batch_rows)
+    else:
+        parquet_file = pq.ParquetFile(str(path), memory_map=True)
+        yield from parquet_file.iter_batches(batch_size=batch_rows)
+
+
+class _ChildRows:
+    """Stop or PO rows, handed out per shipment in shipment_id order."""
+
+    def __init__(self, batches: Iterator[pa.RecordBatch], name: str):
+        self._batches = batches
+        self._name = name
+        self._rows: list[dict] = []
+        self._shipment_ids: list[int] = []
+        self._position = 0
+        self._exhausted = False
+
+    def take(self, shipment_id: int) -> list[dict]:
+        """All rows of the shipment (they are contiguous in the sorted table)."""
+        taken = []
+        while self._position < len(self._shipment_ids) or self._load_batch():
+            if self._shipment_ids[self._position] < shipment_id:
+                self._no_matching_shipment()
+            end = bisect_right(self._shipment_ids, shipment_id, self._position)
+            taken.extend(self._rows[self._position:end])
+            self._position = end
+            if end < len(self._shipment_ids):
+                break
+        return taken
+
+    def check_consumed(self):
+        if self._position < len(self._shipment_ids) or self._load_batch():
+            self._no_matching_shipment()
+
+    def _load_batch(self) -> bool:
+        """Convert the next record batch; False when the table is exhausted."""
+        if self._exhausted:
+            return False
+        for batch in self._batches:
+            if batch.num_rows == 0:
+                continue
+            shipment_ids = batch.column("shipment_id")
+            if len(shipment_ids) > 1 and not pc.all(pc.less_equal(shipment_ids[:-1], shipment_ids[1:])).as_py():
+                raise ValueError(f"{self._name} table must be sorted by shipment_id")
+            self._rows = batch.to_pylist()
+            self._shipment_ids = shipment_ids.to_pylist()
+            self._position = 0
+            return True
+        self._exhausted = True
+        self._rows, self._shipment_ids, self._position = [], [], 0
+        return False
+
+    def _no_matching_shipment(self):
+        shipment_id = self._shipment_ids[self._position]
+        raise ValueError(f"{self._name} row for shipment {shipment_id} has no matching shipment (tables must be sorted by shipment_id)")
@@ -0,0 +1,343 @@
+"""
+SqliteCheckpointSaver - durable checkpointer on a local SQLite file
+
+- Built on SQLAlchemy (pooled connections, WAL journal, busy timeout)
+- Several worker processes can share one database file
+- All writes of a task are stored in one batched transaction
+- A crashed run resumes from its last completed superstep
+
+Imported only when Config.checkpoint_db_path is set, so in-memory runs do
+not load SQLAlchemy.
+"""
+from typing import Any, Iterator, AsyncIterator, Sequence
+import asyncio
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata
+)
+from langgraph.checkpoint.serde.types import TASKS
+from langgraph.constants import INTERRUPT
+from sqlalchemy import (
+    Column,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    delete,
+    event,
+    func,
+    select
+)
+from sqlalchemy.dialects.sqlite import insert
+
+metadata_obj = MetaData()
+
+checkpoints_table = Table(
+    "checkpoints",
+    metadata_obj,
+    Column("thread_id", String, primary_key=True),
+    Column("checkpoint_ns", String, primary_key=True, default=""),
+    Column("checkpoint_id", String, primary_key=True),
+    Column("parent_checkpoint_id", String, nullable=True),
+    Column("checkpoint_type", String, nullable=False),
+    Column("checkpoint", LargeBinary, nullable=False),
+    Column("metadata_type", String, nullable=False),
+    Column("metadata", LargeBinary, nullable=False)
+)
+
+writes_table = Table(
+    "writes",
+    metadata_obj,
+    Column("thread_id", String, primary_key=True),
+    Column("checkpoint_ns", String, primary_key=True, default=""),
+    Column("checkpoint_id", String, primary_key=True),
+    Column("task_id", String, primary_key=True),
+    Column("idx", Integer, primary_key=True),
+    Column("channel", String, nullable=False),
+    Column("value_type", String, nullable=False),
+    Column("value", LargeBinary, nullable=False),
+    Column("task_path", String, nullable=False, default="")
+)
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """Durable checkpointer storing checkpoints and writes in a SQLite file."""
+
+    def __init__(self, db_path: str, *, pool_size: int = 5, busy_timeout_ms: int = 30_000, serde=None):
+        super().__init__(serde=serde)
+        self.db_path = db_path
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            pool_size=pool_size,
+            pool_pre_ping=True,
+            connect_args={"check_same_thread": False}
+        )
+        
+        @event.listens_for(self.engine, "connect")
+        def configure_connection(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            # WAL lets readers in other processes proceed while one process writes
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+            cursor.close()
+        
+        metadata_obj.create_all(self.engine)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        
+        query = select(checkpoints_table).where(
+            checkpoints_table.c.thread_id == thread_id,
+            checkpoints_table.c.checkpoint_ns == checkpoint_ns
+        )
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        else:
+            query = query.order_by(checkpoints_table.c.checkpoint_id.desc()).limit(1)
+        
+        with self.engine.connect() as conn:
+            row = conn.execute(query).first()
+            if row is None:
+                return None
+            return self._load_tuple(conn, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = select(checkpoints_table)
+        if config:
+            query = query.where(checkpoints_table.c.thread_id == config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query = query.where(checkpoints_table.c.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            query = query.where(checkpoints_table.c.checkpoint_id < before_checkpoint_id)
+        query = query.order_by(checkpoints_table.c.checkpoint_id.desc())
+        
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+            for row in rows:
+                # Metadata is serialized, so it is filtered after loading
+                if filter:
+                    metadata = self.serde.loads_typed((row.metadata_type, row.metadata))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                
+                if limit is not None:
+                    if limit <= 0:
+                        break
+                    limit -= 1
+                
+                yield self._load_tuple(conn, row)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        
+        # Pending sends are rebuilt from the parent's TASKS writes on load
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(c)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        
+        with self.engine.begin() as conn:
+            conn.execute(
+                insert(checkpoints_table).prefix_with("OR REPLACE"),
+                {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint["id"],
+                    "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                    "checkpoint_type": checkpoint_type,
+                    "checkpoint": checkpoint_bytes,
+                    "metadata_type": metadata_type,
+                    "metadata": metadata_bytes
+                }
+            )
+        
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if not writes:
+            return
+        
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_bytes = self.serde.dumps_typed(value)
+            rows.append({
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+                "checkpoint_id": config["configurable"]["checkpoint_id"],
+                "task_id": task_id,
+                "idx": WRITES_IDX_MAP.get(channel, idx),
+                "channel": channel,
+                "value_type": value_type,
+                "value": value_bytes,
+                "task_path": task_path
+            })
+        
+        # Special writes (errors, interrupts, resumes) replace; regular writes are kept once
+        conflict = "OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "OR IGNORE"
+        
+        # One transaction for the whole batch
+        with self.engine.begin() as conn:
+            conn.execute(insert(writes_table).prefix_with(conflict), rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(checkpoints_table).where(checkpoints_table.c.thread_id == thread_id))
+            conn.execute(delete(writes_table).where(writes_table.c.thread_id == thread_id))
+
+    def pin(self, thread_id: str) -> None:
+        """Durable storage never evicts, so pinning is a no-op."""
+
+    def unpin(self, thread_id: str) -> None:
+        """Durable storage never evicts, so unpinning is a no-op."""
+
+    def interrupted_thread_ids(self) -> Sequence[str]:
+        """Threads with a stored interrupt write (the caller checks it is on the latest checkpoint)."""
+        with self.engine.connect() as conn:
+            return list(conn.execute(
+                select(writes_table.c.thread_id).where(writes_table.c.channel == INTERRUPT).distinct()
+            ).scalars())
+
+    def begin_run(self, thread_id: str) -> None:
+        """Durable storage never evicts, so run tracking is a no-op."""
+
+    def end_run(self, thread_id: str) -> None:
+        """Durable storage never evicts, so run tracking is a no-op."""
+
+    def stats(self) -> dict[str, int | str]:
+        """Snapshot of checkpoint storage held in the database."""
+        with self.engine.connect() as conn:
+            threads = conn.execute(select(func.count(func.distinct(checkpoints_table.c.thread_id)))).scalar_one()
+            checkpoints = conn.execute(select(func.count()).select_from(checkpoints_table)).scalar_one()
+            writes = conn.execute(select(func.count()).select_from(writes_table)).scalar_one()
+        return {
+            "db_path": self.db_path,
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes
+        }
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def _load_tuple(self, conn, row) -> CheckpointTuple:
+        """Build a CheckpointTuple from a checkpoints row and its writes."""
+        def load_writes(checkpoint_id: str):
+            return conn.execute(
+                select(writes_table).where(
+                    writes_table.c.thread_id == row.thread_id,
+                    writes_table.c.checkpoint_ns == row.checkpoint_ns,
+                    writes_table.c.checkpoint_id == checkpoint_id
+                ).order_by(writes_table.c.task_path, writes_table.c.task_id, writes_table.c.idx)
+            ).all()
+        
+        sends = []
+        if row.parent_checkpoint_id:
+            sends = [
+                self.serde.loads_typed((write.value_type, write.value))
+                for write in load_writes(row.parent_checkpoint_id)
+                if write.channel == TASKS
+            ]
+        
+        checkpoint = self.serde.loads_typed((row.checkpoint_type, row.checkpoint))
+        
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "pending_sends": sends},
+            metadata=self.serde.loads_typed((row.metadata_type, row.metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": row.thread_id,
+                        "checkpoint_ns": row.checkpoint_ns,
+                        "checkpoint_id": row.parent_checkpoint_id,
+                    }
+                }
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, write.value)))
+                for write in load_writes(row.checkpoint_id)
+            ]
+        )
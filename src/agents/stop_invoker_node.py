@@ -6,11 +6,32 @@ This node:
 - Extracts current Stop
 - Invokes stop subgraph with StopState
 - Rolls up results back to Shipment level
+
+Only the stops queued in the execution plan reach this node (see
+shipment_processor_node).
 """
 from src.agents import ShipmentState, StopState
+from src.agents.model import Stop
+from src.agents.shipment_processor_node import next_planned_stop
 from src.agents.stop_subgraph import stop_subgraph
 
 
+def build_stop_state(stop: Stop) -> StopState:
+    """
+    Create the Stop-level state for a stop.
+    Shared by the sequential invoker and the parallel stop workers.
+    """
+    return {
+        "stop": stop,
+        "po_results": {},
+        "processed_pos": {},
+        "po_escalations": {},
+        "all_pos_processed": False,
+        "needs_human_review": False,
+        "escalation_message": None
+    }
+
+
 def stop_invoker_node(state: ShipmentState) -> ShipmentState:
     """
     Invoke stop processing for the current stop.
@@ -27,7 +48,6 @@ def stop_invoker_node(state: ShipmentState) -> ShipmentState:
     if current_stop_index >= len(shipment.stops):
         print("\n=== All stops processed ===")
         return {
-            **state,
             "processing_complete": True
         }
     
@@ -36,29 +56,63 @@ def stop_invoker_node(state: ShipmentState) -> ShipmentState:
     print(f"\n=== Processing Stop {current_stop_index + 1}/{len(shipment.stops)} ===")
     
     # Create Stop-level state
-    stop_state: StopState = {
-        "stop": current_stop,
-        "po_results": {},
-        "all_pos_processed": False,
-        "needs_human_review": False,
-        "escalation_message": None
-    }
+    stop_state = build_stop_state(current_stop)
     
     # Invoke stop subgraph (which handles PO subgraph invocation)
     stop_result = stop_subgraph.invoke(stop_state)
     
-    # Update the stop in the shipment with processed version
-    shipment.stops[current_stop_index] = stop_result["stop"]
+    return roll_up_stop_result(state, stop_result)
+
+
+async def astop_invoker_node(state: ShipmentState) -> ShipmentState:
+    """
+    Async variant of stop_invoker_node.
+    Awaits the stop subgraph so its PO branches run on the event loop.
+    """
+    current_stop_index = state["current_stop_index"]
+    shipment = state["shipment"]
+    
+    # Check if all stops are processed
+    if current_stop_index >= len(shipment.stops):
+        print("\n=== All stops processed ===")
+        return {
+            "processing_complete": True
+        }
     
-    # Roll up results to shipment level
-    stop_results = state.get("stop_results", {})
-    stop_results[current_stop.id] = stop_result["po_results"]
+    current_stop = shipment.stops[current_stop_index]
     
-    return {
-        **state,
-        "shipment": shipment,
-        "stop_results": stop_results
+    print(f"\n=== Processing Stop {current_stop_index + 1}/{len(shipment.stops)} ===")
+    
+    # Create Stop-level state
+    stop_state = build_stop_state(current_stop)
+    
+    # Invoke stop subgraph (which handles PO subgraph invocation)
+    stop_result = await stop_subgraph.ainvoke(stop_state)
+    
+    return roll_up_stop_result(state, stop_result)
+
+
+def roll_up_stop_result(state: ShipmentState, stop_result: StopState) -> ShipmentState:
+    """
+    Roll the processed current stop and its PO results up to Shipment level.
+    Only this stop is emitted; the shipment and stop_results reducers merge it.
+    After the last queued stop the run is marked complete here, so no extra
+    invoker step is needed to find that out.
+    """
+    current_stop_index = state["current_stop_index"]
+    stop = stop_result["stop"]
+    
+    update = {
+        "shipment": {current_stop_index: stop},
+        "stop_results": {stop.id: stop_result["po_results"]}
     }
+    
+    if next_planned_stop(state) is None:
+        print("\n=== All stops processed ===")
+        update["current_stop_index"] = len(state["shipment"].stops)
+        update["processing_complete"] = True
+    
+    return update
 
 
 def check_if_complete(state: ShipmentState) -> str:
@@ -26,11 +26,9 @@ def stop_processor_node(state: StopState) -> StopState:
     # Deterministic processing: PICK_UP stops are skipped
     if stop.type == StopType.PICK_UP:
         print(f"⚠️  PICK_UP stop detected - marking as non-escalated and skipping")
-        stop.is_escalated = False
-        stop.escalation_reason = None
+        stop = stop.replace(is_escalated=False, escalation_reason=None)
         
         return {
-            **state,
             "stop": stop,
             "po_results": {},
             "all_pos_processed": True,
@@ -42,6 +40,7 @@ def stop_processor_node(state: StopState) -> StopState:
     print(f"✓ DROP_OFF stop - processing POs in parallel")
     
     po_results = {}
+    processed_pos = []
     any_escalated = False
     escalation_messages = []
     
@@ -66,26 +65,25 @@ def stop_processor_node(state: StopState) -> StopState:
             if po_result.get("escalation_message"):
                 escalation_messages.append(po_result["escalation_message"])
         
-        # Update the PO in the stop with processed version
-        for idx, stop_po in enumerate(stop.po_list):
-            if stop_po.po_num == po.po_num:
-                stop.po_list[idx] = po_result["po"]
-                break
+        processed_pos.append(po_result["po"])
+    
+    # New stop with the processed POs swapped in, in one pass
+    stop = stop.replace_pos(processed_pos)
     
     # Roll up escalation to stop level if any PO was escalated
     if any_escalated:
-        stop.is_escalated = True
-        stop.escalation_reason = "; ".join(escalation_messages) if escalation_messages else "One or more POs escalated"
+        stop = stop.replace(
+            is_escalated=True,
+            escalation_reason="; ".join(escalation_messages) if escalation_messages else "One or more POs escalated"
+        )
     else:
-        stop.is_escalated = False
-        stop.escalation_reason = None
+        stop = stop.replace(is_escalated=False, escalation_reason=None)
     
     print(f"✓ All POs processed for stop {stop.id}")
     print(f"  Results: {po_results}")
     print(f"  Stop escalated: {stop.is_escalated}")
     
     return {
-        **state,
         "stop": stop,
         "po_results": po_results,
         "all_pos_processed": True,
@@ -1,13 +1,35 @@
 """
 Stop Subgraph - Handles processing of a stop including its POs via subgraph
 This creates a proper hierarchical structure for xray visualization
+
+All POs on a DROP_OFF stop are handled in a single wave (map-reduce):
+- prepare_po_processing settles non-escalated POs in bulk (fast path)
+- dispatch_pos sends one branch per remaining (ESCALATED) PO to the PO subgraph node
+- Each branch returns only its own PO result; reducers merge them into StopState
+- rollup_po_results joins the branches and rolls escalations up to the stop
+
+Stops and POs are frozen, so the nodes return updated copies; the input
+stop is shared by parallel branches and never changed.
 """
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, START, END
-from src.agents import StopState, POState
+from langgraph.types import Send
+from src.agents import StopState, POState, POTask
 from src.agents.model import StopType
-from src.agents.po_subgraph import po_subgraph, po_graph_builder
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import uuid
+from src.agents.po_subgraph import po_subgraph, po_checkpointer
+from src.agents.po_worker_pool import po_worker_pool
+from src.agents.escalation_service import (
+    po_thread_id,
+    po_run_config,
+    record_po_interrupt,
+    arecord_po_interrupt
+)
+from src.agents.po_processor_node import needs_po_subgraph, settle_clean_pos
+import asyncio
+import contextvars
+
+# Counters for PO subgraph runs awaited on the event loop (async path)
+_async_po_runs = {"active": 0, "completed": 0}
 
 
 def check_stop_type_node(state: StopState) -> StopState:
@@ -20,171 +42,212 @@ def check_stop_type_node(state: StopState) -> StopState:
     # For PICK_UP stops, mark as skipped
     if stop.type == StopType.PICK_UP:
         print(f"⚠️  PICK_UP stop detected - marking as non-escalated and skipping")
-        stop.is_escalated = False
-        stop.escalation_reason = None
+        stop = stop.replace(is_escalated=False, escalation_reason=None)
         
         return {
-            **state,
             "stop": stop,
-            "po_results": {},
             "all_pos_processed": True,
             "needs_human_review": False,
             "escalation_message": None
         }
     
-    return state
+    return {}
 
 
 def prepare_po_processing(state: StopState) -> StopState:
-    """Prepare for PO processing."""
+    """
+    Prepare for PO processing.
+    Non-escalated POs only get their flags settled, so they are settled here
+    in one pass instead of each paying a checkpointed PO subgraph run.
+    """
     stop = state["stop"]
-    print(f"✓ DROP_OFF stop - preparing to process {len(stop.po_list)} POs")
-    return state
+    clean_pos = [po for po in stop.po_list if not needs_po_subgraph(po)]
+    print(
+        f"✓ DROP_OFF stop - preparing to process {len(stop.po_list)} POs "
+        f"({len(clean_pos)} settled on the fast path)"
+    )
+    
+    if not clean_pos:
+        return {}
+    
+    settled_pos = settle_clean_pos(clean_pos)
+    return {
+        "po_results": {po.po_num: po.po_state.value for po in settled_pos},
+        "processed_pos": {po.po_num: po for po in settled_pos}
+    }
 
 
-def po_subgraph_adapter(state: StopState) -> StopState:
+def dispatch_pos(state: StopState) -> list[Send] | str:
     """
-    Adapter node that processes the first PO through the subgraph.
-    This node exists primarily for xray visualization - it makes the PO subgraph
-    structure visible in the diagram. The actual parallel processing happens
-    in the next node.
+    Fan out the POs that need the PO subgraph in one concurrent wave.
+    
+    Returns:
+        A Send per such PO, or the rollup node name if there are none
     """
     stop = state["stop"]
+    subgraph_pos = [po for po in stop.po_list if needs_po_subgraph(po)]
     
-    if not stop.po_list:
-        return state
-    
-    # Process just the first PO to demonstrate the subgraph structure
-    # (The rest will be processed in parallel in the next node)
-    first_po = stop.po_list[0]
-    po_state: POState = {
-        "po": first_po,
-        "processing_result": "",
-        "needs_review": False,
-        "escalation_message": None
-    }
+    if not subgraph_pos:
+        return PO_ROLLUP
     
-    # This invocation makes the subgraph visible to xray
-    thread_id = str(uuid.uuid4())
-    config = {"configurable": {"thread_id": thread_id}}
-    po_result = po_subgraph.invoke(po_state, config=config)
+    print(f"⚡ Dispatching {len(subgraph_pos)} POs in parallel on stop {stop.id}")
     
-    # Update the first PO with the result
-    stop.po_list[0] = po_result["po"]
+    return [
+        Send(PO_SUBGRAPH, {
+            "shipment_id": stop.shipment_id,
+            "stop_id": stop.id,
+            "po": po,
+            "processing_result": "",
+            "needs_review": False,
+            "escalation_message": None
+        })
+        for po in subgraph_pos
+    ]
+
+
+def process_po_branch(task: POTask, config: RunnableConfig) -> StopState:
+    """
+    Process a single PO through the PO subgraph as one branch of the fan-out.
+    The subgraph run is executed on the shared PO worker pool, which bounds
+    concurrency across all shipments in the process.
+    Returns only this PO's results; the StopState reducers merge the branches.
+    """
+    po_state = build_po_state(task)
+    thread_id, config = build_po_run_config(task, config)
     
-    # Store the result for the first PO
-    initial_results = {first_po.po_num: po_result["processing_result"]}
+    # The thread cannot be evicted until its result is recorded (and pinned if paused)
+    po_checkpointer.begin_run(thread_id)
+    try:
+        # A paused thread left by an earlier run of this shipment is replaced
+        po_checkpointer.delete_thread(thread_id)
+        future = po_worker_pool.submit(task["shipment_id"], po_subgraph.invoke, po_state, config=config)
+        po_result = future.result()
+        
+        return collect_po_result(task, thread_id, po_result)
+    finally:
+        po_checkpointer.end_run(thread_id)
+
+
+async def aprocess_po_branch(task: POTask, config: RunnableConfig) -> StopState:
+    """
+    Async variant of process_po_branch.
+    The PO subgraph is awaited directly on the event loop instead of
+    occupying a worker pool thread.
+    """
+    po_state = build_po_state(task)
+    thread_id, config = build_po_run_config(task, config)
+    
+    # Run detached from this graph's context (as the worker pool does on the
+    # sync path) so the PO subgraph owns its checkpoints and interrupts
+    _async_po_runs["active"] += 1
+    po_checkpointer.begin_run(thread_id)
+    try:
+        await po_checkpointer.adelete_thread(thread_id)
+        try:
+            po_result = await asyncio.create_task(
+                po_subgraph.ainvoke(po_state, config=config),
+                context=contextvars.Context()
+            )
+        finally:
+            _async_po_runs["active"] -= 1
+            _async_po_runs["completed"] += 1
+        
+        if not await arecord_po_interrupt(thread_id, po_result):
+            print(f'🎯Finished processing PO {task["po"].po_num}')
+    finally:
+        po_checkpointer.end_run(thread_id)
     
+    return po_branch_update(task, po_result)
+
+
+def async_po_run_stats() -> dict[str, int]:
+    """
+    PO subgraph runs on the async path, which awaits them on the event loop
+    instead of the worker pool (so po_worker_pool.stats() stays idle there).
+    """
+    return dict(_async_po_runs)
+
+
+def build_po_state(task: POTask) -> POState:
+    """Create the PO-level state for a dispatched PO branch."""
     return {
-        **state,
-        "stop": stop,
-        "po_results": initial_results
+        "po": task["po"],
+        "processing_result": task["processing_result"],
+        "needs_review": task["needs_review"],
+        "escalation_message": task["escalation_message"]
     }
 
 
-def process_single_po(po, stop_id: int):
+def build_po_run_config(task: POTask, config: RunnableConfig) -> tuple[str, RunnableConfig]:
     """
-    Process a single PO through the subgraph in parallel.
-    Returns tuple of (po_num, po_result, processed_po)
+    Thread id and config for the PO's checkpointed subgraph run.
+    The thread is keyed by (shipment_id, stop_id, po_num) and records the
+    shipment run's thread, so a resume can write the answer back to it.
     """
-    # Create PO-level state
-    po_state: POState = {
-        "po": po,
-        "processing_result": "",
-        "needs_review": False,
-        "escalation_message": None
-    }
+    thread_id = po_thread_id(task["shipment_id"], task["stop_id"], task["po"].po_num)
+    shipment_thread_id = config.get("configurable", {}).get("thread_id")
+    return thread_id, po_run_config(thread_id, task["shipment_id"], task["stop_id"], task["po"].po_num, shipment_thread_id)
+
+
+def collect_po_result(task: POTask, thread_id: str, po_result: POState) -> StopState:
+    """
+    Convert a PO subgraph run into this branch's StopState update.
+    A PO paused on human review is registered as a pending escalation and
+    reported as ESCALATED; its thread can be resumed later.
+    """
+    if not record_po_interrupt(thread_id, po_result):
+        print(f'🎯Finished processing PO {task["po"].po_num}')
     
-    # Generate unique thread_id for parallel execution
-    thread_id = str(uuid.uuid4())
-    config = {"configurable": {"thread_id": thread_id}}
+    return po_branch_update(task, po_result)
+
+
+def po_branch_update(task: POTask, po_result: POState) -> StopState:
+    """This branch's StopState update for a PO subgraph run result."""
+    po = task["po"]
     
-    # Invoke PO subgraph with config for parallel execution
-    po_result = po_subgraph.invoke(po_state, config=config)
+    po_escalations = {}
+    if po_result.get("needs_review") or po_result["processing_result"] == "ESCALATED":
+        po_escalations[po.po_num] = po_result.get("escalation_message") or f"PO {po.po_num} escalated"
     
-    return (po.po_num, po_result, po_result["po"])
+    return {
+        "po_results": {po.po_num: po_result["processing_result"]},
+        "processed_pos": {po.po_num: po_result["po"]},
+        "po_escalations": po_escalations
+    }
 
 
-def process_remaining_pos_parallel(state: StopState) -> StopState:
+def rollup_po_results(state: StopState) -> StopState:
     """
-    Process remaining POs (after the first one) in parallel.
-    The first PO was already processed in the adapter node for visualization.
+    Join point after all PO branches finish.
+    Writes processed POs back to the stop and rolls escalations up to stop level.
     """
     stop = state["stop"]
-    existing_results = state.get("po_results", {})
+    po_results = state.get("po_results", {})
+    processed_pos = state.get("processed_pos", {})
+    po_escalations = state.get("po_escalations", {})
     
-    # Skip if only one PO (already processed) or no POs
-    if len(stop.po_list) <= 1:
-        print(f"✓ Single PO already processed for stop {stop.id}")
-        return {
-            **state,
-            "all_pos_processed": True,
-            "needs_human_review": stop.is_escalated if hasattr(stop, 'is_escalated') else False,
-            "escalation_message": stop.escalation_reason if hasattr(stop, 'escalation_reason') else None
-        }
+    # New stop with the processed POs swapped in (one index lookup each); unchanged POs are shared
+    stop = stop.replace_pos(processed_pos.values())
     
-    # Process remaining POs (skip the first one which was already processed)
-    remaining_pos = stop.po_list[1:]
-    print(f"⚡ Starting parallel processing of {len(remaining_pos)} remaining POs on stop {stop.id}")
-    
-    po_results = dict(existing_results)  # Start with existing results
-    any_escalated = False
-    escalation_messages = []
-    processed_pos = {}
-    
-    # Use ThreadPoolExecutor for parallel execution
-    with ThreadPoolExecutor(max_workers=min(len(remaining_pos), 2)) as executor:
-        # Submit remaining PO processing tasks
-        future_to_po = {
-            executor.submit(process_single_po, po, stop.id): po 
-            for po in remaining_pos
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_po):
-            po_num, po_result, processed_po = future.result()
-            print(f'🎯Finished processing PO {po_num}')
-            
-            # Collect results
-            po_results[po_num] = po_result["processing_result"]
-            processed_pos[po_num] = processed_po
-            
-            if po_result.get("needs_review") or po_result["processing_result"] == "ESCALATED":
-                any_escalated = True
-                if po_result.get("escalation_message"):
-                    escalation_messages.append(po_result["escalation_message"])
-    
-    # Update remaining POs in the stop with processed versions
-    for idx in range(1, len(stop.po_list)):
-        po = stop.po_list[idx]
-        if po.po_num in processed_pos:
-            stop.po_list[idx] = processed_pos[po.po_num]
-    
-    # Check if first PO was also escalated
-    if stop.is_escalated:
-        any_escalated = True
-    
-    # Roll up escalation to stop level if any PO was escalated
-    if any_escalated:
-        stop.is_escalated = True
-        if escalation_messages:
-            existing_reason = stop.escalation_reason or ""
-            all_messages = [existing_reason] + escalation_messages if existing_reason else escalation_messages
-            stop.escalation_reason = "; ".join(all_messages)
-        elif not stop.escalation_reason:
-            stop.escalation_reason = "One or more POs escalated"
-    else:
-        stop.is_escalated = False
-        stop.escalation_reason = None
-    
-    print(f"✓ All {len(stop.po_list)} POs processed (1 sequential + {len(remaining_pos)} parallel) for stop {stop.id}")
+    # Roll up escalation to stop level if any PO was escalated (in PO order)
+    escalation_messages = [
+        po_escalations[po.po_num]
+        for po in stop.po_list
+        if po.po_num in po_escalations
+    ]
+    any_escalated = bool(escalation_messages)
+    
+    stop = stop.replace(
+        is_escalated=any_escalated,
+        escalation_reason="; ".join(escalation_messages) if any_escalated else None
+    )
+    
+    print(f"✓ All {len(stop.po_list)} POs processed in parallel for stop {stop.id}")
     print(f"  Results: {po_results}")
     print(f"  Stop escalated: {stop.is_escalated}")
     
     return {
-        **state,
         "stop": stop,
-        "po_results": po_results,
         "all_pos_processed": True,
         "needs_human_review": any_escalated,
         "escalation_message": stop.escalation_reason
@@ -201,8 +264,8 @@ def check_stop_type(state: StopState) -> str:
 # Node names
 CHECK_STOP_TYPE = "check_stop_type"
 PREPARE_PO = "prepare_po_processing"
-PO_SUBGRAPH_REF = "po_subgraph"  # Reference node for visualization
-PO_PROCESSOR = "process_pos_parallel"
+PO_SUBGRAPH = "po_subgraph"  # One branch per PO; xray expands the PO subgraph here
+PO_ROLLUP = "rollup_po_results"
 
 # Build stop processing subgraph
 stop_graph_builder = StateGraph(StopState)
@@ -210,13 +273,12 @@ stop_graph_builder = StateGraph(StopState)
 # Add nodes
 stop_graph_builder.add_node(CHECK_STOP_TYPE, check_stop_type_node)
 stop_graph_builder.add_node(PREPARE_PO, prepare_po_processing)
-
-# Add PO subgraph adapter - this makes the PO subgraph visible in xray visualization
-# It processes the first PO through the actual subgraph, making the structure visible
-stop_graph_builder.add_node(PO_SUBGRAPH_REF, po_subgraph_adapter)
-
-# Add the parallel processor node for remaining POs
-stop_graph_builder.add_node(PO_PROCESSOR, process_remaining_pos_parallel)
+stop_graph_builder.add_node(
+    PO_SUBGRAPH,
+    RunnableLambda(process_po_branch, afunc=aprocess_po_branch, name=PO_SUBGRAPH),
+    input=POTask
+)
+stop_graph_builder.add_node(PO_ROLLUP, rollup_po_results)
 
 # Start -> Check stop type
 stop_graph_builder.add_edge(START, CHECK_STOP_TYPE)
@@ -231,16 +293,16 @@ stop_graph_builder.add_conditional_edges(
     }
 )
 
-# After preparation, reference the PO subgraph (for xray visualization)
-stop_graph_builder.add_edge(PREPARE_PO, PO_SUBGRAPH_REF)
-
-# From PO subgraph reference to parallel processor
-# The PO_SUBGRAPH_REF node will execute once (processing first PO if any)
-# then PO_PROCESSOR handles the rest in parallel
-stop_graph_builder.add_edge(PO_SUBGRAPH_REF, PO_PROCESSOR)
+# After preparation, dispatch every PO to the PO subgraph at once (map)
+stop_graph_builder.add_conditional_edges(
+    PREPARE_PO,
+    dispatch_pos,
+    [PO_SUBGRAPH, PO_ROLLUP]
+)
 
-# After parallel processing, end
-stop_graph_builder.add_edge(PO_PROCESSOR, END)
+# All PO branches -> rollup (reduce), then end
+stop_graph_builder.add_edge(PO_SUBGRAPH, PO_ROLLUP)
+stop_graph_builder.add_edge(PO_ROLLUP, END)
 
 # Compile the stop subgraph
 stop_subgraph = stop_graph_builder.compile()
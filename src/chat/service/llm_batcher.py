@@ -0,0 +1,305 @@
+"""
+Request batching for structured LLM calls
+
+LLMBatcher gathers prompts that arrive within a short window (e.g. the
+escalated POs of one stop being resumed together) and evaluates them with
+a single chat model round trip:
+- Callers announce concurrent prompts with expect(count) (see
+  resume_escalations); without an announcement a prompt is sent at once,
+  so a lone resume never waits for the window
+- The first caller in a window becomes the leader; it waits until the
+  announced prompts (or max_batch_size) are queued, at most window_seconds,
+  and sends the whole batch
+- Replies are structured output of the batcher's schema; a batch is one
+  request whose reply lists a numbered answer per prompt
+- Completion tokens are capped at max_tokens per answer
+- Every model call is admitted by the shared LLMGovernor (rate budgets,
+  adaptive concurrency, retries on throttling)
+- Prompts missing from a batch reply are retried individually
+- Sync callers (worker pool threads) and async callers (one event loop)
+  are batched separately
+- stats() reports batches, prompts and individual fallbacks
+"""
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import asyncio
+import threading
+import weakref
+
+from langchain_core.language_models import BaseChatModel
+from pydantic import BaseModel, Field, create_model
+
+from src.config import Config
+from src.agents.model import EscalationDecision
+from src.chat.service.llm_chat_model_service import get_llm
+from src.chat.service.llm_rate_limiter import LLMGovernor, llm_governor
+
+
+def build_batch_prompt(prompts: list[str]) -> str:
+    """Combine several prompts into one request answered per request number."""
+    sections = "\n\n".join(
+        f"### Request {number}\n{prompt}"
+        for number, prompt in enumerate(prompts, start=1)
+    )
+    return f"""Answer each of the following {len(prompts)} requests independently, with its request number.
+
+{sections}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token count (~4 characters per token) for rate budgeting."""
+    return len(text) // 4 + 1
+
+
+def build_batch_schema(schema: type[BaseModel]) -> type[BaseModel]:
+    """Reply schema for a batch: one numbered answer of the given schema per request."""
+    numbered = create_model(
+        f"Numbered{schema.__name__}",
+        __base__=schema,
+        request=(int, Field(description="Request number")),
+    )
+    return create_model(f"{schema.__name__}Batch", answers=(list[numbered], ...))
+
+
+class PendingBatch:
+    """Prompts queued in one batching window, sealed when full or when the window ends."""
+
+    def __init__(self, full: threading.Event | asyncio.Event):
+        self.items: list[tuple[str, Future | asyncio.Future]] = []
+        self.full = full
+
+
+class LLMBatcher:
+    """Coalesces concurrent prompts into single structured chat model requests."""
+
+    def __init__(
+        self,
+        model_factory: Callable[[], BaseChatModel],
+        schema: type[BaseModel],
+        *,
+        window_seconds: float,
+        max_batch_size: int,
+        max_tokens: int,
+        governor: LLMGovernor,
+        enabled: bool = True
+    ):
+        self.governor = governor
+        self.schema = schema
+        self.batch_schema = build_batch_schema(schema)
+        self._model_factory = model_factory
+        self._model: BaseChatModel | None = None
+        self.max_tokens = max_tokens
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.enabled = enabled
+        
+        self._lock = threading.Lock()
+        self._open_batch: PendingBatch | None = None
+        self._open_async_batches: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Prompts announced by expect(); a batch is sealed once this many are queued
+        self._expected = 0
+        self._batches = 0
+        self._prompts = 0
+        self._fallbacks = 0
+
+    @property
+    def model(self) -> BaseChatModel:
+        """The chat model, created by model_factory on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._bind(self._model_factory())
+        return self._model
+
+    @model.setter
+    def model(self, model: BaseChatModel):
+        with self._lock:
+            self._bind(model)
+
+    @contextmanager
+    def expect(self, count: int) -> Iterator[None]:
+        """
+        Announce up to count prompts about to be evaluated concurrently, so
+        they are held for one batch (at most window_seconds) instead of each
+        being sent on arrival.
+        """
+        with self._lock:
+            self._expected += count
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._expected -= count
+
+    def evaluate(self, prompt: str) -> BaseModel:
+        """Structured reply to the prompt, sent together with any prompts queued in the same window."""
+        if not self.enabled:
+            return self._ask(prompt)
+        
+        future = Future()
+        with self._lock:
+            batch = self._open_batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._open_batch = PendingBatch(threading.Event())
+            batch.items.append((prompt, future))
+            if len(batch.items) >= self._batch_target():
+                self._open_batch = None
+                batch.full.set()
+        
+        if is_leader:
+            batch.full.wait(self.window_seconds)
+            with self._lock:
+                if self._open_batch is batch:
+                    self._open_batch = None
+            self._run_batch(batch.items)
+        
+        return future.result()
+
+    async def aevaluate(self, prompt: str) -> BaseModel:
+        """Async variant of evaluate; batches prompts awaited on the same event loop."""
+        if not self.enabled:
+            return await self._aask(prompt)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._open_async_batches.get(loop)
+        is_leader = batch is None
+        if is_leader:
+            batch = self._open_async_batches[loop] = PendingBatch(asyncio.Event())
+        batch.items.append((prompt, future))
+        if len(batch.items) >= self._batch_target():
+            del self._open_async_batches[loop]
+            batch.full.set()
+        
+        if is_leader:
+            try:
+                await asyncio.wait_for(batch.full.wait(), self.window_seconds)
+            except asyncio.TimeoutError:
+                pass
+            if self._open_async_batches.get(loop) is batch:
+                del self._open_async_batches[loop]
+            await self._arun_batch(batch.items)
+        
+        return await future
+
+    def stats(self) -> dict[str, int | float | bool]:
+        """Snapshot of batching effectiveness."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "batches": self._batches,
+                "prompts": self._prompts,
+                "avg_batch_size": self._prompts / self._batches if self._batches else 0.0,
+                "fallbacks": self._fallbacks,
+                "expected_prompts": self._expected,
+                "window_seconds": self.window_seconds,
+                "max_batch_size": self.max_batch_size
+            }
+
+    def _batch_target(self) -> int:
+        """Queued prompts that seal a batch: the announced ones, capped at max_batch_size."""
+        return max(1, min(self._expected, self.max_batch_size))
+
+    def _bind(self, model: BaseChatModel):
+        """Build the structured runnables for a model (caller holds the lock)."""
+        self._single = model.with_structured_output(self.schema)
+        self._batched = model.with_structured_output(self.batch_schema)
+        self._model = model
+
+    def _structured(self, batched: bool):
+        self.model  # created on first use
+        return self._batched if batched else self._single
+
+    def _ask(self, prompt: str) -> BaseModel:
+        return self._invoke(self._structured(batched=False), prompt, self.max_tokens)
+
+    async def _aask(self, prompt: str) -> BaseModel:
+        return await self._ainvoke(self._structured(batched=False), prompt, self.max_tokens)
+
+    def _ask_batch(self, prompts: list[str]) -> dict[int, BaseModel]:
+        reply = self._invoke(
+            self._structured(batched=True), build_batch_prompt(prompts), self.max_tokens * len(prompts)
+        )
+        return self._unpack(reply, len(prompts))
+
+    async def _aask_batch(self, prompts: list[str]) -> dict[int, BaseModel]:
+        reply = await self._ainvoke(
+            self._structured(batched=True), build_batch_prompt(prompts), self.max_tokens * len(prompts)
+        )
+        return self._unpack(reply, len(prompts))
+
+    def _invoke(self, runnable, content: str, max_tokens: int) -> BaseModel:
+        messages = [{"role": "user", "content": content}]
+        return self.governor.call(
+            lambda: runnable.invoke(messages, max_tokens=max_tokens),
+            tokens=estimate_tokens(content) + max_tokens
+        )
+
+    async def _ainvoke(self, runnable, content: str, max_tokens: int) -> BaseModel:
+        messages = [{"role": "user", "content": content}]
+        return await self.governor.acall(
+            lambda: runnable.ainvoke(messages, max_tokens=max_tokens),
+            tokens=estimate_tokens(content) + max_tokens
+        )
+
+    def _unpack(self, reply: BaseModel, count: int) -> dict[int, BaseModel]:
+        """Map request index (0-based) to its answer; unanswered requests are absent."""
+        answers = {}
+        for answer in reply.answers:
+            if 1 <= answer.request <= count:
+                answers.setdefault(answer.request - 1, self.schema(**answer.model_dump(exclude={"request"})))
+        return answers
+
+    def _run_batch(self, batch: list[tuple[str, Future]]):
+        """Send a batch and resolve its futures (sync)."""
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            answers = {0: self._ask(prompts[0])} if len(prompts) == 1 else self._ask_batch(prompts)
+            self._record(len(prompts), len(prompts) - len(answers))
+            
+            for idx, (prompt, future) in enumerate(batch):
+                if idx not in answers:
+                    answers[idx] = self._ask(prompt)
+                future.set_result(answers[idx])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+
+    async def _arun_batch(self, batch: list[tuple[str, asyncio.Future]]):
+        """Send a batch and resolve its futures (async)."""
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            answers = {0: await self._aask(prompts[0])} if len(prompts) == 1 else await self._aask_batch(prompts)
+            self._record(len(prompts), len(prompts) - len(answers))
+            
+            missing = [idx for idx in range(len(prompts)) if idx not in answers]
+            replies = await asyncio.gather(*(self._aask(prompts[idx]) for idx in missing))
+            answers.update(zip(missing, replies))
+            
+            for idx, (_, future) in enumerate(batch):
+                future.set_result(answers[idx])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+
+    def _record(self, prompts: int, fallbacks: int):
+        with self._lock:
+            self._batches += 1
+            self._prompts += prompts
+            self._fallbacks += fallbacks
+
+
+# Shared batcher for escalation decisions
+llm_batcher = LLMBatcher(
+    get_llm,
+    EscalationDecision,
+    window_seconds=Config.llm_batch_window_seconds,
+    max_batch_size=Config.llm_batch_max_size,
+    max_tokens=Config.llm_decision_max_tokens,
+    governor=llm_governor,
+    enabled=Config.llm_batching_enabled
+)
@@ -0,0 +1,80 @@
+"""
+SqliteResponseStore - the SQLite tier of LLMResponseCache
+
+- One llm_cache table keyed on the cache key, shared across restarts and
+  worker processes (WAL journal, busy timeout)
+- Imported only when Config.llm_cache_db_path is set, so in-memory caches
+  do not load SQLAlchemy
+"""
+from sqlalchemy import (
+    Column,
+    Float,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    delete,
+    event,
+    select
+)
+from sqlalchemy.dialects.sqlite import insert
+
+metadata_obj = MetaData()
+
+llm_cache_table = Table(
+    "llm_cache",
+    metadata_obj,
+    Column("key", String, primary_key=True),
+    Column("model", String, nullable=False),
+    Column("response", Text, nullable=False),
+    Column("created_at", Float, nullable=False)
+)
+
+
+class SqliteResponseStore:
+    """Model replies stored in a local SQLite file."""
+
+    def __init__(self, db_path: str):
+        self.engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        
+        @event.listens_for(self.engine, "connect")
+        def configure_connection(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=30000")
+            cursor.close()
+        
+        metadata_obj.create_all(self.engine)
+
+    def get(self, key: str, min_created_at: float | None = None) -> tuple[str, float] | None:
+        """Stored (response, created_at) for the key; entries older than min_created_at are dropped."""
+        with self.engine.begin() as conn:
+            row = conn.execute(select(llm_cache_table).where(llm_cache_table.c.key == key)).first()
+            if row is not None and min_created_at is not None and row.created_at < min_created_at:
+                conn.execute(delete(llm_cache_table).where(llm_cache_table.c.key == key))
+                row = None
+        return (row.response, row.created_at) if row is not None else None
+
+    def put(self, key: str, model: str, response: str, created_at: float):
+        """Insert or replace the reply stored for the key."""
+        with self.engine.begin() as conn:
+            conn.execute(
+                insert(llm_cache_table)
+                .values(key=key, model=model, response=response, created_at=created_at)
+                .on_conflict_do_update(
+                    index_elements=[llm_cache_table.c.key],
+                    set_={"response": response, "created_at": created_at}
+                )
+            )
+
+    def delete_older_than(self, cutoff: float) -> int:
+        """Drop entries created before cutoff; returns how many were removed."""
+        with self.engine.begin() as conn:
+            return conn.execute(delete(llm_cache_table).where(llm_cache_table.c.created_at < cutoff)).rowcount
+
+    def clear(self):
+        """Drop every entry."""
+        with self.engine.begin() as conn:
+            conn.execute(delete(llm_cache_table))
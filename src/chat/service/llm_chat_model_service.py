@@ -1,16 +1,60 @@
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+import threading
+
+from src.config import Config
+from src.chat.service.llm_http_client import llm_http_clients
 
 load_dotenv()
 
-llm = init_chat_model(
-    # "deepseek-r1", model_provider="ollama"
-    # "gemma3", model_provider="ollama"
-    # "llama3.2", model_provider="ollama"
-    'gpt-4o-mini', model_provider='openai'
+# "provider:model"; also part of the LLM response cache key
+llm_model_name = (
+    # "ollama:deepseek-r1"
+    # "ollama:gemma3"
+    # "ollama:llama3.2"
+    'openai:gpt-4o-mini'
     # "anthropic:claude-3-5-sonnet-latest"
     # 'google_anthropic_vertex'    -> langchain-google-vertexai
     # "google_vertexai:gemini-2.5-flash". ## NB: Assumes Vertex AI; use genAI SDK API instead
 )
 
-print(f'initialized LLM chat model {llm.model_config}')
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def chat_model_kwargs(model_name: str) -> dict:
+    """
+    Client options for the chat model.
+    Retries on throttling are left to llm_governor (llm_rate_limiter), which adapts to them.
+    OpenAI-compatible clients share the pooled HTTP clients and may target Config.llm_base_url.
+    """
+    kwargs = {"max_retries": 0}
+    if model_name.startswith("openai:"):
+        kwargs["http_client"] = llm_http_clients.client
+        kwargs["http_async_client"] = llm_http_clients.async_client
+        if Config.llm_base_url:
+            kwargs["base_url"] = Config.llm_base_url
+    return kwargs
+
+
+def get_llm():
+    """
+    The shared chat model, created on first use (the first escalation review).
+    Building it imports the provider SDK and needs its credentials, so runs
+    and API workers that never escalate pay for neither.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                # Deferred: langchain provider modules are slow to import
+                from langchain.chat_models import init_chat_model
+                _llm = init_chat_model(llm_model_name, **chat_model_kwargs(llm_model_name))
+                print(f'initialized LLM chat model {llm_model_name}')
+    return _llm
+
+
+def __getattr__(name: str):
+    # `from src.chat.service.llm_chat_model_service import llm` still works, creating the model then
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
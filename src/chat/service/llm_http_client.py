@@ -0,0 +1,157 @@
+"""
+Shared HTTP connection pool for the chat model client
+
+LLMHttpClients builds one httpx.Client and one httpx.AsyncClient (used by
+the OpenAI-compatible chat model for sync and async calls) with:
+- Pool limits: max connections and max idle keep-alive connections
+- Keep-alive expiry, so idle connections are reused instead of re-dialled
+- Separate connect/read/write/pool-wait timeouts
+- Optional HTTP/2 (needs the h2 package; falls back to HTTP/1.1 without it)
+- Each client is built on first use (building its SSL context is slow), so
+  processes that never call the model do not pay for it
+stats() reports requests sent and connections opened, open, idle and active.
+"""
+import threading
+import weakref
+
+import httpx
+
+from src.config import Config
+
+
+class LLMHttpClients:
+    """Sync and async httpx clients sharing one pool configuration and usage counters."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        connect_timeout: float,
+        read_timeout: float,
+        write_timeout: float,
+        pool_timeout: float,
+        http2: bool = False
+    ):
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠️  h2 is not installed - chat model HTTP client falls back to HTTP/1.1")
+                http2 = False
+        
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout
+        )
+        
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections_opened = 0
+        self._seen_connections: weakref.WeakSet = weakref.WeakSet()
+        
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.Client:
+        """Sync client, built on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        limits=self.limits,
+                        timeout=self.timeout,
+                        http2=self.http2,
+                        event_hooks={"request": [self._on_request], "response": [self._on_response]}
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Async client, built on first use."""
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = httpx.AsyncClient(
+                        limits=self.limits,
+                        timeout=self.timeout,
+                        http2=self.http2,
+                        event_hooks={"request": [self._aon_request], "response": [self._aon_response]}
+                    )
+        return self._async_client
+
+    def stats(self) -> dict[str, int | float | bool | None]:
+        """Snapshot of pool usage across the sync and async clients."""
+        connections = self._connections()
+        idle = sum(1 for connection in connections if connection.is_idle())
+        with self._lock:
+            return {
+                "http2": self.http2,
+                "requests": self._requests,
+                "connections_opened": self._connections_opened,
+                "open_connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry
+            }
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+
+    def _connections(self) -> list:
+        """Connections currently held by the built pools (httpcore internals, read defensively)."""
+        connections = []
+        for client in (self._client, self._async_client):
+            if client is None:
+                continue
+            pool = getattr(client._transport, "_pool", None)
+            connections.extend(getattr(pool, "connections", []))
+        return connections
+
+    def _on_request(self, request: httpx.Request):
+        with self._lock:
+            self._requests += 1
+
+    def _on_response(self, response: httpx.Response):
+        # A connection not seen before was opened for this request
+        with self._lock:
+            for connection in self._connections():
+                if connection not in self._seen_connections:
+                    self._seen_connections.add(connection)
+                    self._connections_opened += 1
+
+    async def _aon_request(self, request: httpx.Request):
+        self._on_request(request)
+
+    async def _aon_response(self, response: httpx.Response):
+        self._on_response(response)
+
+
+# Shared pool for the chat model
+llm_http_clients = LLMHttpClients(
+    max_connections=Config.llm_http_max_connections,
+    max_keepalive_connections=Config.llm_http_max_keepalive_connections,
+    keepalive_expiry=Config.llm_http_keepalive_expiry_seconds,
+    connect_timeout=Config.llm_http_connect_timeout_seconds,
+    read_timeout=Config.llm_http_read_timeout_seconds,
+    write_timeout=Config.llm_http_write_timeout_seconds,
+    pool_timeout=Config.llm_http_pool_timeout_seconds,
+    http2=Config.llm_http2
+)
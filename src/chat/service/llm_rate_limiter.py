@@ -0,0 +1,280 @@
+"""
+Process-wide throttling for chat model calls
+
+LLMGovernor admits calls to the chat model from any thread or event loop:
+- Token buckets enforce requests-per-minute and tokens-per-minute budgets
+  (tokens are estimated from the prompt size plus the completion budget)
+- An AIMD limiter adapts concurrency: +1 slot per limit's worth of
+  successes, multiplicative decrease when the provider throttles (HTTP 429)
+- Throttled calls are retried with full-jitter exponential backoff,
+  honouring a Retry-After header when the provider sends one
+- Calls that cannot be admitted within queue_timeout_seconds are rejected
+  with LLMRateLimitExceeded
+- A slot is released however the call ends, including a cancelled await
+- stats() reports queued, admitted, rejected, throttled, retried and
+  aborted (cancelled or interrupted) calls
+"""
+from typing import Any, Awaitable, Callable
+import asyncio
+import random
+import threading
+import time
+
+from src.config import Config
+
+# Poll interval while waiting for a concurrency slot
+SLOT_POLL_SECONDS = 0.01
+
+
+class LLMRateLimitExceeded(Exception):
+    """A chat model call could not be admitted, or stayed throttled after all retries."""
+
+
+class TokenBucket:
+    """Refills at rate_per_minute up to capacity; not thread-safe (the governor holds its lock)."""
+
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit; guarded by the governor's lock."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease_factor: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+
+    def has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self):
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    """True for provider rate-limit responses (HTTP 429) across client libraries."""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or type(exc).__name__ in ("RateLimitError", "TooManyRequests")
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Provider-suggested delay from a Retry-After header, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGovernor:
+    """Shared admission control, budgets and retries around chat model calls."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float | None,
+        tokens_per_minute: float | None,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 20.0,
+        queue_timeout_seconds: float | None = None
+    ):
+        # Buckets hold ten seconds of budget so bursts stay well inside provider windows
+        self.request_bucket = (
+            TokenBucket(requests_per_minute, max(1.0, requests_per_minute / 6)) if requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute, max(1.0, tokens_per_minute / 6)) if tokens_per_minute else None
+        )
+        self.limiter = AIMDLimiter(max_concurrency, min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+        
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._throttled = 0
+        self._retried = 0
+        self._failed = 0
+        self._aborted = 0
+
+    def call(self, fn: Callable[[], Any], *, tokens: int = 0) -> Any:
+        """Run fn once admitted; retried with backoff while the provider throttles."""
+        for attempt in range(self.max_retries + 1):
+            self._admit(tokens)
+            try:
+                result = fn()
+            except Exception as exc:
+                delay = self._on_error(exc, attempt)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._on_abort()
+                raise
+            self._on_success()
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], *, tokens: int = 0) -> Any:
+        """Async variant of call; waits for admission without blocking the event loop."""
+        for attempt in range(self.max_retries + 1):
+            await self._aadmit(tokens)
+            try:
+                result = await fn()
+            except Exception as exc:
+                delay = self._on_error(exc, attempt)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (asyncio.CancelledError) or interrupted: free the slot, keep the limit
+                self._on_abort()
+                raise
+            self._on_success()
+            return result
+
+    def stats(self) -> dict[str, int | float | None]:
+        """Snapshot of admission and throttling counters."""
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "in_flight": self.limiter.in_flight,
+                "concurrency_limit": round(self.limiter.limit, 2),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "throttled": self._throttled,
+                "retried": self._retried,
+                "failed": self._failed,
+                "aborted": self._aborted,
+                "request_tokens_available": round(self.request_bucket.tokens, 2) if self.request_bucket else None,
+                "token_budget_available": round(self.token_bucket.tokens, 2) if self.token_bucket else None
+            }
+
+    def _admit(self, tokens: int):
+        deadline = self._deadline()
+        with self._lock:
+            self._queued += 1
+        try:
+            while (wait := self._try_admit(tokens)) > 0:
+                time.sleep(self._bounded_wait(wait, deadline))
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+    async def _aadmit(self, tokens: int):
+        deadline = self._deadline()
+        with self._lock:
+            self._queued += 1
+        try:
+            while (wait := self._try_admit(tokens)) > 0:
+                await asyncio.sleep(self._bounded_wait(wait, deadline))
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+    def _try_admit(self, tokens: int) -> float:
+        """Take a slot and budget if all are available; otherwise seconds to wait before trying again."""
+        with self._lock:
+            if not self.limiter.has_slot():
+                return SLOT_POLL_SECONDS
+            
+            wait = max(
+                self.request_bucket.wait_time(1) if self.request_bucket else 0.0,
+                self.token_bucket.wait_time(tokens) if self.token_bucket else 0.0
+            )
+            if wait > 0:
+                return wait
+            
+            if self.request_bucket:
+                self.request_bucket.take(1)
+            if self.token_bucket:
+                self.token_bucket.take(tokens)
+            self.limiter.in_flight += 1
+            self._admitted += 1
+            return 0.0
+
+    def _on_success(self):
+        with self._lock:
+            self.limiter.in_flight -= 1
+            self.limiter.on_success()
+
+    def _on_abort(self):
+        with self._lock:
+            self.limiter.in_flight -= 1
+            self._aborted += 1
+
+    def _on_error(self, exc: Exception, attempt: int) -> float:
+        """Release the slot; returns the backoff before retrying, or re-raises."""
+        throttled = is_throttling_error(exc)
+        with self._lock:
+            self.limiter.in_flight -= 1
+            if throttled:
+                self._throttled += 1
+                self.limiter.on_throttle()
+            if not throttled or attempt >= self.max_retries:
+                self._failed += 1
+            else:
+                self._retried += 1
+        
+        if not throttled:
+            raise exc
+        if attempt >= self.max_retries:
+            raise LLMRateLimitExceeded(f"Chat model still throttled after {self.max_retries} retries") from exc
+        
+        backoff = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+        return max(backoff, retry_after_seconds(exc) or 0.0)
+
+    def _deadline(self) -> float | None:
+        return time.monotonic() + self.queue_timeout_seconds if self.queue_timeout_seconds is not None else None
+
+    def _bounded_wait(self, wait: float, deadline: float | None) -> float:
+        """Wait time clipped to the admission deadline; rejects the call once it has passed."""
+        if deadline is None:
+            return wait
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            with self._lock:
+                self._rejected += 1
+            raise LLMRateLimitExceeded(f"Chat model call not admitted within {self.queue_timeout_seconds}s")
+        return min(wait, remaining)
+
+
+# Shared governor for every chat model call in the process
+llm_governor = LLMGovernor(
+    requests_per_minute=Config.llm_requests_per_minute,
+    tokens_per_minute=Config.llm_tokens_per_minute,
+    max_concurrency=Config.llm_max_concurrency,
+    min_concurrency=Config.llm_min_concurrency,
+    max_retries=Config.llm_max_retries,
+    retry_base_seconds=Config.llm_retry_base_seconds,
+    retry_max_seconds=Config.llm_retry_max_seconds,
+    queue_timeout_seconds=Config.llm_queue_timeout_seconds
+)
@@ -0,0 +1,185 @@
+"""
+Two-tier response cache for LLM calls
+
+LLMResponseCache memoizes model replies keyed on the model name and a
+normalized prompt (surrounding whitespace stripped, runs of whitespace
+collapsed):
+- Tier 1: in-memory LRU, bounded by max_entries
+- Tier 2 (optional): local SQLite file, shared across restarts and worker
+  processes (see llm_cache_store; SQLAlchemy is loaded only when db_path is set)
+- Entries older than ttl_seconds are treated as misses and dropped
+- stats() reports hits per tier, misses and evictions
+- enabled=False bypasses both tiers (every call goes to the model)
+"""
+from collections import OrderedDict
+import asyncio
+import hashlib
+import re
+import threading
+import time
+
+from src.config import Config
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return WHITESPACE.sub(" ", prompt).strip()
+
+
+def cache_key(model: str, prompt: str) -> str:
+    """Stable key for a prompt sent to a model."""
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """In-memory LRU in front of an optional SQLite cache of model replies."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float | None = None,
+        db_path: str | None = None,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.enabled = enabled
+        
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        
+        self.store = None
+        if db_path:
+            from src.chat.service.llm_cache_store import SqliteResponseStore
+            self.store = SqliteResponseStore(db_path)
+
+    def get(self, model: str, prompt: str) -> str | None:
+        """Cached reply for the prompt, or None on a miss (or when bypassed)."""
+        if not self.enabled:
+            return None
+        
+        key = cache_key(model, prompt)
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if not self._expired(created_at, now):
+                    self._entries.move_to_end(key)
+                    self._memory_hits += 1
+                    return response
+                del self._entries[key]
+                self._evictions += 1
+        
+        if self.store is not None:
+            min_created_at = now - self.ttl_seconds if self.ttl_seconds is not None else None
+            row = self.store.get(key, min_created_at)
+            if row is not None:
+                response, created_at = row
+                with self._lock:
+                    self._disk_hits += 1
+                    self._remember(key, response, created_at)
+                return response
+        
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, model: str, prompt: str, response: str):
+        """Store a model reply in both tiers."""
+        if not self.enabled:
+            return
+        
+        key = cache_key(model, prompt)
+        now = time.time()
+        
+        with self._lock:
+            self._remember(key, response, now)
+        
+        if self.store is not None:
+            self.store.put(key, model, response, now)
+
+    async def aget(self, model: str, prompt: str) -> str | None:
+        """Async variant of get; the SQLite tier is read off the event loop."""
+        if self.store is None:
+            return self.get(model, prompt)
+        return await asyncio.to_thread(self.get, model, prompt)
+
+    async def aput(self, model: str, prompt: str, response: str):
+        """Async variant of put; the SQLite tier is written off the event loop."""
+        if self.store is None:
+            return self.put(model, prompt, response)
+        return await asyncio.to_thread(self.put, model, prompt, response)
+
+    def prune(self) -> int:
+        """Drop expired entries from both tiers; returns how many were removed."""
+        if self.ttl_seconds is None:
+            return 0
+        
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        
+        with self._lock:
+            for key in [key for key, (_, created_at) in self._entries.items() if created_at < cutoff]:
+                del self._entries[key]
+                removed += 1
+            self._evictions += removed
+        
+        if self.store is not None:
+            removed += self.store.delete_older_than(cutoff)
+        
+        return removed
+
+    def clear(self):
+        """Empty both tiers (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+        
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> dict[str, int | float | bool | str | None]:
+        """Snapshot of cache hit rates and size."""
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._memory_hits + self._disk_hits) / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "db_path": self.db_path
+            }
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, response: str, created_at: float):
+        """Insert into the LRU tier, evicting the oldest entries (caller holds the lock)."""
+        self._entries[key] = (response, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+# Shared cache for escalation decisions
+llm_response_cache = LLMResponseCache(
+    max_entries=Config.llm_cache_max_entries,
+    ttl_seconds=Config.llm_cache_ttl_seconds,
+    db_path=Config.llm_cache_db_path,
+    enabled=Config.llm_cache_enabled
+)
@@ -1,2 +1,77 @@
 class Config:
     Ollama_base_url: str = 'http://localhost:11434'
+    # Dispatch all stops of a shipment at once instead of walking them in order
+    parallel_stops: bool = False
+    # Settle PICK_UP stops (and stops without POs) up front; only actionable DROP_OFF stops are traversed
+    stop_execution_plan: bool = True
+    # Settle SCHEDULED/PENDING POs in bulk at the stop; only ESCALATED POs run the PO subgraph
+    po_fast_path: bool = True
+    # Simulated processing time per PO run through the PO subgraph (min, max seconds)
+    po_simulated_work_seconds: tuple[float, float] = (1.0, 5.0)
+    # Process-wide PO worker pool: concurrent PO subgraph runs across all shipments
+    po_worker_pool_size: int = 8
+    # Max POs waiting for a worker before submitters block (backpressure)
+    po_worker_queue_size: int = 256
+    # PO subgraph checkpointer bounds (LRU by thread, memory cap, idle TTL)
+    po_checkpoint_max_threads: int = 10_000
+    po_checkpoint_max_bytes: int = 256 * 1024 * 1024
+    po_checkpoint_ttl_seconds: float = 60 * 60
+    # PO threads paused on human review: own thread cap and idle TTL (still count against max_bytes)
+    po_checkpoint_max_pinned_threads: int = 10_000
+    po_checkpoint_pinned_ttl_seconds: float = 7 * 24 * 60 * 60
+    # SQLite file for durable checkpoints of all graphs (None = in-memory only)
+    checkpoint_db_path: str | None = None
+    # Compact msgpack checkpoint encoding for shipment models (False = langgraph default)
+    compact_checkpoint_serde: bool = True
+    # Escalation LLM response cache (in-memory LRU, plus SQLite when a path is set)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 10_000
+    llm_cache_ttl_seconds: float | None = 24 * 60 * 60
+    llm_cache_db_path: str | None = None
+    # Escalation prompts arriving within this window are sent in one LLM request
+    llm_batching_enabled: bool = True
+    llm_batch_window_seconds: float = 0.05
+    llm_batch_max_size: int = 16
+    # Completion token budget per structured escalation decision
+    llm_decision_max_tokens: int = 64
+    # Regex patterns (case-insensitive) per PoState that settle a human reply without the LLM.
+    # Replies matching several states, or the negation pattern, go to the LLM. Empty = always LLM
+    escalation_reply_rules: dict[str, list[str]] = {
+        "SCHEDULED": [r"\b(approved?|accept(ed)?|confirmed?|looks good|lgtm|yes|ok(ay)?|go ahead|proceed)\b"],
+        "PENDING": [r"\b(still waiting|waiting (on|for)|pending|in progress|will confirm)\b"],
+        "ESCALATED": [r"\b(reject(ed)?|denied|refused?|damaged|wrong address)\b"]
+    }
+    escalation_reply_negation: str = r"\b(not|no|never|don't|doesn't|didn't|can't|cannot|won't|isn't|without)\b|n't\b"
+    # Process-wide chat model throttling: provider budgets (None = unlimited), adaptive
+    # concurrency bounds, retries on HTTP 429, and how long a call may wait for admission
+    llm_requests_per_minute: float | None = 500
+    llm_tokens_per_minute: float | None = 200_000
+    llm_max_concurrency: int = 16
+    llm_min_concurrency: int = 1
+    llm_max_retries: int = 5
+    llm_retry_base_seconds: float = 0.5
+    llm_retry_max_seconds: float = 20.0
+    llm_queue_timeout_seconds: float | None = 120
+    # OpenAI-compatible endpoint for the chat model (None = provider default), e.g. f"{Ollama_base_url}/v1"
+    llm_base_url: str | None = None
+    # Shared HTTP pool for the chat model client
+    llm_http_max_connections: int = 32
+    llm_http_max_keepalive_connections: int = 16
+    llm_http_keepalive_expiry_seconds: float = 30.0
+    llm_http_connect_timeout_seconds: float = 5.0
+    llm_http_read_timeout_seconds: float = 60.0
+    llm_http_write_timeout_seconds: float = 10.0
+    llm_http_pool_timeout_seconds: float = 10.0
+    llm_http2: bool = False
+    # Mermaid diagram PNG renderer: "api" (remote mermaid.ink), "pyppeteer" (local) or "none"
+    mermaid_draw_method: str = "api"
+    # Refresh the diagram in a background thread when the API servers start
+    mermaid_refresh_on_startup: bool = False
+    # Bulk processing from Parquet/Arrow tables: shipments in flight, and rows per record
+    # batch read (bounds the rows held in memory while rebuilding shipments)
+    bulk_concurrency: int = 64
+    bulk_read_batch_rows: int = 8192
+    # Shipments read ahead of the runs in flight; those with at least bulk_compact_min_pos POs
+    # wait in the read-ahead buffer as CompactShipment (None = always as pydantic models)
+    bulk_read_ahead: int = 16
+    bulk_compact_min_pos: int | None = 10_000
@@ -1,20 +1,117 @@
+"""
+Mermaid diagram of the shipment graph (src/util/README.md and mermaid.png)
+
+- The graph structure is rendered to mermaid text once and hashed; the
+  README and PNG are rewritten only when the hash changes (or on --force)
+- The PNG is rendered by Config.mermaid_draw_method: "api" (remote
+  mermaid.ink), "pyppeteer" (local headless browser) or "none" (README only)
+- Not part of server startup: run it as a command, or in a background
+  thread with start_mermaid_refresh()
+
+    uv run python -m src.util.mermaid [--force] [--draw-method pyppeteer]
+"""
+import argparse
+import hashlib
 import os
+import threading
+
+from langchain_core.runnables.graph import MermaidDrawMethod
+from langchain_core.runnables.graph_mermaid import draw_mermaid_png
 
+from src.config import Config
 from src.agents.graph_builder import my_graph
 
 current_directory = os.path.dirname(os.path.abspath(__file__))
+mermaid_md_file = os.path.join(current_directory, "README.md")
+mermaid_png_file = os.path.join(current_directory, "mermaid.png")
+# Hash of the graph structure the PNG was last rendered from (committed with the PNG)
+mermaid_hash_file = os.path.join(current_directory, "mermaid.sha256")
+
+
+def graph_hash(mermaid_md: str) -> str:
+    """Content hash of the graph structure."""
+    return hashlib.sha256(mermaid_md.encode()).hexdigest()
 
 
-def create_mermaid_diagram_files():
+def build_mermaid_readme(mermaid_md: str) -> str:
+    return (
+        '# Mermaid diagram with expanded subgraphs\n\n'
+        'This diagram shows the complete graph hierarchy including all subgraphs expanded using `xray=True`.\n\n'
+        '![Complete Graph](mermaid.png)\n'
+        f'```mermaid\n{mermaid_md}\n```\n'
+    )
+
+
+def create_mermaid_diagram_files(*, force: bool = False, draw_method: str | None = None) -> bool:
+    """
+    Write the README and PNG for the current graph if its structure changed.
+    Returns True when a file was rewritten. Rendering errors are raised.
+    """
+    draw_method = draw_method or Config.mermaid_draw_method
+    
     # Render main graph with xray=True to expand all subgraphs
     mermaid_md = my_graph.get_graph(xray=True).draw_mermaid()
-    mermaid_md_file = os.path.join(current_directory, "README.md")
-    with open(mermaid_md_file, "w") as file:
-        file.write('# Mermaid diagram with expanded subgraphs\n\n')
-        file.write('This diagram shows the complete graph hierarchy including all subgraphs expanded using `xray=True`.\n\n')
-        file.write('![Complete Graph](mermaid.png)\n')
-        file.write(f'```mermaid\n{mermaid_md}\n```\n')
-
-    # Generate PNG for complete graph with expanded subgraphs
-    mermaid_png_file = os.path.join(current_directory, "mermaid.png")
-    my_graph.get_graph(xray=True).draw_mermaid_png(output_file_path=mermaid_png_file)
\ No newline at end of file
+    digest = graph_hash(mermaid_md)
+    updated = False
+    
+    readme = build_mermaid_readme(mermaid_md)
+    if force or _read(mermaid_md_file) != readme:
+        _write(mermaid_md_file, readme.encode())
+        updated = True
+    
+    if draw_method == "none":
+        return updated
+    
+    if force or _read(mermaid_hash_file) != digest or not os.path.exists(mermaid_png_file):
+        png = draw_mermaid_png(mermaid_md, draw_method=MermaidDrawMethod(draw_method))
+        _write(mermaid_png_file, png)
+        _write(mermaid_hash_file, digest.encode())
+        updated = True
+    
+    return updated
+
+
+def refresh_mermaid_diagram_files(**kwargs) -> bool:
+    """create_mermaid_diagram_files, reporting instead of raising (e.g. offline)."""
+    try:
+        if create_mermaid_diagram_files(**kwargs):
+            print('✓ Updated mermaid diagram')
+        else:
+            print('✓ Mermaid diagram up to date')
+        return True
+    except Exception as exc:
+        print(f'⚠️  Mermaid diagram not updated: {exc}')
+        return False
+
+
+def start_mermaid_refresh(**kwargs) -> threading.Thread:
+    """Refresh the diagram files in a daemon thread, so callers do not wait on rendering."""
+    thread = threading.Thread(
+        target=refresh_mermaid_diagram_files, kwargs=kwargs, name="mermaid-refresh", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path: str, content: bytes):
+    # Replace atomically, so a reader never sees a half-written file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the mermaid diagram of the shipment graph")
+    parser.add_argument("--force", action="store_true", help="Rewrite the files even if the graph is unchanged")
+    parser.add_argument("--draw-method", choices=["api", "pyppeteer", "none"], help="PNG renderer (default: Config.mermaid_draw_method)")
+    args = parser.parse_args()
+    raise SystemExit(0 if refresh_mermaid_diagram_files(force=args.force, draw_method=args.draw_method) else 1)